@@ -0,0 +1,24 @@
+"""Набор сценариев сквозного бенчмарка: python -m benchmarks."""
+import logging
+
+from benchmarks import bench_pipeline
+
+SCENARIOS = {
+    "базовый": {},
+    "медленный API (20 мс)": {"api_latency": 0.02, "cycles": 100},
+    "нестабильный API (10% ошибок)": {"api_errors": 0.1},
+    "большой ответ (1000 работ)": {"homeworks": 1000, "cycles": 50},
+    "Telegram ограничивает (5% 429)": {"tg_errors": 0.05},
+}
+
+
+def main():
+    """Прогон всех сценариев."""
+    logging.disable(logging.CRITICAL)
+    for name, options in SCENARIOS.items():
+        print(name)
+        bench_pipeline.report(*bench_pipeline.run(**options))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Пропускная способность пакетной обработки ответа API.
+
+Запуск: python -m benchmarks.bench_batch
+
+Проверяет и отрисовывает все работы ответа и склеивает их в сообщения
+для Telegram тем же путём, что и опрос: `check_response`,
+`render_records`, `combine_messages`.
+"""
+import logging
+import time
+
+import homework
+
+STATUSES = tuple(homework.HOMEWORK_VERDICTS)
+
+
+def make_response(count):
+    """Синтетический ответ API с заданным числом работ."""
+    return {
+        "homeworks": [
+            {
+                "id": i,
+                "homework_name": f"user__hw{i}.zip",
+                "status": STATUSES[i % len(STATUSES)],
+                "reviewer_comment": "Комментарий ревьюера",
+                "date_updated": "2021-04-11T10:31:09Z",
+                "lesson_name": "Проект спринта",
+            }
+            for i in range(count)
+        ],
+        "current_date": 1700000000,
+    }
+
+
+def measure(response, repeat=5):
+    """Лучшее время обработки одного ответа и число сообщений."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parts = homework.combine_messages(
+            homework.render_records(homework.check_response(response))
+        )
+        best = min(best, time.perf_counter() - started)
+    return best, len(parts)
+
+
+def main():
+    """Печать записей в секунду для разных размеров ответа."""
+    logging.disable(logging.CRITICAL)
+    for count in (100, 1000, 10000):
+        elapsed, parts = measure(make_response(count))
+        print(
+            f"{count:>6} работ: {elapsed * 1000:8.2f} мс,"
+            f" {count / elapsed:10.0f} записей/с, сообщений: {parts}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Сообщения об ошибках во время долгого сбоя API.
+
+Запуск: python -m benchmarks.bench_digest [часов_сбоя]
+
+Каждый цикл опроса падает с одной из двух ошибок, в текст которых
+попадает from_date или код ответа. Сравнивает прежнее подавление
+только точного повтора последней ошибки и сводку по окну, которое
+растёт от часа до суток, пока сбой продолжается.
+"""
+import random
+import sys
+
+from homework_bot.digest import ErrorDigest
+
+RETRY_PERIOD = 600
+WINDOW = 3600
+MAX_WINDOW = 24 * 3600
+ERRORS = (
+    "Ошибка при запросе к API: Read timed out. Параметры: "
+    "{{'from_date': {timestamp}}}",
+    "Эндпоинт недоступен. Код ответа: {code}",
+)
+
+
+class Clock:
+    """Время симуляции в секундах."""
+
+    def __init__(self):
+        """Начало симуляции."""
+        self.now = 0.0
+
+    def __call__(self):
+        """Текущее время."""
+        return self.now
+
+
+def outage(hours, rng):
+    """Тексты ошибок каждого цикла опроса за время сбоя."""
+    for cycle in range(int(hours * 3600 / RETRY_PERIOD)):
+        template = rng.choice(ERRORS)
+        yield cycle * RETRY_PERIOD, template.format(
+            timestamp=1_700_000_000 + cycle * RETRY_PERIOD,
+            code=rng.choice((500, 502, 503, 504)),
+        )
+
+
+def main():
+    """Число отправок при старом и новом подавлении."""
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 24
+    last_message = None
+    before = 0
+    clock = Clock()
+    digest = ErrorDigest(window=WINDOW, max_window=MAX_WINDOW, clock=clock)
+    after = 0
+    for now, message in outage(hours, random.Random(0)):
+        clock.now = now
+        if message != last_message:
+            before += 1
+            last_message = message
+        after += digest.record(message)
+        after += digest.flush() is not None
+    print(f"Сбой {hours:g} ч, опрос раз в {RETRY_PERIOD // 60} мин:")
+    print(f"  точный повтор последней ошибки: {before} сообщений")
+    print(
+        f"  сводка по окну от {WINDOW // 3600} до {MAX_WINDOW // 3600} ч:"
+        f" {after} сообщений"
+    )
+
+
+if __name__ == "__main__":
+    main()
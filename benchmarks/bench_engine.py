@@ -0,0 +1,81 @@
+"""Бенчмарк многопользовательского движка опроса.
+
+Запуск: python -m benchmarks.bench_engine [число_пользователей]
+
+Сетевой запрос заменён функцией с искусственной задержкой, поэтому
+результат показывает накладные расходы самого движка: сколько
+пользователей обслуживает одно ядро за секунду процессорного времени
+и сколько памяти занимает состояние одного пользователя.
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from homework_bot.engine import PollingEngine
+from homework_bot.tenant import Tenant
+
+LATENCY = 0.005
+CYCLES = 3
+
+
+class NullBot:
+    """Бот, который никуда не отправляет сообщения."""
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        """Пропуск отправки."""
+
+
+def fake_fetch(timestamp, headers):
+    """Ответ API без новых статусов с сетевой задержкой."""
+    time.sleep(LATENCY)
+    return {"homeworks": [], "current_date": timestamp + 1}
+
+
+def make_tenants(count):
+    """Создание пользователей со случайными токенами."""
+    return [Tenant(f"token-{i}", str(i)) for i in range(count)]
+
+
+def measure_memory(count):
+    """Память на одного пользователя в байтах."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tenants = make_tenants(count)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del tenants
+    return (after - before) / count
+
+
+def measure_throughput(count, concurrency):
+    """Пользователей на ядро в секунду и время одного цикла."""
+    engine = PollingEngine(
+        make_tenants(count), NullBot(), concurrency=concurrency,
+        fetch=fake_fetch,
+    )
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    for _ in range(CYCLES):
+        asyncio.run(engine.run_cycle())
+    wall = (time.perf_counter() - wall_started) / CYCLES
+    cpu = time.process_time() - cpu_started
+    engine.close()
+    return count * CYCLES / cpu, wall
+
+
+def main():
+    """Печать результатов для разных уровней параллельности."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    print(f"пользователей: {count}, задержка API: {LATENCY * 1000:.0f} мс")
+    print(f"память на пользователя: {measure_memory(count):.0f} байт")
+    for concurrency in (16, 64, 256):
+        per_core, wall = measure_throughput(count, concurrency)
+        print(
+            f"параллельность {concurrency:>4}: цикл {wall:.2f} с,"
+            f" {per_core:.0f} пользователей/ядро·с"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Рассылка статусов подписчикам: индекс подписок против копий строк.
+
+Запуск: python -m benchmarks.bench_fanout [пользователей] [циклов]
+
+У каждого пользователя одна работа, статус которой меняется каждый
+цикл, и N подписанных чатов. «Индекс» — один пользователь и подписки
+в SubscriptionIndex; «копии» — по строке файла пользователей на каждый
+чат, как приходилось делать без подписок. Печатается число запросов
+к API, подготовленных текстов и отправленных сообщений за прогон.
+"""
+import asyncio
+import logging
+import sys
+import time
+
+import homework
+from homework_bot.engine import PollingEngine
+from homework_bot.subscriptions import SubscriptionIndex
+from homework_bot.tenant import Tenant
+
+
+class CountingBot:
+    """Бот, который только считает сообщения."""
+
+    def __init__(self):
+        """Нулевой счётчик."""
+        self.sent = 0
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        """Учёт сообщения без отправки."""
+        self.sent += 1
+
+
+def make_fetch(counter):
+    """Ответ API с новым статусом работы на каждый запрос."""
+    def fetch(timestamp, headers):
+        counter.append(timestamp)
+        return {"homeworks": [{
+            "id": 1, "homework_name": "hw.zip", "status": "reviewing",
+            "date_updated": 1700000000 + len(counter),
+        }], "current_date": timestamp}
+    return fetch
+
+
+def run(users, subscribers, cycles, indexed):
+    """Запросы, тексты, сообщения и время прогона."""
+    requests = []
+    renders = []
+    format_status = homework.format_status
+
+    def counting_format(name, status):
+        renders.append(name)
+        return format_status(name, status)
+
+    index = SubscriptionIndex()
+    if indexed:
+        tenants = [Tenant(f"token-{user}", f"{user}") for user in range(users)]
+        for tenant in tenants:
+            for number in range(subscribers - 1):
+                index.subscribe(tenant.key, f"{tenant.chat_id}-{number}")
+    else:
+        tenants = [
+            Tenant(f"token-{user}", f"{user}-{number}")
+            for user in range(users) for number in range(subscribers)
+        ]
+    bot = CountingBot()
+    engine = PollingEngine(
+        tenants, bot, concurrency=16, fetch=make_fetch(requests),
+        subscriptions=index,
+    )
+    homework.format_status = counting_format
+    started = time.perf_counter()
+    try:
+        for _ in range(cycles):
+            asyncio.run(engine.run_cycle())
+    finally:
+        homework.format_status = format_status
+        engine.close()
+    return len(requests), len(renders), bot.sent, time.perf_counter() - started
+
+
+def main():
+    """Сравнение для разного числа подписчиков."""
+    logging.disable(logging.CRITICAL)
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    cycles = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    print(f"пользователей: {users}, циклов: {cycles}")
+    for subscribers in (1, 10, 100):
+        for indexed, name in ((True, "индекс"), (False, "копии")):
+            requests, renders, sent, elapsed = run(
+                users, subscribers, cycles, indexed
+            )
+            print(
+                f"чатов на пользователя {subscribers:>3}, {name:<6}:"
+                f" запросов {requests:>6}, текстов {renders:>6},"
+                f" сообщений {sent:>6}, {elapsed:6.2f} с"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Сравнение фиксированного и адаптивного интервала опроса.
+
+Запуск: python -m benchmarks.bench_interval [число_пользователей]
+
+Симулирует неделю жизни пользователей: работы уходят на проверку,
+принимаются или возвращаются на доработку, API иногда недоступен.
+Считает запросы к API, доставленные уведомления и задержку уведомлений.
+"""
+import random
+import sys
+
+import homework
+from homework_bot.interval import AdaptiveInterval
+from homework_bot.records import Homework
+from homework_bot.tenant import Tenant
+
+HOUR = 3600
+WEEK = 7 * 24 * HOUR
+OUTAGE = (3 * 24 * HOUR, 3 * 24 * HOUR + HOUR)
+FAILURE_RATE = 0.01
+
+
+def make_timeline(rng):
+    """События смены статуса одного пользователя за неделю."""
+    events = []
+    now = rng.uniform(0, 48 * HOUR)
+    while now < WEEK:
+        events.append((now, "reviewing"))
+        now += rng.uniform(10 * 60, 3 * HOUR)
+        if rng.random() < 0.4:
+            events.append((now, "rejected"))
+            now += rng.uniform(2 * HOUR, 48 * HOUR)
+        else:
+            events.append((now, "approved"))
+            now += rng.uniform(24 * HOUR, 96 * HOUR)
+    return [event for event in events if event[0] < WEEK]
+
+
+def simulate(timelines, next_interval, rng):
+    """Запросы, уведомления и суммарная задержка для стратегии."""
+    requests = notifications = 0
+    delays = {"reviewing": 0, "verdict": 0}
+    for events in timelines:
+        tenant = Tenant("token", "chat")
+        now = rng.uniform(0, homework.RETRY_PERIOD)
+        seen = 0
+        while now < WEEK:
+            requests += 1
+            outage = OUTAGE[0] <= now < OUTAGE[1]
+            if outage or rng.random() < FAILURE_RATE:
+                tenant.errors += 1
+            else:
+                tenant.errors = 0
+                fresh = [event for event in events[seen:] if event[0] <= now]
+                if fresh:
+                    seen += len(fresh)
+                    notifications += 1
+                    for event_time, status in fresh:
+                        kind = status if status == "reviewing" else "verdict"
+                        delays[kind] += now - event_time
+                    tenant.track([Homework(1, "hw.zip", fresh[-1][1])])
+            now += next_interval(tenant)
+    return requests, notifications, delays
+
+
+def main():
+    """Печать сравнения стратегий."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    rng = random.Random(0)
+    timelines = [make_timeline(rng) for _ in range(count)]
+    events = sum(len(events) for events in timelines)
+    reviews = sum(
+        status == "reviewing" for events in timelines for _, status in events
+    )
+    policy = AdaptiveInterval(homework.RETRY_PERIOD, rng=random.Random(1))
+    strategies = {
+        "фиксированный": lambda tenant: homework.RETRY_PERIOD,
+        "адаптивный": policy.next_interval,
+    }
+    results = {
+        name: simulate(timelines, strategy, random.Random(2))
+        for name, strategy in strategies.items()
+    }
+    print(f"пользователей: {count}, событий за неделю: {events}")
+    for name, (requests, notifications, delays) in results.items():
+        print(
+            f"{name:>14}: запросов {requests}, уведомлений {notifications},"
+            f" запросов на уведомление {requests / notifications:.1f}"
+        )
+        print(
+            f"{'':>14}  задержка: взятие на проверку"
+            f" {delays['reviewing'] / reviews / 60:.1f} мин,"
+            f" вердикт {delays['verdict'] / (events - reviews) / 60:.1f} мин"
+        )
+    fixed, adaptive = results["фиксированный"], results["адаптивный"]
+    print(
+        "сэкономлено запросов на уведомление:"
+        f" {(fixed[0] - adaptive[0]) / adaptive[1]:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
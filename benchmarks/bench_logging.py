@@ -0,0 +1,87 @@
+"""Стоимость журнала на горячем пути при DEBUG и INFO.
+
+Запуск: python -m benchmarks.bench_logging [число_работ] [циклов]
+
+Каждый цикл журналирует ответ API, проверяет его и отрисовывает статусы
+всех работ, как `main()`. Меряется время в потоке опроса и время,
+за которое фоновый слушатель дописывает очередь в файл с ротацией.
+"""
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import homework
+from benchmarks.bench_batch import make_response
+from homework_bot.logs import output_handler, queue_handler
+
+SAMPLING = "api_response=100,check_response=100,parse_status=100"
+
+
+def cycle(response):
+    """Журналирование и обработка одного ответа API."""
+    logging.debug(
+        "Ответ от API: %s", response, extra={"sample": "api_response"}
+    )
+    homework.render_records(homework.check_response(response))
+
+
+def eager_cycle(response):
+    """Цикл с форматированием ответа до проверки уровня, как раньше."""
+    logging.debug(f"Ответ от API: {response}")
+    logging.debug(f"Проверка ответа от API: {response}")
+    homework.check_response(response)
+    for item in response["homeworks"]:
+        logging.debug(f"Парсинг статуса работы: {item}")
+        homework.parse_status(item)
+
+
+def run(name, level, handler, step, response, cycles):
+    """Время цикла в потоке опроса и время дозаписи очереди."""
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    started = time.perf_counter()
+    for _ in range(cycles):
+        step(response)
+    elapsed = time.perf_counter() - started
+    listener = getattr(handler, "listener", None)
+    drained = time.perf_counter()
+    if listener is not None:
+        listener.stop()
+    drained = time.perf_counter() - drained
+    handler.close()
+    print(
+        f"{name:<34} {elapsed / cycles * 1000:8.2f} мс/цикл,"
+        f" дозапись {drained * 1000:8.1f} мс"
+    )
+
+
+def main():
+    """Сравнение синхронного, асинхронного и выборочного журнала."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    cycles = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    response = make_response(count)
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "bot.log")
+        scenarios = (
+            ("DEBUG, f-строки, синхронно", logging.DEBUG,
+             output_handler(path), eager_cycle),
+            ("DEBUG, синхронно", logging.DEBUG, output_handler(path), cycle),
+            ("DEBUG, очередь", logging.DEBUG,
+             queue_handler(output_handler(path), sampling=""), cycle),
+            ("DEBUG, очередь, выборка 1/100", logging.DEBUG,
+             queue_handler(output_handler(path), sampling=SAMPLING), cycle),
+            ("INFO, f-строки", logging.INFO, logging.NullHandler(),
+             eager_cycle),
+            ("INFO", logging.INFO,
+             queue_handler(output_handler(path), sampling=""), cycle),
+        )
+        print(f"{count} работ в ответе, {cycles} циклов")
+        for name, level, handler, step in scenarios:
+            run(name, level, handler, step, response, cycles)
+
+
+if __name__ == "__main__":
+    main()
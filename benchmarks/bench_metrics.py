@@ -0,0 +1,51 @@
+"""Стоимость инструментирования цикла опроса метриками.
+
+Запуск: python -m benchmarks.bench_metrics [число_пользователей]
+
+Меряет время одного наблюдения гистограммы, увеличения счётчика
+с меткой и выдачи всего реестра, когда у каждого пользователя
+своя отметка current_date.
+"""
+import sys
+import time
+
+import homework
+from homework_bot import metrics
+
+OPERATIONS = 200_000
+
+
+def per_operation(action, operations=OPERATIONS):
+    """Среднее время одного вызова `action` в наносекундах."""
+    started = time.perf_counter()
+    for _ in range(operations):
+        action()
+    return (time.perf_counter() - started) / operations * 1e9
+
+
+def main():
+    """Печать стоимости операций с метриками."""
+    tenants = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    histogram = metrics.histogram("bench_latency_seconds")
+    observe = per_operation(lambda: histogram.observe(0.2))
+    error = KeyError("homeworks")
+    count = per_operation(lambda: homework.count_error(error))
+    for number in range(tenants):
+        homework.mark_current_date(f"{number:016x}", 1_700_000_000)
+    mark = per_operation(
+        lambda: homework.mark_current_date("0" * 16, 1_700_000_000)
+    )
+    started = time.perf_counter()
+    text = metrics.render()
+    render = time.perf_counter() - started
+    print(f"observe гистограммы: {observe:.0f} нс")
+    print(f"счётчик ошибок по типу: {count:.0f} нс")
+    print(f"отметка current_date: {mark:.0f} нс")
+    print(
+        f"выдача реестра ({tenants} пользователей, {len(text)} байт):"
+        f" {render * 1000:.1f} мс"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Досылка уведомлений из журнала отправки после сбоя Telegram.
+
+Запуск: python -m benchmarks.bench_outbox [уведомлений] [чатов]
+
+Во время имитированного сбоя уведомления (по умолчанию 20 000 на
+1000 чатов) записываются в журнал пачками, как их пишет движок за
+цикл опроса, и одна попытка досылки упирается в недоступный Telegram.
+После восстановления журнал досылается: с пустой отправкой при разных
+размерах пачки, что показывает накладные расходы самого журнала,
+и через telebot против локальной заглушки Telegram.
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from telebot import TeleBot, apihelper
+
+import homework
+from benchmarks.stubs import TelegramStub
+from homework_bot.outbox import Outbox
+
+CYCLE_SIZE = 10
+HTTP_LIMIT = 2000
+
+
+def fill(path, count, chats):
+    """Журнал с `count` уведомлениями; записей в секунду."""
+    outbox = Outbox(path)
+    started = time.perf_counter()
+    for start in range(0, count, CYCLE_SIZE):
+        outbox.put(
+            (f"bench:{number}", str(number % chats), f"Уведомление {number}")
+            for number in range(start, min(start + CYCLE_SIZE, count))
+        )
+    rate = count / (time.perf_counter() - started)
+    attempts = []
+
+    def unavailable(chat_id, text):
+        attempts.append(chat_id)
+        return False
+
+    outbox.drain(unavailable)
+    outbox.close()
+    return rate, len(attempts)
+
+
+def drain(path, send, batch):
+    """Досылка всего журнала; доставлено и уведомлений в секунду."""
+    outbox = Outbox(path)
+    started = time.perf_counter()
+    delivered = outbox.drain(send, batch=batch)
+    elapsed = time.perf_counter() - started
+    outbox.close()
+    return delivered, delivered / elapsed
+
+
+def main():
+    """Сбой, затем досылка с разными размерами пачки."""
+    logging.disable(logging.CRITICAL)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    chats = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    with tempfile.TemporaryDirectory() as directory:
+        for batch in (1, 50, 500):
+            path = os.path.join(directory, f"outbox-{batch}.db")
+            rate, attempts = fill(path, count, chats)
+            delivered, drained = drain(path, lambda *args: True, batch)
+            print(
+                f"пачка {batch:>3}: запись {rate:8.0f}/с, попыток во время"
+                f" сбоя {attempts}, досылка {delivered} за"
+                f" {delivered / drained:5.2f} с ({drained:8.0f}/с)"
+            )
+        path = os.path.join(directory, "outbox-http.db")
+        fill(path, min(count, HTTP_LIMIT), chats)
+        api_url = apihelper.API_URL
+        with TelegramStub() as telegram:
+            apihelper.API_URL = telegram.api_url
+            bot = TeleBot(token="1234:bench")
+            try:
+                delivered, drained = drain(
+                    path,
+                    lambda chat_id, text: homework.send_chat_message(
+                        bot, chat_id, text
+                    ),
+                    500,
+                )
+            finally:
+                apihelper.API_URL = api_url
+        print(
+            f"через telebot и заглушку Telegram: {delivered} уведомлений,"
+            f" {drained:6.0f}/с"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Сквозной бенчмарк цикла опроса на локальных заглушках API.
+
+Запуск: python -m benchmarks.bench_pipeline [--cycles N] [--homeworks N]
+    [--api-latency С] [--api-errors ДОЛЯ] [--tg-latency С] [--tg-errors ДОЛЯ]
+
+Прогоняет настоящие get_api_answer → check_response → render_records →
+send_message против заглушек API Практикума и Telegram и печатает
+p50/p99 каждого этапа и число циклов в секунду.
+"""
+import argparse
+import logging
+import statistics
+import time
+
+from telebot import TeleBot, apihelper
+
+import homework
+from benchmarks.stubs import PracticumStub, TelegramStub, make_homeworks
+
+STAGES = ("fetch", "validate", "render", "send")
+
+
+def percentile(values, share):
+    """Перцентиль выборки; для одного значения — само значение."""
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[int(share * 100) - 1]
+
+
+def run_cycle(bot, timings):
+    """Один цикл опроса с замером каждого этапа."""
+    started = time.perf_counter()
+    response = homework.get_api_answer(0)
+    fetched = time.perf_counter()
+    records = homework.check_response(response)
+    validated = time.perf_counter()
+    parts = homework.combine_messages(homework.render_records(records))
+    rendered = time.perf_counter()
+    for part in parts:
+        homework.send_message(bot, part)
+    sent = time.perf_counter()
+    for stage, begin, end in zip(
+        STAGES, (started, fetched, validated, rendered),
+        (fetched, validated, rendered, sent),
+    ):
+        timings[stage].append(end - begin)
+
+
+def run(cycles=200, homeworks=1, api_latency=0.0, api_errors=0.0,
+        tg_latency=0.0, tg_errors=0.0):
+    """Прогон `cycles` циклов; тайминги этапов, циклы/с и число ошибок."""
+    timings = {stage: [] for stage in STAGES}
+    errors = 0
+    with PracticumStub(make_homeworks(homeworks), api_latency,
+                       api_errors) as practicum, \
+            TelegramStub(tg_latency, tg_errors) as telegram:
+        saved = homework.ENDPOINT, homework.TELEGRAM_CHAT_ID, apihelper.API_URL
+        homework.ENDPOINT = practicum.url
+        homework.TELEGRAM_CHAT_ID = "1"
+        apihelper.API_URL = telegram.api_url
+        try:
+            bot = TeleBot(token="1234:bench")
+            started = time.perf_counter()
+            for _ in range(cycles):
+                try:
+                    run_cycle(bot, timings)
+                except ConnectionError:
+                    errors += 1
+            elapsed = time.perf_counter() - started
+        finally:
+            (homework.ENDPOINT, homework.TELEGRAM_CHAT_ID,
+             apihelper.API_URL) = saved
+    return timings, cycles / elapsed, errors
+
+
+def report(timings, rate, errors):
+    """Печать перцентилей этапов."""
+    for stage in STAGES:
+        values = timings[stage]
+        print(
+            f"  {stage:>8}: p50 {percentile(values, 0.5) * 1000:8.3f} мс,"
+            f" p99 {percentile(values, 0.99) * 1000:8.3f} мс"
+        )
+    print(f"  циклов/с: {rate:.1f}, ошибок API: {errors}")
+
+
+def main():
+    """Разбор аргументов и запуск."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=200)
+    parser.add_argument("--homeworks", type=int, default=1)
+    parser.add_argument("--api-latency", type=float, default=0.0)
+    parser.add_argument("--api-errors", type=float, default=0.0)
+    parser.add_argument("--tg-latency", type=float, default=0.0)
+    parser.add_argument("--tg-errors", type=float, default=0.0)
+    options = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    report(*run(**vars(options)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Память на отслеживаемую работу: словарь ответа API и запись Homework.
+
+Запуск: python -m benchmarks.bench_records [число_работ]
+
+В обоих случаях ответ декодируется заново, и учитывается только то,
+что остаётся в памяти после освобождения исходного ответа, включая
+строки, на которые ссылаются записи.
+"""
+import json
+import sys
+import tracemalloc
+
+import homework
+from benchmarks.bench_batch import make_response
+
+
+def measure(build):
+    """Память, которую занимает результат `build()`, в байтах."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def main():
+    """Печать байтов на работу для обоих представлений."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    body = json.dumps(make_response(count))
+    dicts = measure(lambda: json.loads(body)["homeworks"])
+    records = measure(lambda: homework.validate_response(json.loads(body)))
+    print(f"работ: {count}")
+    print(f"словарь из ответа API: {dicts / count:.0f} байт/работа")
+    print(f"запись Homework: {records / count:.0f} байт/работа")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Ускоренный прогон недели трафика в виртуальном времени.
+
+Запуск: python -m benchmarks.bench_replay [число_пользователей] [дней]
+
+Записывает синтетический журнал ответов API (работа уходит на проверку,
+затем принимается или отклоняется, иногда API недоступен) и дважды
+воспроизводит его, сравнивая хеши сообщений.
+"""
+import logging
+import os
+import random
+import sys
+import tempfile
+
+from homework_bot.recording import Recorder
+from homework_bot.replay import replay
+from homework_bot.tenant import Tenant
+
+HOUR = 3600
+
+
+def record(path, tenants, days, rng):
+    """Запись синтетического журнала: по записи на пользователя в час."""
+    now = [1_700_000_000.0]
+
+    def fetch(timestamp, headers):
+        roll = rng.random()
+        if roll < 0.01:
+            raise ConnectionError("Эндпоинт недоступен. Код ответа: 502")
+        if roll < 0.9:
+            return {"homeworks": [], "current_date": int(now[0])}
+        return {
+            "homeworks": [{
+                "id": int(now[0]),
+                "homework_name": "hw.zip",
+                "status": rng.choice(("reviewing", "approved", "rejected")),
+            }],
+            "current_date": int(now[0]),
+        }
+
+    recorder = Recorder(fetch, path, clock=lambda: now[0])
+    for _ in range(days * 24):
+        for tenant in tenants:
+            try:
+                recorder(tenant.timestamp, tenant.headers)
+            except ConnectionError:
+                pass
+        now[0] += HOUR
+    recorder.close()
+
+
+def main():
+    """Запись журнала и два воспроизведения."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    logging.disable(logging.CRITICAL)
+    make = lambda: [Tenant(f"token-{i}", str(i)) for i in range(count)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "traffic.jsonl.gz")
+        record(path, make(), days, random.Random(0))
+        size = os.path.getsize(path)
+        first = replay(path, make())
+        second = replay(path, make())
+    print(f"пользователей: {count}, дней: {days}, журнал {size / 1024:.0f} КиБ")
+    for name, value in first.items():
+        print(f"  {name}: {value}")
+    print(f"  детерминирован: {first['digest'] == second['digest']}")
+    print(
+        "  ускорение:"
+        f" {first['virtual_seconds'] / first['real_seconds']:.0f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
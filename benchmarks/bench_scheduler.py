@@ -0,0 +1,61 @@
+"""Микробенчмарк колеса таймеров на миллионе пользователей.
+
+Запуск: python -m benchmarks.bench_scheduler [число_пользователей]
+
+Планирует всех пользователей в пределах RETRY_PERIOD, прокручивает
+колесо до срабатывания каждого и повторно планирует сработавших,
+как это делает движок.
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+import homework
+from homework_bot.scheduler import TimerWheel
+
+
+def fill(count, period):
+    """Колесо с `count` заданиями, равномерно разбросанными по периоду."""
+    wheel = TimerWheel(tick=1, rng=random.Random(0))
+    rng = random.Random(1)
+    for tenant in range(count):
+        wheel.schedule(tenant, rng.uniform(0, period))
+    return wheel
+
+
+def main():
+    """Замер постановки, срабатывания и памяти колеса."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    period = homework.RETRY_PERIOD
+
+    tracemalloc.start()
+    wheel = fill(count, period)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del wheel
+
+    started = time.perf_counter()
+    wheel = fill(count, period)
+    scheduled = time.perf_counter() - started
+
+    fired = 0
+    started = time.perf_counter()
+    for now in range(1, period + 1):
+        due = wheel.advance(now)
+        fired += len(due)
+        for tenant in due:
+            wheel.schedule_after(tenant, period, now)
+    cycle = time.perf_counter() - started
+
+    print(f"пользователей: {count}, тик 1 с, период {period} с")
+    print(f"постановка: {scheduled / count * 1e9:.0f} нс/задание")
+    print(
+        f"срабатывание и перепланирование: {cycle / fired * 1e9:.0f}"
+        f" нс/задание ({fired} за период)"
+    )
+    print(f"память колеса: {memory / count:.0f} байт/задание")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Память и скорость индекса отправленных переходов статуса.
+
+Запуск: python -m benchmarks.bench_seen [число_ключей ...]
+
+Для каждого размера (по умолчанию 1 и 3 миллиона) индекс
+заполняется до ёмкости, затем меряются вставка новых ключей
+с вытеснением, проверка уже отправленных ключей и полный путь
+`SeenIndex.fresh` и `SeenIndex.mark` с вычислением ключа из записи. Память на ключ
+сравнивается с неограниченным `set` тех же ключей.
+"""
+import logging
+import sys
+import time
+import tracemalloc
+
+from homework_bot.records import Homework
+from homework_bot.seen import SeenIndex, seen_key
+
+TENANT = "0123456789abcdef"
+
+
+def keys(start, count):
+    """Ключи переходов для работ с номерами от `start`."""
+    return [hash((TENANT, i, "approved", 1700000000 + i))
+            for i in range(start, start + count)]
+
+
+def bytes_per_key(factory, count):
+    """Память контейнера на один ключ, без самих ключей-чисел."""
+    prepared = keys(0, count)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    container = factory(prepared)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del container
+    return (after - before) / len(prepared)
+
+
+def fill(keys_):
+    """Индекс, заполненный ключами до ёмкости."""
+    index = SeenIndex(capacity=len(keys_))
+    add = index.add
+    for key in keys_:
+        add(key)
+    return index
+
+
+def rate(func, items):
+    """Операций в секунду."""
+    started = time.perf_counter()
+    func(items)
+    return len(items) / (time.perf_counter() - started)
+
+
+def report(count):
+    """Печать результатов для индекса на `count` ключей."""
+    initial = keys(0, count)
+    index_bytes = bytes_per_key(fill, count)
+    set_bytes = bytes_per_key(set, count)
+    index = fill(initial)
+    batch = min(count, 500_000)
+    add = index.add
+
+    def insert(items):
+        for key in items:
+            add(key)
+
+    fresh_keys = keys(count, batch)
+    inserted = rate(insert, fresh_keys)
+    repeated = rate(insert, fresh_keys)
+    records = [Homework(i, f"hw{i}.zip", "approved", 1700000000 + i)
+               for i in range(batch)]
+    fresh_rate = rate(
+        lambda items: index.mark(index.fresh(TENANT, items)[1]), records
+    )
+    print(
+        f"{count:>9} ключей: {index_bytes:5.0f} Б/ключ (set {set_bytes:3.0f}),"
+        f" вставка {inserted / 1e6:4.2f} млн/с,"
+        f" повтор {repeated / 1e6:4.2f} млн/с,"
+        f" fresh()+mark() {fresh_rate / 1e6:4.2f} млн записей/с"
+    )
+
+
+def main():
+    """Прогон для нескольких размеров индекса."""
+    logging.disable(logging.CRITICAL)
+    sizes = [int(size) for size in sys.argv[1:]] or [
+        1_000_000, 3_000_000,
+    ]
+    for count in sizes:
+        report(count)
+
+
+if __name__ == "__main__":
+    main()
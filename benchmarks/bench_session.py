@@ -0,0 +1,54 @@
+"""Задержка get_api_answer с общей сессией и без неё.
+
+Запуск: python -m benchmarks.bench_session [число_запросов]
+
+Заглушка работает по HTTP, поэтому выигрыш показывает только
+экономию на TCP-рукопожатии; с TLS разница больше.
+"""
+import statistics
+import sys
+import time
+
+import homework
+from benchmarks.stubs import PracticumStub
+from homework_bot import session as http_session
+
+
+def measure(count, session):
+    """Задержки последовательных запросов в миллисекундах."""
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        homework.fetch_api_answer(0, homework.HEADERS, session)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def report(title, latencies):
+    """Печать медианы и 99-го перцентиля."""
+    p99 = statistics.quantiles(latencies, n=100)[98]
+    print(
+        f"{title}: p50 {statistics.median(latencies):.3f} мс,"
+        f" p99 {p99:.3f} мс"
+    )
+
+
+def main():
+    """Сравнение requests.get и общей сессии на локальной заглушке."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    with PracticumStub() as stub:
+        homework.ENDPOINT = stub.url
+        report("requests.get", measure(count, None))
+        session = http_session.build_session(pool_size=1)
+        report("общая сессия", measure(count, session))
+        session.close()
+    print(
+        f"новых соединений: {http_session.CONNECTIONS.value}"
+        f" на {http_session.REQUESTS.value} запросов,"
+        f" переиспользование {http_session.reuse_ratio():.1%},"
+        f" рукопожатие {http_session.HANDSHAKES.average * 1000:.3f} мс"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Профиль холодного старта бота до первого вызова get_api_answer.
+
+Запуск: python -m benchmarks.bench_startup [число_импортов]
+
+Повторяет шаги `homework.main()` в свежем интерпретаторе с
+`-X importtime` и печатает время каждого шага и самые дорогие
+импорты верхнего уровня.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+STARTUP = """
+import json, logging, time
+marks = []
+started = time.perf_counter()
+
+def mark(stage):
+    global started
+    now = time.perf_counter()
+    marks.append((stage, now - started))
+    started = now
+
+import homework
+mark("import homework")
+logging.basicConfig(
+    level=homework.logs.LOG_LEVEL, handlers=[homework.logs.queue_handler()]
+)
+mark("настройка журнала")
+homework.check_tokens()
+mark("check_tokens")
+bot = homework.telebot.TeleBot(token=homework.TELEGRAM_TOKEN)
+mark("TeleBot")
+store = homework.open_store()
+mark("open_store")
+homework.exporter.Exporter().start()
+mark("Exporter")
+timestamp = homework.load_timestamp(store)
+mark("load_timestamp")
+homework.requests.get
+mark("загрузка requests")
+print(json.dumps(marks))
+"""
+STUB_ENV = {
+    "TOKEN_PRACT": "token",
+    "TOKEN_TELE_BOT": "0:token",
+    "TELE_CHAT_ID": "1",
+    "LOG_LEVEL": "WARNING",
+}
+
+
+def parse_importtime(stderr):
+    """Импорты верхнего уровня и их суммарное время в секундах."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit() or name.startswith("  "):
+            continue
+        imports.append((name.strip(), int(cumulative) / 1e6))
+    return imports
+
+
+def main():
+    """Печать профиля старта."""
+    top = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    env = {**STUB_ENV, **os.environ}
+    started = time.perf_counter()
+    child = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    wall = time.perf_counter() - started
+    marks = json.loads(child.stdout.splitlines()[-1])
+    measured = sum(seconds for _, seconds in marks)
+    print(f"{'запуск интерпретатора':<24} {(wall - measured) * 1000:7.1f} мс")
+    for stage, seconds in marks:
+        print(f"{stage:<24} {seconds * 1000:7.1f} мс")
+    print(f"{'до первого запроса':<24} {wall * 1000:7.1f} мс")
+    print("\nСамые дорогие импорты верхнего уровня:")
+    imports = sorted(
+        parse_importtime(child.stderr), key=lambda item: item[1],
+        reverse=True,
+    )
+    for name, seconds in imports[:top]:
+        print(f"  {name:<30} {seconds * 1000:7.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Тёплый старт из хранилища состояния.
+
+Запуск: python -m benchmarks.bench_state [число_пользователей]
+
+Записывает отметки и статусы для заданного числа пользователей пакетами,
+затем открывает базу заново и замеряет загрузку всех отметок.
+"""
+import os
+import sys
+import tempfile
+import time
+
+from homework import validate_response
+from homework_bot.state import StateStore
+from homework_bot.tenant import tenant_key
+
+
+def main():
+    """Замер пакетной записи и тёплого старта."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    keys = [tenant_key(f"token-{i}") for i in range(count)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state.db")
+        store = StateStore(path)
+        started = time.perf_counter()
+        for i, key in enumerate(keys):
+            records = validate_response({"homeworks": [
+                {"id": i, "homework_name": "hw.zip", "status": "approved"},
+            ]})
+            store.save(key, 1700000000 + i, records)
+        store.flush()
+        written = time.perf_counter() - started
+        store.close()
+
+        started = time.perf_counter()
+        store = StateStore(path)
+        dates = store.load_dates()
+        resumed = time.perf_counter() - started
+        store.close()
+    assert len(dates) == count
+    print(f"пользователей: {count}")
+    print(f"пакетная запись: {written * 1000:.0f} мс")
+    print(f"тёплый старт: {resumed * 1000:.0f} мс")
+
+
+if __name__ == "__main__":
+    main()
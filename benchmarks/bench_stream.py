@@ -0,0 +1,104 @@
+"""Пиковая память обработки большого ответа API: целиком и потоком.
+
+Запуск: python -m benchmarks.bench_stream [число_работ] [задержка_мс]
+
+Заглушка API отдаёт `число_работ` записей (по умолчанию 100 000).
+Каждый режим запускается в отдельном интерпретаторе, чтобы пиковый
+RSS (VmHWM, а вне Linux ru_maxrss) относился только к нему:
+«целиком» — get_api_answer, check_response и отправка склеенных
+сообщений, «поток» — stream_records с ограниченным буфером между
+чтением и проверкой и склейка сообщений на лету, как при загрузке
+истории.
+Задержка имитирует медленную отправку в Telegram.
+"""
+import json
+import logging
+import os
+import subprocess
+import sys
+
+from benchmarks.stubs import PracticumStub, make_homeworks
+
+MODE = """
+import json, logging, resource, sys, time
+logging.disable(logging.CRITICAL)
+import homework
+from homework_bot.pipeline import chunk_messages
+
+mode, url, delay = sys.argv[1], sys.argv[2], float(sys.argv[3])
+
+
+def peak_rss():
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class SlowBot:
+    def __init__(self):
+        self.sent = 0
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent += 1
+        time.sleep(delay)
+
+
+homework.ENDPOINT = url
+bot = SlowBot()
+baseline = peak_rss()
+started = time.perf_counter()
+if mode == "целиком":
+    response = homework.get_api_answer(0)
+    messages = homework.combine_messages(
+        homework.render_records(homework.check_response(response))
+    )
+    for message in messages:
+        homework.send_chat_message(bot, "1", message)
+else:
+    records = homework.stream_records(0, homework.HEADERS)
+    messages = chunk_messages(
+        (homework.format_status(record.homework_name, record.status)
+         for record in records),
+        homework.MESSAGE_LIMIT,
+    )
+    for message in messages:
+        homework.send_chat_message(bot, "1", message)
+elapsed = time.perf_counter() - started
+peak = peak_rss()
+print(json.dumps([baseline, peak, elapsed, bot.sent]))
+"""
+
+
+def measure(mode, url, delay):
+    """Базовый и пиковый RSS в КиБ, время и число сообщений режима."""
+    env = {"TOKEN_PRACT": "token", **os.environ}
+    child = subprocess.run(
+        [sys.executable, "-c", MODE, mode, url, str(delay)],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    return json.loads(child.stdout.splitlines()[-1])
+
+
+def main():
+    """Сравнение режимов на одном ответе заглушки."""
+    logging.disable(logging.CRITICAL)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    delay = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0
+    with PracticumStub(make_homeworks(count)) as stub:
+        print(f"Работ в ответе: {count}, тело {len(stub.body) >> 20} МиБ")
+        for mode in ("целиком", "поток"):
+            baseline, peak, elapsed, sent = measure(mode, stub.url, delay)
+            print(
+                f"{mode:<8} пик RSS {peak >> 10:5} МиБ"
+                f" (+{(peak - baseline) >> 10} МиБ после импорта),"
+                f" {elapsed:6.2f} с, сообщений: {sent}"
+            )
+
+
+if __name__ == "__main__":
+    main()
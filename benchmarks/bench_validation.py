@@ -0,0 +1,65 @@
+"""Декодирование и проверка больших ответов API.
+
+Запуск: python -m benchmarks.bench_validation
+
+Сравнивает прежний путь (двойное декодирование, проверка ответа
+и разбор каждой работы по словарю) с однократным декодированием
+и собранной по схеме проверкой, для json и, если установлен, orjson.
+"""
+import json
+import logging
+import time
+
+import homework
+from benchmarks.bench_batch import make_response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def legacy(body):
+    """Путь до оптимизации: два json.loads и проверки по словарю."""
+    json.loads(body)
+    response = json.loads(body)
+    if not isinstance(response, dict) or "homeworks" not in response:
+        raise TypeError
+    if not isinstance(response["homeworks"], list):
+        raise TypeError
+    return [homework.parse_status(item) for item in response["homeworks"]]
+
+
+def compiled(loads):
+    """Однократное декодирование и проверка собранной функцией."""
+    def run(body):
+        return homework.render_records(homework.validate_response(loads(body)))
+    return run
+
+
+def best_of(function, body, repeat=5):
+    """Лучшее время из нескольких запусков."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(body)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    """Печать времени обработки ответа для каждого варианта."""
+    logging.disable(logging.CRITICAL)
+    variants = {"прежний путь": legacy, "json + схема": compiled(json.loads)}
+    if orjson is not None:
+        variants["orjson + схема"] = compiled(orjson.loads)
+    for count in (1000, 10000, 100000):
+        body = json.dumps(make_response(count)).encode()
+        print(f"{count} работ, {len(body) / 1024:.0f} КиБ:")
+        for name, function in variants.items():
+            elapsed = best_of(function, body)
+            print(f"  {name:>15}: {elapsed * 1000:8.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Локальные заглушки внешних API для бенчмарков и тестов.
+
+Обе заглушки — многопоточные HTTP-серверы на свободном порту
+с настраиваемой задержкой ответа и долей ошибок.
+"""
+import abc
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STATUSES = ("approved", "reviewing", "rejected")
+
+
+def make_homeworks(count):
+    """Синтетический список работ заданной длины."""
+    return [
+        {
+            "id": i,
+            "homework_name": f"user__hw{i}.zip",
+            "status": STATUSES[i % len(STATUSES)],
+            "reviewer_comment": "Комментарий ревьюера",
+            "date_updated": "2021-04-11T10:31:09Z",
+            "lesson_name": "Проект спринта",
+        }
+        for i in range(count)
+    ]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Обработчик, который отдаёт ответ, подготовленный заглушкой."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        status, body = self.server.stub.respond(self.path)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, format, *args):
+        """Без вывода каждого запроса в stderr."""
+
+
+class StubServer(abc.ABC):
+    """Базовая заглушка: задержка, доля ошибок и фоновый поток.
+
+    Наследник задаёт успешный ответ в `success`.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=0):
+        """Настройка задержки в секундах и доли ответов с ошибкой."""
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+
+    @property
+    def base_url(self):
+        """Адрес сервера."""
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def respond(self, path):
+        """Код и тело ответа на запрос."""
+        with self._lock:
+            self.requests += 1
+            failed = self.random.random() < self.error_rate
+        if self.latency:
+            time.sleep(self.latency)
+        return self.error() if failed else self.success(path)
+
+    @abc.abstractmethod
+    def success(self, path):
+        """Код и тело успешного ответа на запрос к `path`."""
+
+    def error(self):
+        """Ответ с ошибкой."""
+        return 500, b'{"message": "Internal Server Error"}'
+
+    def __enter__(self):
+        """Запуск сервера в фоновом потоке."""
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Остановка сервера."""
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class PracticumStub(StubServer):
+    """Заглушка API Практикума."""
+
+    def __init__(self, homeworks=(), latency=0.0, error_rate=0.0, seed=0,
+                 current_date=1000000000):
+        """Ответ API со списком `homeworks`."""
+        super().__init__(latency, error_rate, seed)
+        self.body = json.dumps({
+            "homeworks": list(homeworks), "current_date": current_date,
+        }).encode()
+
+    @property
+    def url(self):
+        """Адрес эндпоинта заглушки."""
+        return f"{self.base_url}/api/user_api/homework_statuses/"
+
+    def success(self, path):
+        """Ответ со списком работ."""
+        return 200, self.body
+
+
+class TelegramStub(StubServer):
+    """Заглушка Telegram Bot API для метода sendMessage.
+
+    Ошибки отдаются как 429 Too Many Requests с retry_after.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=0, retry_after=1):
+        """Настройка задержки, доли ошибок и retry_after."""
+        super().__init__(latency, error_rate, seed)
+        self.retry_after = retry_after
+        self.messages = 0
+
+    @property
+    def api_url(self):
+        """Шаблон адреса для `telebot.apihelper.API_URL`."""
+        return self.base_url + "/bot{0}/{1}"
+
+    def success(self, path):
+        """Ответ об отправленном сообщении."""
+        with self._lock:
+            self.messages += 1
+            message_id = self.messages
+        body = json.dumps({"ok": True, "result": {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": 1, "type": "private"},
+            "text": "",
+        }})
+        return 200, body.encode()
+
+    def error(self):
+        """Ответ о превышении лимита отправки."""
+        body = json.dumps({
+            "ok": False,
+            "error_code": 429,
+            "description": "Too Many Requests",
+            "parameters": {"retry_after": self.retry_after},
+        })
+        return 429, body.encode()
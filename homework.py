@@ -1,12 +1,31 @@
+import functools
 import logging
 import os
 import sys
 import time
 from http import HTTPStatus
 
-import requests
 from dotenv import load_dotenv
-from telebot import TeleBot, apihelper
+
+from homework_bot import metrics
+from homework_bot.codec import STREAM_CHUNK, ArrayStream, decode_response
+from homework_bot.deadline import Deadline, current_deadline
+from homework_bot.digest import ErrorDigest
+from homework_bot.lazy import lazy_import
+from homework_bot.outbox import open_outbox
+from homework_bot.pipeline import buffered, chunk_messages
+from homework_bot.records import Homework, intern_status, parse_date
+from homework_bot.retry import (API_RETRIES, APIResponseError, RetryPolicy,
+                                parse_retry_after)
+from homework_bot.schema import Field, compile_validator
+from homework_bot.seen import SeenIndex, transitions_key
+from homework_bot.state import open_store
+from homework_bot.tenant import tenant_key
+
+requests = lazy_import("requests")
+telebot = lazy_import("telebot")
+exporter = lazy_import("homework_bot.exporter")
+logs = lazy_import("homework_bot.logs")
 
 load_dotenv()
 
@@ -18,12 +37,35 @@ RETRY_PERIOD = 600
 ENDPOINT = "https://practicum.yandex.ru/api/user_api/homework_statuses/"
 HEADERS = {"Authorization": f"OAuth {PRACTICUM_TOKEN}"}
 
+MESSAGE_LIMIT = 4096
+
 HOMEWORK_VERDICTS = {
     "approved": "Работа проверена: ревьюеру всё понравилось. Ура!",
     "reviewing": "Работа взята на проверку ревьюером.",
     "rejected": "Работа проверена: у ревьюера есть замечания.",
 }
 
+HOMEWORK_FIELDS = (
+    Field("id"),
+    Field("homework_name", required=True),
+    Field("status", required=True, choices=HOMEWORK_VERDICTS,
+          convert=intern_status,
+          unexpected="Неожиданный статус домашней работы: "),
+    Field("date_updated", convert=parse_date),
+    Field("lesson_name"),
+)
+
+validate_response = compile_validator(
+    "homeworks", HOMEWORK_FIELDS, record_type=Homework
+)
+
+POLL_LATENCY = metrics.histogram(
+    "api_request_seconds", "Время запроса к API Практикума"
+)
+SEND_LATENCY = metrics.histogram(
+    "telegram_send_seconds", "Время вызова send_message в Telegram API"
+)
+
 
 def check_tokens():
     """Проверка наличия токенов."""
@@ -39,22 +81,116 @@ def check_tokens():
 
 def send_message(bot, message):
     """Отправка сообщения в Телеграм."""
-    logging.debug(f"Отправка сообщения в Telegram: {message}")
+    return send_chat_message(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_chat_message(bot, chat_id, message):
+    """Отправка сообщения в указанный чат Телеграма; True при успехе."""
+    logging.debug("Отправка сообщения в Telegram: %s", message)
+    started = time.perf_counter()
     try:
-        bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
-        logging.debug(f"Сообщение отправлено в Telegram: {message}")
-    except (apihelper.ApiException, requests.RequestException) as error:
+        bot.send_message(
+            chat_id=chat_id, text=message,
+            timeout=current_deadline().send_timeout(),
+        )
+        SEND_LATENCY.observe(time.perf_counter() - started)
+        logging.debug("Сообщение отправлено в Telegram: %s", message)
+    except (telebot.apihelper.ApiException, requests.RequestException,
+            TimeoutError) as error:
         logging.error(
             f"Ошибка при отправке сообщения в Telegram: {error}"
         )
+        return False
+    return True
+
+
+def deliver(bot, outbox, idempotency, messages):
+    """Отправка уведомлений напрямую или через журнал отправки.
+
+    С журналом уведомления только записываются с ключами
+    `idempotency:чат:номер` и уходят в `drain_outbox`, поэтому при
+    недоступном Telegram они не теряются и не дублируются. Возвращает
+    True, если все уведомления отправлены или записаны в журнал.
+    """
+    if outbox is None:
+        return all([send_message(bot, message) for message in messages])
+    outbox.put(
+        (f"{idempotency}:{TELEGRAM_CHAT_ID}:{number}", TELEGRAM_CHAT_ID,
+         message)
+        for number, message in enumerate(messages)
+    )
+    return True
+
+
+def report_statuses(bot, outbox, seen, key, records):
+    """Уведомления о новых статусах; True, если все они переданы.
+
+    Переходы отмечаются в индексе `seen` только после отправки или
+    записи в журнал, поэтому при сбое следующий опрос повторит их.
+    """
+    fresh, keys = seen.fresh(key, records or ())
+    if not fresh:
+        logging.debug("Новых статусов нет")
+        return True
+    if not deliver(bot, outbox, transitions_key(keys),
+                   combine_messages(render_records(fresh))):
+        return False
+    seen.mark(keys)
+    return True
+
+
+def drain_outbox(bot, outbox):
+    """Отправка недоставленных уведомлений из журнала."""
+    if outbox is not None:
+        outbox.drain(functools.partial(send_chat_message, bot))
 
 
 def get_api_answer(timestamp):
     """Получение данных от API."""
-    logging.debug(f"Запрос к API с параметром from_date: {timestamp}")
+    return fetch_api_answer(timestamp, HEADERS)
+
+
+def fetch_api_answer(timestamp, headers, session=None, retry=None):
+    """Получение данных от API с заголовками конкретного пользователя.
+
+    Если передана сессия, запрос идёт через её пул соединений; если
+    передана политика `retry`, временные ошибки API повторяются.
+    """
+    http_get = requests.get if session is None else session.get
+    if retry is None:
+        homework_statuses = _request_api(http_get, timestamp, headers)
+    else:
+        homework_statuses = retry.call(
+            _request_api, http_get, timestamp, headers
+        )
+    payload = decode_response(homework_statuses)
+    logging.debug(
+        "Ответ от API: %s", payload, extra={"sample": "api_response"}
+    )
+    return payload
+
+
+def stream_api_answer(timestamp, headers, session=None):
+    """Потоковое чтение ответа API: работы выдаются по одной.
+
+    Тело ответа не загружается в память целиком; поле current_date
+    доступно в `fields` потока после чтения всех работ.
+    """
+    http_get = requests.get if session is None else session.get
+    response = _request_api(http_get, timestamp, headers, stream=True)
+    return ArrayStream(
+        response.iter_content(STREAM_CHUNK), "homeworks",
+        close=response.close,
+    )
+
+
+def _request_api(http_get, timestamp, headers, **options):
+    logging.debug("Запрос к API с параметром from_date: %s", timestamp)
+    started = time.perf_counter()
     try:
-        homework_statuses = requests.get(
-            ENDPOINT, headers=HEADERS, params={"from_date": timestamp}
+        homework_statuses = http_get(
+            ENDPOINT, headers=headers, params={"from_date": timestamp},
+            timeout=current_deadline().request_timeout(), **options,
         )
     except requests.RequestException as error:
         raise ConnectionError(
@@ -62,35 +198,45 @@ def get_api_answer(timestamp):
             f"Эндпоинт: {ENDPOINT},"
             f" Параметры: {{'from_date': {timestamp}}}"
         )
+    finally:
+        POLL_LATENCY.observe(time.perf_counter() - started)
     if homework_statuses.status_code != HTTPStatus.OK:
-        raise ConnectionError(
+        response_headers = getattr(homework_statuses, "headers", None) or {}
+        raise APIResponseError(
             f"Эндпоинт {ENDPOINT} недоступен."
             f"Код ответа: {homework_statuses.status_code}"
-            f"Причина: {homework_statuses.reason}"
+            f"Причина: {homework_statuses.reason}",
+            status_code=homework_statuses.status_code,
+            retry_after=parse_retry_after(response_headers.get("Retry-After")),
         )
-    logging.debug(f"Ответ от API: {homework_statuses.json()}")
-    return homework_statuses.json()
+    return homework_statuses
 
 
 def check_response(response):
-    """Проверка ответа от API."""
-    logging.debug(f"Проверка ответа от API: {response}")
-    if not isinstance(response, dict):
-        raise TypeError(f"Ответ от API должен быть словарем,"
-                        f" получен тип: {type(response)}")
-    if "homeworks" not in response:
-        raise KeyError('Отсутствие ключа "homeworks" в ответе API')
-    if not isinstance(response["homeworks"], list):
-        raise TypeError(
-            'Данные под ключом "homeworks" должны быть списком,'
-            f" получен тип: {type(response['homeworks'])}"
-        )
+    """Проверка ответа от API.
+
+    Возвращает список проверенных записей о работах.
+    """
+    logging.debug(
+        "Проверка ответа от API: %s", response,
+        extra={"sample": "check_response"},
+    )
+    records = validate_response(response)
     logging.debug("Проверка ответа от API пройдена успешно")
+    return records
+
+
+def check_homework(homework):
+    """Проверка одной работы из потока ответа API."""
+    return validate_response.item(homework)
 
 
 def parse_status(homework):
     """Парсинг статуса работы."""
-    logging.debug(f"Парсинг статуса работы: {homework}")
+    logging.debug(
+        "Парсинг статуса работы: %s", homework,
+        extra={"sample": "parse_status"},
+    )
     if "homework_name" not in homework:
         raise KeyError('Отсутствие ключа "homework_name" в ответе API')
     homework_name = homework.get("homework_name")
@@ -99,48 +245,132 @@ def parse_status(homework):
     status = homework.get("status")
     if status not in HOMEWORK_VERDICTS:
         raise ValueError(f"Неожиданный статус домашней работы: {status}")
-    verdict = HOMEWORK_VERDICTS.get(homework.get("status"))
-    logging.debug(f"Парсинг статуса работы завершен: {verdict}")
+    message = format_status(homework_name, status)
+    logging.debug(
+        "Парсинг статуса работы завершен: %s", message,
+        extra={"sample": "parse_status"},
+    )
+    return message
+
+
+def format_status(homework_name, status):
+    """Текст уведомления о новом статусе работы."""
+    verdict = HOMEWORK_VERDICTS[status]
     return f'Изменился статус проверки работы "{homework_name}". {verdict}'
 
 
+def render_records(records):
+    """Тексты уведомлений для проверенных записей о работах."""
+    return [
+        format_status(record.homework_name, record.status)
+        for record in records
+    ]
+
+
+def load_timestamp(store):
+    """Отметка from_date из хранилища или текущее время."""
+    now = int(time.time())
+    if store is None:
+        return now
+    return store.get_date(tenant_key(PRACTICUM_TOKEN), now)
+
+
+def save_state(store, timestamp, records):
+    """Сохранение отметки from_date и статусов проверенных записей.
+
+    Передаются только записи, уведомления о которых доставлены.
+    """
+    if store is None:
+        return
+    store.save(tenant_key(PRACTICUM_TOKEN), timestamp, records or ())
+    store.flush()
+
+
+def count_error(error):
+    """Учёт ошибки цикла опроса по типу исключения."""
+    metrics.counter(
+        "poll_errors_total", "Ошибки цикла опроса по типу исключения",
+        labels={"type": type(error).__name__},
+    ).inc()
+
+
+def mark_current_date(key, timestamp):
+    """Последняя успешная отметка current_date пользователя."""
+    metrics.gauge(
+        "tenant_current_date", "Последний успешный current_date из API",
+        labels={"tenant": key},
+    ).set(timestamp)
+
+
+def combine_messages(messages, limit=MESSAGE_LIMIT):
+    """Склейка сообщений в части не длиннее лимита Telegram."""
+    return list(chunk_messages(messages, limit))
+
+
+def stream_records(timestamp, headers, session=None, on_fields=None):
+    """Поток проверенных записей о работах из ответа API.
+
+    Запрос выполняется сразу, в пределах текущего дедлайна; чтение и
+    декодирование тела идут в отдельной стадии с ограниченным буфером.
+    По окончании потока поля ответа вне списка работ передаются
+    в `on_fields`.
+    """
+    stream = stream_api_answer(timestamp, headers, session)
+    return _check_stream(stream, on_fields)
+
+
+def _check_stream(stream, on_fields):
+    for homework in buffered(stream):
+        yield check_homework(homework)
+    if on_fields is not None:
+        on_fields(stream.fields)
+
+
 def main():
     """Основная логика работы бота."""
     check_tokens()
-    bot = TeleBot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
-    last_error_message = None
+    bot = telebot.TeleBot(token=TELEGRAM_TOKEN)
+    store = open_store()
+    outbox = open_outbox()
+    exporter.Exporter().start()
+    key = tenant_key(PRACTICUM_TOKEN)
+    timestamp = load_timestamp(store)
+    errors = ErrorDigest()
+    seen = SeenIndex(store=store)
+    retry = RetryPolicy() if API_RETRIES > 0 else None
 
     while True:
         try:
-            homework_response = get_api_answer(timestamp)
-            check_response(homework_response)
-            homeworks = homework_response.get("homeworks", [])
-            if homeworks:
-                message = parse_status(homeworks[0])
-                send_message(bot, message)
-                last_error_message = None
-            else:
-                logging.debug("Новых статусов нет")
-            timestamp = homework_response.get("current_date", int(time.time()))
+            with Deadline():
+                homework_response = fetch_api_answer(
+                    timestamp, HEADERS, retry=retry
+                )
+                records = check_response(homework_response)
+                delivered = report_statuses(bot, outbox, seen, key, records)
+            if delivered:
+                timestamp = homework_response.get(
+                    "current_date", int(time.time())
+                )
+            save_state(store, timestamp, records if delivered else ())
+            mark_current_date(key, timestamp)
 
         except Exception as error:
+            count_error(error)
             error_message = f"Возникла ошибка: {error}"
             logging.error(error_message)
-            if error_message != last_error_message:
+            if errors.record(error_message):
                 send_message(bot, error_message)
-                last_error_message = error_message
         finally:
+            drain_outbox(bot, outbox)
+            digest = errors.flush()
+            if digest:
+                send_message(bot, digest)
             time.sleep(RETRY_PERIOD)
 
 
 if __name__ == "__main__":
     logging.basicConfig(
-        level=logging.DEBUG,
-        format="%(asctime)s, %(levelname)s, %(message)s,"
-               " %(name)s, %(funcName)s, %(lineno)d",
+        level=logs.LOG_LEVEL, handlers=[logs.queue_handler()]
     )
     logger = logging.getLogger(__name__)
-    handler = logging.StreamHandler(stream=sys.stdout)
-    logger.addHandler(handler)
     main()
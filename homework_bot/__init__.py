@@ -0,0 +1 @@
+"""Многопользовательский режим бота для проверки статусов домашних работ."""
@@ -0,0 +1,123 @@
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from homework_bot import metrics
+
+BACKFILL_BATCH = int(os.getenv("BACKFILL_BATCH", 500))
+BACKFILL_CONCURRENCY = int(os.getenv("BACKFILL_CONCURRENCY", 4))
+
+RECORDS = metrics.counter(
+    "backfill_records_total", "Записи, обработанные загрузкой истории"
+)
+SKIPPED = metrics.counter(
+    "backfill_records_skipped_total",
+    "Записи, уже обработанные до перезапуска загрузки истории",
+)
+
+
+class Backfill:
+    """Загрузка истории работ потоком с контрольными точками.
+
+    Работы читаются из потокового ответа API по одной и обрабатываются
+    пачками по `batch` записей: уведомления записываются в журнал
+    отправки, затем статусы пачки и число обработанных записей
+    сохраняются одной транзакцией, и только после этого журнал
+    досылается. После сбоя загрузка запрашивает ту же историю, но
+    пропускает работы, статус которых уже сохранён; повторная запись
+    уведомлений последней пачки отбрасывается по ключу идемпотентности.
+    """
+
+    def __init__(self, store, stream, deliver, batch=BACKFILL_BATCH,
+                 clock=time.time, drain=None):
+        """Загрузка в `store` через `stream` с доставкой через `deliver`.
+
+        `stream(from_date, headers, on_fields=...)` выдаёт проверенные
+        записи, `deliver(tenant, records)` записывает уведомления о пачке
+        и возвращает True при успехе, а `drain()` досылает записанное
+        после контрольной точки.
+        """
+        self.store = store
+        self.stream = stream
+        self.deliver = deliver
+        self.batch = batch
+        self.clock = clock
+        self.drain = drain
+
+    def run(self, tenant, from_date):
+        """Загрузка истории пользователя; возвращает число новых записей."""
+        checkpoint = self.store.backfill_checkpoint(tenant.key)
+        processed = 0
+        if checkpoint is not None:
+            from_date, processed = checkpoint
+            logging.info(
+                "%s: продолжение загрузки истории с %s, обработано %s",
+                tenant, from_date, processed,
+            )
+        else:
+            self.store.checkpoint_backfill(tenant.key, from_date, 0)
+        known = self.store.last_statuses(tenant.key)
+        fields = {}
+        records = self.stream(
+            from_date, tenant.headers, on_fields=fields.update
+        )
+        batch = []
+        for record in records:
+            if record.id is not None and known.get(record.id) == record.status:
+                SKIPPED.inc()
+                continue
+            batch.append(record)
+            if len(batch) >= self.batch:
+                processed += self._commit(tenant, from_date, processed, batch)
+                batch = []
+        processed += self._commit(tenant, from_date, processed, batch)
+        self.store.finish_backfill(
+            tenant.key, fields.get("current_date", int(self.clock()))
+        )
+        logging.info(
+            "%s: загрузка истории завершена, записей: %s", tenant, processed
+        )
+        return processed
+
+    def _commit(self, tenant, from_date, processed, batch):
+        if not batch:
+            return 0
+        if not self.deliver(tenant, batch):
+            raise ConnectionError("Уведомления загрузки истории не записаны")
+        self.store.save_statuses(tenant.key, batch)
+        self.store.checkpoint_backfill(
+            tenant.key, from_date, processed + len(batch)
+        )
+        if self.drain is not None:
+            self.drain()
+        RECORDS.inc(len(batch))
+        logging.debug(
+            "%s: контрольная точка загрузки истории: %s",
+            tenant, processed + len(batch),
+        )
+        return len(batch)
+
+    def run_all(self, tenants, from_date, concurrency=BACKFILL_CONCURRENCY):
+        """Параллельная загрузка истории пользователей.
+
+        Возвращает пользователей, загрузка которых прервалась ошибкой;
+        их контрольные точки сохранены для следующего запуска.
+        """
+        def attempt(tenant):
+            try:
+                self.run(tenant, from_date)
+            except Exception as error:
+                logging.error(
+                    "%s: загрузка истории прервана: %s", tenant, error
+                )
+                return tenant
+            return None
+
+        with ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="backfill"
+        ) as pool:
+            return [
+                tenant for tenant in pool.map(attempt, tenants)
+                if tenant is not None
+            ]
@@ -0,0 +1,135 @@
+import logging
+import os
+import threading
+import time
+
+from homework_bot import metrics
+from homework_bot.retry import RetryPolicy
+
+BREAKER_THRESHOLD = int(os.getenv("BREAKER_THRESHOLD", 5))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", 60))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_CODES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitOpenError(ConnectionError):
+    """Запрос не отправлен: эндпоинт считается недоступным."""
+
+
+class CircuitBreaker:
+    """Автомат closed → open → half-open для одного эндпоинта.
+
+    После `threshold` ошибок соединения подряд запросы отклоняются
+    без обращения к сети. Через `cooldown` секунд пропускается один
+    пробный запрос: успех закрывает автомат, ошибка снова открывает.
+    """
+
+    def __init__(self, endpoint, threshold=BREAKER_THRESHOLD,
+                 cooldown=BREAKER_COOLDOWN, clock=time.monotonic):
+        """Закрытый автомат для эндпоинта."""
+        self.endpoint = endpoint
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        labels = {"endpoint": endpoint}
+        self._state_gauge = metrics.gauge(
+            "circuit_state", "Состояние автомата: 0 closed, 1 open,"
+            " 2 half-open", labels,
+        )
+        self._rejected = metrics.counter(
+            "circuit_rejected_total",
+            "Запросы, отклонённые открытым автоматом", labels,
+        )
+
+    def _transition(self, state):
+        logging.warning(
+            "Автомат для %s: %s → %s", self.endpoint, self.state, state
+        )
+        self.state = state
+        self._state_gauge.set(STATE_CODES[state])
+        metrics.counter(
+            "circuit_transitions_total", "Переходы автомата между состояниями",
+            {"endpoint": self.endpoint, "state": state},
+        ).inc()
+
+    def before_call(self):
+        """Разрешение на запрос или CircuitOpenError."""
+        with self._lock:
+            if self.state == OPEN:
+                if self.clock() - self.opened_at >= self.cooldown:
+                    self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            self._rejected.inc()
+        raise CircuitOpenError(
+            f"Эндпоинт {self.endpoint} недоступен,"
+            f" запросы приостановлены на {self.cooldown:g} с"
+        )
+
+    def record_success(self):
+        """Эндпоинт ответил: автомат закрывается."""
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self):
+        """Ошибка соединения: после порога или пробы автомат открывается."""
+        with self._lock:
+            self.failures += 1
+            probe_failed = self._probing
+            self._probing = False
+            if probe_failed or (
+                self.state == CLOSED and self.failures >= self.threshold
+            ):
+                self.opened_at = self.clock()
+                self._transition(OPEN)
+
+    def call(self, func, *args, **kwargs):
+        """Вызов `func` под защитой автомата.
+
+        Сетевые ошибки, TimeoutError, в том числе исчерпанный бюджет
+        цикла, и временные ответы 429 и 5xx считаются недоступностью
+        эндпоинта. Остальные ошибки, например 401 из-за отозванного
+        токена одного пользователя, означают, что эндпоинт ответил.
+        """
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except (ConnectionError, TimeoutError) as error:
+            if RetryPolicy.reason(error) is None:
+                self.record_success()
+            else:
+                self.record_failure()
+            raise
+        except Exception:
+            self.record_success()
+            raise
+        self.record_success()
+        return result
+
+
+def breaker_for(endpoint, **options):
+    """Общий для всех пользователей автомат эндпоинта."""
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker(
+                endpoint, **options
+            )
+        return breaker
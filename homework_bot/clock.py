@@ -0,0 +1,47 @@
+import asyncio
+import time
+
+
+class SystemClock:
+    """Настоящее время и настоящие паузы."""
+
+    synchronous = False
+
+    def time(self):
+        """Unix-время в секундах."""
+        return time.time()
+
+    def monotonic(self):
+        """Монотонное время для расписания."""
+        return time.monotonic()
+
+    async def sleep(self, seconds):
+        """Пауза цикла событий."""
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock:
+    """Виртуальное время: пауза мгновенно сдвигает часы.
+
+    Движок с такими часами выполняет опросы тика последовательно
+    в своём потоке, прежде чем двигать время дальше, поэтому прогон
+    детерминирован и не ждёт настоящего времени.
+    """
+
+    synchronous = True
+
+    def __init__(self, start=0.0):
+        """Часы, показывающие `start`."""
+        self.now = start
+
+    def time(self):
+        """Текущее виртуальное Unix-время."""
+        return self.now
+
+    def monotonic(self):
+        """То же виртуальное время."""
+        return self.now
+
+    async def sleep(self, seconds):
+        """Сдвиг часов без ожидания и без переключения задач."""
+        self.now += seconds
@@ -0,0 +1,133 @@
+import codecs
+import json
+import logging
+import os
+import re
+
+JSON_BACKEND = os.getenv("JSON_BACKEND", "json")
+STREAM_CHUNK = int(os.getenv("STREAM_CHUNK", 65536))
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+def _load_fast_backend(name):
+    if name == "json":
+        return None
+    try:
+        module = __import__(name)
+    except ImportError:
+        logging.warning(
+            f"JSON-библиотека {name} не установлена, используется json"
+        )
+        return None
+    return module.loads
+
+
+_fast_loads = _load_fast_backend(JSON_BACKEND)
+
+
+def decode_response(response):
+    """Однократное декодирование JSON-тела ответа.
+
+    Если в JSON_BACKEND указана установленная библиотека (orjson, ujson),
+    тело декодируется ею, иначе стандартным `response.json()`.
+    """
+    if _fast_loads is None:
+        return response.json()
+    return _fast_loads(response.content)
+
+
+class ArrayStream:
+    """Потоковое декодирование JSON-объекта с большим списком.
+
+    Элементы списка `key` выдаются по одному по мере чтения `chunks`,
+    в памяти держится только недочитанный остаток. После полного
+    чтения остальные поля объекта доступны в `fields`.
+    """
+
+    def __init__(self, chunks, key, close=None):
+        """Поток по кускам байтов `chunks`; `close` вызывается в конце."""
+        self.chunks = iter(chunks)
+        self.key = key
+        self.close = close
+        self.fields = None
+        self._start = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+
+    def _read(self):
+        self._buffer = self._buffer[self._position:]
+        self._position = 0
+        for chunk in self.chunks:
+            if chunk:
+                self._buffer += self._text.decode(chunk)
+                return True
+        if not self._eof:
+            self._buffer += self._text.decode(b"", final=True)
+            self._eof = True
+        return False
+
+    def __iter__(self):
+        """Элементы списка по одному."""
+        try:
+            match = self._start.search(self._buffer)
+            while match is None and self._read():
+                match = self._start.search(self._buffer)
+            if match is None:
+                self._missing()
+            prefix = self._buffer[:match.end() - 1]
+            self._position = match.end()
+            yield from self._items()
+            while self._read():
+                pass
+            self.fields = json.loads(prefix + "[]" + self._buffer)
+            del self.fields[self.key]
+        finally:
+            if self.close is not None:
+                self.close()
+
+    def _items(self):
+        decoder = json.JSONDecoder()
+        expect_item = True
+        while True:
+            position = _WHITESPACE.match(self._buffer, self._position).end()
+            self._position = position
+            if position == len(self._buffer):
+                if not self._read():
+                    raise ValueError("Ответ API оборван внутри списка")
+                continue
+            char = self._buffer[position]
+            if char == "]":
+                self._position = position + 1
+                return
+            if char == "," and not expect_item:
+                self._position = position + 1
+                expect_item = True
+                continue
+            try:
+                item, end = decoder.raw_decode(self._buffer, position)
+            except json.JSONDecodeError:
+                if not self._read():
+                    raise
+                continue
+            if end == len(self._buffer) and self._read():
+                continue
+            self._position = end
+            expect_item = False
+            yield item
+
+    def _missing(self):
+        payload = json.loads(self._buffer)
+        if not isinstance(payload, dict):
+            raise TypeError(
+                f"Ответ от API должен быть словарем, получен тип: "
+                f"{type(payload)}"
+            )
+        if self.key not in payload:
+            raise KeyError(f'Отсутствие ключа "{self.key}" в ответе API')
+        raise TypeError(
+            f'Данные под ключом "{self.key}" должны быть списком, '
+            f"получен тип: {type(payload[self.key])}"
+        )
@@ -0,0 +1,209 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from homework_bot import metrics
+from homework_bot.deadline import Deadline
+
+BOT_COMMANDS = os.getenv("BOT_COMMANDS", "1") != "0"
+COMMAND_CACHE_TTL = float(os.getenv("COMMAND_CACHE_TTL", 60))
+COMMAND_CACHE_SIZE = int(os.getenv("COMMAND_CACHE_SIZE", 1024))
+HISTORY_LIMIT = 30
+
+CACHE_HITS = metrics.counter(
+    "command_cache_hits_total", "Ответы на команды из кэша"
+)
+CACHE_MISSES = metrics.counter(
+    "command_cache_misses_total", "Команды, для которых понадобился запрос"
+)
+COALESCED = metrics.counter(
+    "command_requests_coalesced_total",
+    "Команды, дождавшиеся уже идущего запроса к API",
+)
+
+
+class TTLCache:
+    """Кэш со сроком жизни записей и вытеснением давно не читанных."""
+
+    def __init__(self, ttl=COMMAND_CACHE_TTL, capacity=COMMAND_CACHE_SIZE,
+                 clock=time.monotonic):
+        """Пустой кэш на `capacity` записей по `ttl` секунд."""
+        self.ttl = ttl
+        self.capacity = capacity
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Число записей, включая устаревшие."""
+        return len(self._entries)
+
+    def get(self, key):
+        """Значение или None, если записи нет или она устарела."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if self.clock() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Запись значения на `ttl` секунд."""
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """Удаление записи, если она есть."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Один вызов на ключ: параллельные вызовы ждут его результата."""
+
+    def __init__(self):
+        """Пустая таблица идущих вызовов."""
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """Результат `func()` или ожидание уже идущего вызова с ключом."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            COALESCED.inc()
+            call.done.wait()
+        else:
+            try:
+                call.result = func()
+            except Exception as error:
+                call.error = error
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+class CommandHandler:
+    """Ответы на /status и /history по последнему полному ответу API.
+
+    Ответ хранится в кэше на пользователя; при промахе параллельные
+    команды одного пользователя делают один общий запрос к API. Если
+    на один чат приходятся несколько пользователей, отвечают все.
+    """
+
+    def __init__(self, tenants, fetch, validate, verdicts, cache=None,
+                 flight=None):
+        """Обработчик для пользователей с функциями запроса и проверки."""
+        self.tenants = {tenant.key: tenant for tenant in tenants}
+        self.chats = {}
+        for tenant in self.tenants.values():
+            self.chats.setdefault(str(tenant.chat_id), []).append(tenant)
+        self.fetch = fetch
+        self.validate = validate
+        self.verdicts = verdicts
+        self.cache = cache or TTLCache()
+        self.flight = flight or SingleFlight()
+
+    def invalidate(self, tenant):
+        """Сброс кэша пользователя после изменения статусов."""
+        self.cache.invalidate(tenant.key)
+
+    def records(self, tenant):
+        """Все работы пользователя из кэша или из API."""
+        records = self.cache.get(tenant.key)
+        if records is not None:
+            CACHE_HITS.inc()
+            return records
+        CACHE_MISSES.inc()
+        return self.flight.do(tenant.key, lambda: self._load(tenant))
+
+    def _load(self, tenant):
+        with Deadline():
+            records = tuple(self.validate(self.fetch(0, tenant.headers)))
+        self.cache.set(tenant.key, records)
+        return records
+
+    def _describe(self, record):
+        verdict = self.verdicts.get(record.status, record.status)
+        return f'"{record.homework_name}": {verdict}'
+
+    def status(self, records):
+        """Текст ответа на /status: последняя обновлённая работа."""
+        if not records:
+            return "Работ на проверке пока нет."
+        latest = max(records, key=lambda record: record.date_updated or 0)
+        return f"Последняя работа {self._describe(latest)}"
+
+    def history(self, records):
+        """Текст ответа на /history: работы по дате обновления."""
+        if not records:
+            return "Работ на проверке пока нет."
+        ordered = sorted(records, key=lambda record: record.date_updated or 0)
+        lines = [
+            f"{_format_date(record.date_updated)} {self._describe(record)}"
+            for record in ordered[-HISTORY_LIMIT:]
+        ]
+        return "\n".join(lines)
+
+    def answer(self, chat_id, command):
+        """Текст ответа на команду из чата."""
+        tenants = self.chats.get(str(chat_id))
+        if not tenants:
+            return "Этот чат не подписан на уведомления о проверке работ."
+        return "\n\n".join(
+            self._answer(tenant, command) for tenant in tenants
+        )
+
+    def _answer(self, tenant, command):
+        try:
+            records = self.records(tenant)
+        except Exception as error:
+            logging.error("%s: ошибка ответа на /%s: %s", tenant, command,
+                          error)
+            return f"Не удалось получить статус: {error}"
+        if command == "history":
+            return self.history(records)
+        return self.status(records)
+
+
+def _format_date(timestamp):
+    if timestamp is None:
+        return "—"
+    return time.strftime("%d.%m.%Y %H:%M", time.gmtime(timestamp))
+
+
+def register_commands(bot, handler, send):
+    """Подписка бота на /status и /history с отправкой ответа через `send`."""
+
+    @bot.message_handler(commands=["status", "history"])
+    def on_command(message):
+        chat_id = str(message.chat.id)
+        command = message.text.split()[0].lstrip("/").split("@")[0]
+        send(chat_id, handler.answer(chat_id, command))
+
+    return on_command
@@ -0,0 +1,82 @@
+import contextvars
+import logging
+import os
+import time
+
+from homework_bot import metrics
+
+CYCLE_BUDGET = float(os.getenv("CYCLE_BUDGET", 60))
+CONNECT_TIMEOUT = float(os.getenv("CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.getenv("READ_TIMEOUT", 30))
+SEND_TIMEOUT = float(os.getenv("SEND_TIMEOUT", 20))
+
+OVERRUNS = metrics.counter(
+    "cycle_overruns_total", "Циклы опроса, превысившие бюджет времени"
+)
+
+_current = contextvars.ContextVar("deadline", default=None)
+
+
+class Deadline:
+    """Бюджет времени на цикл запрос → проверка → уведомление.
+
+    Внутри блока `with` дедлайн доступен через `current_deadline()`,
+    и каждый этап получает таймаут не больше оставшегося времени.
+    """
+
+    def __init__(self, budget=CYCLE_BUDGET, connect=CONNECT_TIMEOUT,
+                 read=READ_TIMEOUT, send=SEND_TIMEOUT, clock=time.monotonic):
+        """Старт отсчёта бюджета."""
+        self.budget = budget
+        self.connect = connect
+        self.read = read
+        self.send = send
+        self.clock = clock
+        self.expires_at = clock() + budget
+        self._token = None
+
+    def remaining(self):
+        """Оставшееся время в секундах."""
+        return self.expires_at - self.clock()
+
+    @property
+    def expired(self):
+        """Истёк ли бюджет."""
+        return self.remaining() <= 0
+
+    def _stage_timeout(self, limit, stage):
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise TimeoutError(
+                f"Бюджет цикла {self.budget} с исчерпан перед этапом {stage}"
+            )
+        return min(limit, remaining)
+
+    def request_timeout(self):
+        """Таймауты (connect, read) для запроса к API."""
+        return (
+            self._stage_timeout(self.connect, "запроса к API"),
+            self._stage_timeout(self.read, "чтения ответа API"),
+        )
+
+    def send_timeout(self):
+        """Таймаут отправки сообщения в Telegram."""
+        return self._stage_timeout(self.send, "отправки в Telegram")
+
+    def __enter__(self):
+        """Установка дедлайна текущим для вложенных вызовов."""
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        """Учёт превышения бюджета."""
+        _current.reset(self._token)
+        if self.expired:
+            OVERRUNS.inc()
+            logging.warning(f"Цикл опроса превысил бюджет {self.budget} с")
+
+
+def current_deadline():
+    """Дедлайн текущего цикла или новый, если цикл его не задал."""
+    deadline = _current.get()
+    return deadline if deadline is not None else Deadline()
@@ -0,0 +1,117 @@
+import os
+import re
+import time
+from collections import OrderedDict
+
+from homework_bot import metrics
+
+ERROR_DIGEST_WINDOW = float(os.getenv("ERROR_DIGEST_WINDOW", 3600))
+ERROR_DIGEST_MAX_WINDOW = float(os.getenv("ERROR_DIGEST_MAX_WINDOW", 86400))
+ERROR_DIGEST_SIZE = int(os.getenv("ERROR_DIGEST_SIZE", 32))
+DIGEST_LINES = 10
+SAMPLE_LENGTH = 300
+
+_VARIABLE = re.compile(r"0x[0-9a-fA-F]+|[0-9a-fA-F]{8,}|\d+(?:[.:]\d+)*")
+_SPACES = re.compile(r"\s+")
+
+SUPPRESSED = metrics.counter(
+    "error_notifications_suppressed_total",
+    "Ошибки, попавшие в сводку вместо отдельного сообщения",
+)
+DIGESTS = metrics.counter(
+    "error_digests_total", "Отправленные сводки ошибок"
+)
+
+
+def signature(message):
+    """Текст ошибки без чисел, дат и идентификаторов."""
+    return _SPACES.sub(" ", _VARIABLE.sub("#", message)).strip()
+
+
+class _Entry:
+    __slots__ = ("count", "message", "last_seen")
+
+    def __init__(self, message, now):
+        self.count = 0
+        self.message = message
+        self.last_seen = now
+
+
+class ErrorDigest:
+    """Окно агрегации ошибок одного чата.
+
+    Ошибка с новой сигнатурой отправляется сразу, повторы только
+    считаются и по окончании окна уходят одной сводкой. Пока повторы
+    идут, окно удваивается от `window` до `max_window` секунд, а после
+    тихого окна возвращается к `window`. Таблица сигнатур ограничена
+    `capacity` записями и вытесняет самые давние.
+    """
+
+    def __init__(self, window=ERROR_DIGEST_WINDOW,
+                 max_window=ERROR_DIGEST_MAX_WINDOW,
+                 capacity=ERROR_DIGEST_SIZE, clock=time.monotonic):
+        """Пустая таблица с началом окна в текущий момент."""
+        self.window = window
+        self.max_window = max(window, max_window)
+        self.current_window = window
+        self.capacity = capacity
+        self.clock = clock
+        self.started = clock()
+        self.entries = OrderedDict()
+        self.evicted = 0
+
+    def __len__(self):
+        """Число известных сигнатур."""
+        return len(self.entries)
+
+    def record(self, message):
+        """Учёт ошибки; True, если о ней нужно сообщить сразу."""
+        now = self.clock()
+        key = signature(message)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.entries[key] = _Entry(message, now)
+            if len(self.entries) > self.capacity:
+                _, oldest = self.entries.popitem(last=False)
+                self.evicted += oldest.count
+            return True
+        self.entries.move_to_end(key)
+        entry.count += 1
+        entry.message = message
+        entry.last_seen = now
+        SUPPRESSED.inc()
+        return False
+
+    def flush(self):
+        """Текст сводки, если окно закончилось и были повторы."""
+        now = self.clock()
+        if now - self.started < self.current_window:
+            return None
+        minutes = (now - self.started) / 60
+        self.started = now
+        repeated = sorted(
+            (entry for entry in self.entries.values() if entry.count),
+            key=lambda entry: entry.count, reverse=True,
+        )
+        rest = self.evicted + sum(
+            entry.count for entry in repeated[DIGEST_LINES:]
+        )
+        lines = [
+            f"{entry.count} × {entry.message[:SAMPLE_LENGTH]}"
+            for entry in repeated[:DIGEST_LINES]
+        ]
+        for key, entry in list(self.entries.items()):
+            entry.count = 0
+            if now - entry.last_seen >= self.current_window:
+                del self.entries[key]
+        self.evicted = 0
+        if rest:
+            lines.append(f"Других повторов: {rest}")
+        if not lines:
+            self.current_window = self.window
+            return None
+        self.current_window = min(self.current_window * 2, self.max_window)
+        DIGESTS.inc()
+        return "\n".join(
+            [f"Сводка повторяющихся ошибок за {minutes:.0f} мин:", *lines]
+        )
@@ -0,0 +1,236 @@
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import requests
+from telebot import apihelper
+
+from homework_bot import metrics
+from homework_bot.deadline import SEND_TIMEOUT
+
+GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", 30))
+CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", 1))
+QUEUE_SIZE = int(os.getenv("DISPATCH_QUEUE_SIZE", 10000))
+TOO_MANY_REQUESTS = 429
+
+QUEUE_DEPTH = metrics.gauge(
+    "dispatch_queue_depth", "Сообщения в очереди на отправку"
+)
+SEND_LATENCY = metrics.histogram(
+    "telegram_send_seconds", "Время вызова send_message в Telegram API"
+)
+DISPATCH_DELAY = metrics.summary(
+    "dispatch_delay_seconds", "Время от постановки в очередь до отправки"
+)
+THROTTLED = metrics.counter(
+    "telegram_throttled_total", "Ответы Telegram 429 Too Many Requests"
+)
+FAILED = metrics.counter(
+    "telegram_send_failed_total", "Сообщения, которые не удалось отправить"
+)
+
+
+class TokenBucket:
+    """Ограничитель частоты: `rate` токенов в секунду, запас `capacity`."""
+
+    def __init__(self, rate, capacity=1, clock=time.monotonic):
+        """Создание ведра с полным запасом токенов."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+
+    def delay(self, now=None):
+        """Через сколько секунд будет доступен токен."""
+        now = self.clock() if now is None else now
+        self._refill(now)
+        if self.updated > now:
+            return self.updated - now + max(0, 1 - self.tokens) / self.rate
+        return max(0, 1 - self.tokens) / self.rate
+
+    def consume(self, now=None):
+        """Списание одного токена."""
+        self._refill(self.clock() if now is None else now)
+        self.tokens -= 1
+
+    def pause(self, seconds, now=None):
+        """Запрет отправки на `seconds` секунд, например по retry_after."""
+        now = self.clock() if now is None else now
+        self.tokens = 1
+        self.updated = max(self.updated, now + seconds)
+
+
+class Dispatcher:
+    """Фоновая отправка сообщений в Telegram с ограничением частоты.
+
+    Общее ведро ограничивает частоту для всего бота, ведро каждого чата —
+    частоту для чата. Ожидание одного чата не задерживает остальные.
+    При переполнении очереди `submit` блокируется.
+    """
+
+    def __init__(self, bot, global_rate=GLOBAL_RATE, chat_rate=CHAT_RATE,
+                 maxsize=QUEUE_SIZE, clock=time.monotonic):
+        """Настройка ограничений; поток запускается в `start()`."""
+        self.bot = bot
+        self.chat_rate = chat_rate
+        self.maxsize = maxsize
+        self.clock = clock
+        self._global = TokenBucket(global_rate, max(1, global_rate), clock)
+        self._buckets = {}
+        self._queues = {}
+        self._ready = []
+        self._order = itertools.count()
+        self._size = 0
+        self._stopping = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name="dispatcher", daemon=True
+        )
+
+    def start(self):
+        """Запуск фонового потока отправки."""
+        self._thread.start()
+        return self
+
+    def submit(self, chat_id, text, timeout=None, on_done=None):
+        """Постановка сообщения в очередь; False, если не дождались места.
+
+        `on_done(доставлено)` вызывается из потока отправки после
+        успешной отправки или окончательной ошибки.
+        """
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._size < self.maxsize, timeout
+            ):
+                return False
+            self._push(chat_id, (text, self.clock(), on_done))
+            return True
+
+    def _push(self, chat_id, item, front=False):
+        queue = self._queues.get(chat_id)
+        if queue is None:
+            queue = self._queues[chat_id] = deque()
+        if not queue:
+            self._schedule(chat_id)
+        if front:
+            queue.appendleft(item)
+        else:
+            queue.append(item)
+        self._size += 1
+        QUEUE_DEPTH.set(self._size)
+        self._cond.notify_all()
+
+    def _bucket(self, chat_id):
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._buckets[chat_id] = TokenBucket(
+                self.chat_rate, 1, self.clock
+            )
+        return bucket
+
+    def _schedule(self, chat_id):
+        ready_at = self.clock() + self._bucket(chat_id).delay()
+        heapq.heappush(self._ready, (ready_at, next(self._order), chat_id))
+
+    def _take(self):
+        with self._cond:
+            while True:
+                if not self._ready:
+                    if self._stopping:
+                        return None
+                    self._cond.wait()
+                    continue
+                now = self.clock()
+                ready_at, _, chat_id = self._ready[0]
+                wait = max(ready_at - now, self._global.delay(now))
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                heapq.heappop(self._ready)
+                bucket = self._bucket(chat_id)
+                delay = bucket.delay(now)
+                if delay > 0:
+                    heapq.heappush(
+                        self._ready, (now + delay, next(self._order), chat_id)
+                    )
+                    continue
+                queue = self._queues[chat_id]
+                item = queue.popleft()
+                bucket.consume(now)
+                self._global.consume(now)
+                if queue:
+                    self._schedule(chat_id)
+                else:
+                    del self._queues[chat_id]
+                self._size -= 1
+                QUEUE_DEPTH.set(self._size)
+                self._cond.notify_all()
+                return chat_id, item
+
+    def _run(self):
+        while True:
+            task = self._take()
+            if task is None:
+                return
+            self._send(*task)
+
+    def _send(self, chat_id, item):
+        text, enqueued_at, on_done = item
+        started = self.clock()
+        try:
+            self.bot.send_message(
+                chat_id=chat_id, text=text, timeout=SEND_TIMEOUT
+            )
+        except apihelper.ApiTelegramException as error:
+            if error.error_code != TOO_MANY_REQUESTS:
+                self._fail(chat_id, error, on_done)
+                return
+            retry_after = error.result_json.get(
+                "parameters", {}
+            ).get("retry_after", 1)
+            THROTTLED.inc()
+            logging.warning(
+                f"Telegram ограничил отправку в чат {chat_id},"
+                f" повтор через {retry_after} с"
+            )
+            with self._cond:
+                self._bucket(chat_id).pause(retry_after)
+                self._push(chat_id, item, front=True)
+            return
+        except (apihelper.ApiException, requests.RequestException) as error:
+            self._fail(chat_id, error, on_done)
+            return
+        finished = self.clock()
+        SEND_LATENCY.observe(finished - started)
+        DISPATCH_DELAY.observe(finished - enqueued_at)
+        logging.debug("Сообщение отправлено в чат %s", chat_id)
+        if on_done is not None:
+            on_done(True)
+
+    def _fail(self, chat_id, error, on_done):
+        FAILED.inc()
+        if on_done is not None:
+            on_done(False)
+        logging.error(
+            f"Ошибка при отправке сообщения в Telegram"
+            f" в чат {chat_id}: {error}"
+        )
+
+    def stop(self, timeout=None):
+        """Отправка оставшихся сообщений и остановка потока."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
@@ -0,0 +1,473 @@
+import argparse
+import asyncio
+import functools
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import homework
+from homework_bot.backfill import BACKFILL_CONCURRENCY, Backfill
+from homework_bot.breaker import BREAKER_THRESHOLD, breaker_for
+from homework_bot.clock import SystemClock
+from homework_bot.commands import (BOT_COMMANDS, CommandHandler,
+                                   register_commands)
+from homework_bot.deadline import SEND_TIMEOUT, Deadline
+from homework_bot.digest import ErrorDigest
+from homework_bot.interval import AdaptiveInterval
+from homework_bot.lazy import lazy_import
+from homework_bot.outbox import OUTBOX_BATCH, open_outbox
+from homework_bot.records import parse_date
+from homework_bot.retry import API_RETRIES, RetryPolicy
+from homework_bot.scheduler import SCHEDULER_TICK, TimerWheel
+from homework_bot.seen import SeenIndex, transitions_key
+from homework_bot.subscriptions import (DELIVERIES, SubscriptionIndex,
+                                        load_subscriptions, merge_tenants)
+from homework_bot.state import open_store
+from homework_bot.tenant import Tenant, load_tenants
+
+telebot = lazy_import("telebot")
+dispatcher = lazy_import("homework_bot.dispatcher")
+exporter = lazy_import("homework_bot.exporter")
+logs = lazy_import("homework_bot.logs")
+recording = lazy_import("homework_bot.recording")
+session = lazy_import("homework_bot.session")
+
+CONCURRENCY = int(os.getenv("ENGINE_CONCURRENCY", 64))
+TENANTS_FILE = os.getenv("TENANTS_FILE", "tenants.csv")
+
+
+class PollingEngine:
+    """Опрос API для множества пользователей из одного процесса.
+
+    Сетевые запросы блокирующие, поэтому выполняются в пуле потоков,
+    размер которого ограничивает число одновременных запросов к API.
+    """
+
+    def __init__(self, tenants, bot, concurrency=CONCURRENCY,
+                 retry_period=homework.RETRY_PERIOD, fetch=None, store=None,
+                 dispatcher=None, policy=None, clock=None, rng=None,
+                 breaker=None, retry=None, commands=None, seen=None,
+                 outbox=None, subscriptions=None):
+        """Настройка движка для списка пользователей.
+
+        Если передано хранилище, отметки from_date восстанавливаются
+        из него и сохраняются после каждого цикла. Если передан
+        диспетчер, сообщения отправляются через его очередь. Интервал
+        между опросами пользователя определяет `policy`. Часы `clock`
+        и генератор случайных чисел `rng` подменяются для воспроизведения
+        записанного трафика. Если передан автомат `breaker`, запросы
+        к недоступному API отклоняются без обращения к сети, а политика
+        `retry` повторяет запросы после временных ошибок API. Кэш
+        обработчика команд `commands` сбрасывается при новых статусах.
+        Индекс `seen` отсеивает переходы статуса, о которых уже сообщалось
+        в перекрывающихся окнах from_date. Если передан журнал `outbox`,
+        уведомления о статусах сначала записываются в него и досылаются
+        после сбоев Telegram. По индексу `subscriptions` уведомления
+        о статусах рассылаются всем подписанным чатам, а текст готовится
+        один раз.
+        """
+        self.tenants = list(tenants)
+        self.store = store
+        self.dispatcher = dispatcher
+        self.breaker = breaker
+        self.retry = retry
+        self.commands = commands
+        self.seen = seen if seen is not None else SeenIndex(store=store)
+        self.outbox = outbox
+        self.subscriptions = (
+            subscriptions if subscriptions is not None
+            else SubscriptionIndex()
+        )
+        if store is not None:
+            dates = store.load_dates()
+            reviewing = store.load_homeworks("reviewing")
+            for tenant in self.tenants:
+                tenant.timestamp = dates.get(tenant.key, tenant.timestamp)
+                tenant.reviewing.update(reviewing.get(tenant.key, ()))
+        self.bot = bot
+        self.concurrency = concurrency
+        self.retry_period = retry_period
+        self.clock = clock or SystemClock()
+        self.random = rng or random.Random()
+        self.policy = policy or AdaptiveInterval(retry_period, rng=self.random)
+        self.session = None
+        if fetch is None:
+            self.session = session.build_session(pool_size=concurrency)
+        self.fetch = fetch or self._fetch
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="poll"
+        )
+
+    def _fetch(self, timestamp, headers):
+        return homework.fetch_api_answer(
+            timestamp, headers, self.session, self.retry
+        )
+
+    def _request(self, timestamp, headers, fetch=None):
+        fetch = fetch or self.fetch
+        if self.breaker is None:
+            return fetch(timestamp, headers)
+        return self.breaker.call(fetch, timestamp, headers)
+
+    def notify(self, chat_id, message):
+        """Отправка сообщения напрямую или через очередь диспетчера.
+
+        Возвращает True, если сообщение отправлено или принято в очередь.
+        """
+        if self.dispatcher is None:
+            return homework.send_chat_message(self.bot, chat_id, message)
+        if not self.dispatcher.submit(chat_id, message, SEND_TIMEOUT):
+            logging.error(f"Очередь отправки переполнена, чат {chat_id}")
+            return False
+        return True
+
+    def poll_tenant(self, tenant):
+        """Один цикл опроса API для одного пользователя.
+
+        Статусы работ сохраняются, только если уведомления о них
+        переданы: по сохранённым статусам загрузка истории решает,
+        какие работы пропустить.
+        """
+        try:
+            with Deadline():
+                response = self._request(tenant.timestamp, tenant.headers)
+                records = homework.check_response(response)
+                delivered = self._deliver(tenant, records)
+            tenant.errors = 0
+            if delivered:
+                tenant.timestamp = response.get(
+                    "current_date", int(self.clock.time())
+                )
+            if self.store is not None:
+                self.store.save(
+                    tenant.key, tenant.timestamp, records if delivered else ()
+                )
+            homework.mark_current_date(tenant.key, tenant.timestamp)
+        except Exception as error:
+            homework.count_error(error)
+            if isinstance(error, ConnectionError):
+                tenant.errors += 1
+            self._report_error(tenant, f"Возникла ошибка: {error}")
+        self._send_digest(tenant)
+
+    def _deliver(self, tenant, records):
+        """Рассылка новых статусов; True, если все уведомления переданы.
+
+        Переход отмечается отправленным, только когда уведомление о нём
+        записано в журнал или отправлено во все чаты; иначе from_date
+        не сдвигается, и следующий опрос повторит его.
+        """
+        if not records:
+            logging.debug("Новых статусов нет: %s", tenant)
+            return True
+        fresh, keys = self.seen.fresh(tenant.key, records)
+        failed = set()
+        if fresh:
+            texts = homework.render_records(fresh)
+            for chats, numbers in self.subscriptions.route(tenant, fresh):
+                messages = homework.combine_messages(
+                    [texts[number] for number in numbers]
+                )
+                idempotency = transitions_key(
+                    [keys[number] for number in numbers]
+                )
+                if not self._fan_out(tenant, chats, messages, idempotency):
+                    failed.update(numbers)
+            self.seen.mark([
+                key for number, key in enumerate(keys)
+                if number not in failed
+            ])
+        else:
+            logging.debug("Статусы уже отправлены: %s", tenant)
+        tenant.track(records)
+        if self.commands is not None:
+            self.commands.invalidate(tenant)
+        if failed:
+            logging.warning(
+                "%s: уведомления не доставлены, from_date не сдвигается",
+                tenant,
+            )
+        return not failed
+
+    def _fan_out(self, tenant, chats, messages, idempotency):
+        subscribers = sum(chat_id != str(tenant.chat_id) for chat_id in chats)
+        if subscribers:
+            DELIVERIES.inc(subscribers * len(messages))
+        if self.outbox is None:
+            return all([
+                self.notify(chat_id, message)
+                for chat_id in chats
+                for message in messages
+            ])
+        self.outbox.put(
+            (f"{idempotency}:{chat_id}:{number}", chat_id, message)
+            for chat_id in chats
+            for number, message in enumerate(messages)
+        )
+        return True
+
+    def drain_outbox(self):
+        """Передача недоставленных уведомлений из журнала на отправку."""
+        if self.outbox is None:
+            return
+        if self.dispatcher is None:
+            self.outbox.drain(
+                functools.partial(homework.send_chat_message, self.bot)
+            )
+            return
+        self.outbox.flush()
+        for row in self.outbox.claim_first(OUTBOX_BATCH):
+            self._dispatch(row)
+        self.outbox.maybe_prune()
+
+    def _dispatch(self, row):
+        """Передача уведомления из журнала в очередь диспетчера.
+
+        У каждого чата в очереди не больше одного уведомления журнала:
+        следующее берётся после доставки предыдущего, поэтому сбой
+        не нарушает порядок уведомлений чата.
+        """
+        row_id, chat_id, text = row
+        on_done = functools.partial(self._dispatched, row_id, chat_id)
+        if not self.dispatcher.submit(chat_id, text, 0, on_done):
+            self.outbox.release(row_id)
+
+    def _dispatched(self, row_id, chat_id, delivered):
+        self.outbox.ack(row_id, delivered)
+        if not delivered:
+            return
+        row = self.outbox.claim_next(chat_id, row_id)
+        if row is not None:
+            self._dispatch(row)
+
+    def _report_error(self, tenant, error_message):
+        logging.error("%s: %s", tenant, error_message)
+        if tenant.error_digest is None:
+            tenant.error_digest = ErrorDigest(clock=self.clock.monotonic)
+        if tenant.error_digest.record(error_message):
+            self.notify(tenant.chat_id, error_message)
+
+    def _send_digest(self, tenant):
+        if tenant.error_digest is None:
+            return
+        digest = tenant.error_digest.flush()
+        if digest:
+            self.notify(tenant.chat_id, digest)
+        if not tenant.error_digest:
+            tenant.error_digest = None
+
+    async def run_cycle(self):
+        """Опрос всех пользователей с ограничением параллельности."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self._executor, self.poll_tenant, tenant)
+            for tenant in self.tenants
+        ))
+        self.drain_outbox()
+        if self.store is not None:
+            self.store.flush()
+
+    async def run_forever(self, tick=SCHEDULER_TICK, until=None):
+        """Опрос каждого пользователя по своему расписанию.
+
+        Первые запросы равномерно распределены по RETRY_PERIOD, а каждый
+        следующий планируется через адаптивный интервал со случайным
+        разбросом, чтобы запросы пользователей не собирались в пачки.
+        Без `until` работает бесконечно, иначе — до этого момента по
+        монотонным часам движка.
+        """
+        loop = asyncio.get_running_loop()
+        clock = self.clock
+        wheel = TimerWheel(tick=tick, start=clock.monotonic(), rng=self.random)
+        for tenant in self.tenants:
+            wheel.schedule(
+                tenant,
+                wheel.start + wheel.random.uniform(0, self.retry_period),
+            )
+
+        def reschedule(future, tenant):
+            wheel.schedule_after(
+                tenant, self.policy.next_interval(tenant), clock.monotonic()
+            )
+
+        while until is None or clock.monotonic() < until:
+            due = wheel.advance(clock.monotonic())
+            for tenant in due:
+                if clock.synchronous:
+                    self.poll_tenant(tenant)
+                    reschedule(None, tenant)
+                    continue
+                future = loop.run_in_executor(
+                    self._executor, self.poll_tenant, tenant
+                )
+                future.add_done_callback(
+                    functools.partial(reschedule, tenant=tenant)
+                )
+            self.drain_outbox()
+            if self.store is not None:
+                self.store.flush()
+            await clock.sleep(wheel.tick)
+
+    def backfill(self, from_date, concurrency=BACKFILL_CONCURRENCY):
+        """Загрузка истории всех пользователей начиная с `from_date`.
+
+        Уведомления идут тем же путём, что и при опросе: всем подписанным
+        чатам, без уже отправленных переходов и через журнал отправки.
+        Возвращает пользователей, загрузку которых нужно повторить.
+        """
+        filler = Backfill(
+            self.store,
+            functools.partial(homework.stream_records, session=self.session),
+            self._deliver, clock=self.clock.time,
+            drain=self.drain_outbox,
+        )
+        failed = filler.run_all(self.tenants, from_date, concurrency)
+        self.drain_outbox()
+        for tenant in self.tenants:
+            tenant.timestamp = self.store.get_date(
+                tenant.key, tenant.timestamp
+            )
+        return failed
+
+    def close(self):
+        """Остановка пула потоков, закрытие соединений и хранилища."""
+        self._executor.shutdown(wait=False)
+        if self.dispatcher is not None:
+            self.dispatcher.stop()
+        if self.outbox is not None:
+            self.outbox.close()
+        if self.session is not None:
+            self.session.close()
+        if self.store is not None:
+            self.store.close()
+
+
+def configured_tenants(path, timestamp):
+    """Пользователи из файла или единственный пользователь из окружения.
+
+    Без файла пользователей движок обслуживает токен и чат из тех же
+    переменных окружения, что и `homework.main()`.
+    """
+    if os.path.exists(path) or not homework.PRACTICUM_TOKEN:
+        return load_tenants(path, timestamp=timestamp)
+    return [
+        Tenant(homework.PRACTICUM_TOKEN, homework.TELEGRAM_CHAT_ID, timestamp)
+    ]
+
+
+def start_commands(engine, bot):
+    """Ответы на /status и /history в фоновом потоке получения обновлений.
+
+    Запросы команд идут через автомат эндпоинта, как и опрос, но
+    функцией запроса, взятой до включения записи трафика: ответ команды
+    с полной историей воспроизвёлся бы как изменения статусов.
+    """
+    engine.commands = CommandHandler(
+        engine.tenants,
+        functools.partial(engine._request, fetch=engine.fetch),
+        homework.check_response, homework.HOMEWORK_VERDICTS,
+    )
+    register_commands(bot, engine.commands, engine.notify)
+    threading.Thread(
+        target=bot.infinity_polling, name="commands", daemon=True
+    ).start()
+
+
+def _from_date(value):
+    moment = int(value) if value.isdigit() else parse_date(value)
+    if moment is None:
+        raise argparse.ArgumentTypeError(f"неизвестный формат даты: {value}")
+    return moment
+
+
+def _run(engine, options):
+    if options.backfill is not None:
+        failed = engine.backfill(options.backfill)
+        if failed:
+            logging.error(
+                "Загрузка истории не завершена для %s пользователей,"
+                " повторный запуск продолжит с контрольной точки",
+                len(failed),
+            )
+        return
+    asyncio.run(engine.run_cycle() if options.once else engine.run_forever())
+
+
+def main(argv=None):
+    """Запуск многопользовательского опроса."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "--record", metavar="LOG",
+        help="записывать ответы API в журнал для воспроизведения",
+    )
+    parser.add_argument(
+        "--once", action="store_true",
+        help="один цикл опроса всех пользователей с сохранением состояния,"
+             " например из cron",
+    )
+    parser.add_argument(
+        "--backfill", metavar="FROM_DATE", type=_from_date,
+        help="загрузить историю работ с даты (Unix-время или ISO 8601)"
+             " потоком с контрольными точками и завершиться",
+    )
+    options = parser.parse_args(argv)
+    oneshot = options.once or options.backfill is not None
+    if not homework.TELEGRAM_TOKEN:
+        logging.critical("Отсутствует переменная окружения TELEGRAM_TOKEN")
+        sys.exit(1)
+    store = open_store()
+    if oneshot and store is None:
+        logging.critical(
+            "Для разового запуска нужна переменная окружения STATE_DB_PATH"
+        )
+        sys.exit(1)
+    outbox = open_outbox()
+    if options.backfill is not None and outbox is None:
+        logging.critical(
+            "Для загрузки истории нужна переменная окружения OUTBOX_PATH"
+        )
+        sys.exit(1)
+    now = int(time.time())
+    subscriptions = load_subscriptions()
+    tenants = merge_tenants(configured_tenants(TENANTS_FILE, now),
+                            subscriptions)
+    logging.info("Загружено пользователей: %s, подписок: %s",
+                 len(tenants), len(subscriptions))
+    bot = telebot.TeleBot(token=homework.TELEGRAM_TOKEN)
+    breaker = None
+    if BREAKER_THRESHOLD > 0:
+        breaker = breaker_for(homework.ENDPOINT)
+    engine = PollingEngine(
+        tenants, bot, store=store,
+        dispatcher=dispatcher.Dispatcher(bot).start(), breaker=breaker,
+        retry=RetryPolicy() if API_RETRIES > 0 else None,
+        outbox=outbox, subscriptions=subscriptions,
+    )
+    if BOT_COMMANDS and not oneshot:
+        start_commands(engine, bot)
+    if options.record:
+        engine.fetch = recording.Recorder(engine.fetch, options.record)
+    if oneshot:
+        metrics_exporter = exporter.Exporter(port=None).start()
+    else:
+        metrics_exporter = exporter.Exporter().start()
+    try:
+        _run(engine, options)
+    finally:
+        if engine.commands is not None:
+            bot.stop_polling()
+        engine.close()
+        metrics_exporter.stop()
+        if options.record:
+            engine.fetch.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logs.LOG_LEVEL, handlers=[logs.queue_handler()]
+    )
+    main()
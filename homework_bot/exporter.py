@@ -0,0 +1,100 @@
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from homework_bot import metrics
+
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = os.getenv("METRICS_PORT")
+METRICS_FILE = os.getenv("METRICS_FILE")
+METRICS_INTERVAL = float(os.getenv("METRICS_INTERVAL", 15))
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Ответ на GET /metrics текущим состоянием реестра."""
+
+    def do_GET(self):
+        """Отдача метрик в текстовом формате Prometheus."""
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Запросы сборщика метрик не засоряют журнал."""
+
+
+def write_metrics(path):
+    """Атомарная запись метрик в файл для textfile-коллектора."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as output:
+        output.write(metrics.render())
+    os.replace(temporary, path)
+
+
+class Exporter:
+    """Экспорт метрик по HTTP и/или в файл в фоновых потоках.
+
+    Без порта и пути ничего не запускает, так что включается
+    переменными окружения METRICS_PORT и METRICS_FILE.
+    """
+
+    def __init__(self, port=METRICS_PORT, path=METRICS_FILE,
+                 interval=METRICS_INTERVAL, host=METRICS_HOST):
+        """Настройка экспорта без запуска потоков."""
+        self.port = None if port in (None, "") else int(port)
+        self.path = path
+        self.interval = interval
+        self.host = host
+        self.server = None
+        self._stopped = threading.Event()
+        self._writer = None
+
+    def start(self):
+        """Запуск HTTP-сервера и периодической записи файла."""
+        if self.port is not None:
+            self.server = ThreadingHTTPServer(
+                (self.host, self.port), MetricsHandler
+            )
+            self.server.daemon_threads = True
+            threading.Thread(
+                target=self.server.serve_forever, name="metrics-http",
+                daemon=True,
+            ).start()
+            logging.info(
+                f"Метрики доступны на http://{self.host}:"
+                f"{self.server.server_port}/metrics"
+            )
+        if self.path:
+            self._writer = threading.Thread(
+                target=self._write_loop, name="metrics-file", daemon=True
+            )
+            self._writer.start()
+        return self
+
+    def _write_loop(self):
+        while not self._stopped.wait(self.interval):
+            self._write()
+        self._write()
+
+    def _write(self):
+        try:
+            write_metrics(self.path)
+        except OSError as error:
+            logging.error(f"Ошибка записи метрик в {self.path}: {error}")
+
+    def stop(self):
+        """Остановка сервера и последняя запись файла."""
+        self._stopped.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        if self._writer is not None:
+            self._writer.join()
@@ -0,0 +1,50 @@
+import os
+import random
+
+POLL_MIN_INTERVAL = float(os.getenv("POLL_MIN_INTERVAL", 120))
+POLL_MAX_INTERVAL = float(os.getenv("POLL_MAX_INTERVAL", 1800))
+BACKOFF_LIMIT = 10
+
+
+class AdaptiveInterval:
+    """Интервал опроса по статусу последней работы и истории ошибок.
+
+    Пока хоть одна работа на проверке, опрос идёт с минимальным
+    интервалом. Если последняя работа принята и проверки ничего не
+    ждёт, интервал удваивается до максимума. После ошибок
+    соединения интервал растёт экспоненциально со случайным разбросом,
+    но не бывает короче базового: ошибка не ускоряет опрос.
+    Границы пользователя, если заданы, важнее общих.
+    """
+
+    def __init__(self, base, minimum=POLL_MIN_INTERVAL,
+                 maximum=POLL_MAX_INTERVAL, rng=None):
+        """Настройка базового интервала и общих границ."""
+        self.base = base
+        self.minimum = minimum
+        self.maximum = maximum
+        self.random = rng or random.Random()
+
+    def bounds(self, tenant):
+        """Границы интервала для пользователя."""
+        return (
+            tenant.min_interval or self.minimum,
+            tenant.max_interval or self.maximum,
+        )
+
+    def next_interval(self, tenant):
+        """Интервал до следующего опроса пользователя."""
+        minimum, maximum = self.bounds(tenant)
+        if tenant.errors:
+            errors = min(tenant.errors, BACKOFF_LIMIT)
+            floor = min(maximum, max(minimum, self.base))
+            cap = min(maximum, self.base * 2 ** errors)
+            interval = self.random.uniform(floor, max(floor, cap))
+        elif tenant.reviewing:
+            interval = minimum
+        elif tenant.last_status == "approved":
+            interval = (tenant.interval or self.base) * 2
+        else:
+            interval = self.base
+        tenant.interval = min(maximum, max(minimum, interval))
+        return tenant.interval
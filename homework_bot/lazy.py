@@ -0,0 +1,23 @@
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """Модуль, код которого выполняется при первом обращении к атрибуту.
+
+    Уже загруженный модуль возвращается как есть. Отложенный модуль
+    сразу попадает в sys.modules, поэтому `import name` в другом месте
+    и подмена атрибутов в тестах работают с тем же объектом.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,117 @@
+import atexit
+import itertools
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from homework_bot import metrics
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG").upper()
+LOG_FILE = os.getenv("LOG_FILE")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", 5))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")
+LOG_FORMAT = (
+    "%(asctime)s, %(levelname)s, %(message)s,"
+    " %(name)s, %(funcName)s, %(lineno)d"
+)
+
+DROPPED = metrics.counter(
+    "log_records_dropped_total", "Записи журнала, не вместившиеся в очередь"
+)
+
+
+def parse_sampling(spec):
+    """Правила выборки вида `api_response=100,check_response=10`."""
+    rates = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        kind, _, every = item.partition("=")
+        rates[kind.strip()] = max(1, int(every))
+    return rates
+
+
+class SampleFilter(logging.Filter):
+    """Пропускает каждую `N`-ю запись своего типа.
+
+    Тип задаётся в `extra={"sample": ...}`; записи без типа и типы
+    без правила пропускаются все.
+    """
+
+    def __init__(self, rates):
+        """Фильтр с частотой выборки для каждого типа записей."""
+        super().__init__()
+        self.rates = rates
+        self._counters = {kind: itertools.count() for kind in rates}
+
+    def filter(self, record):
+        """Решение о записи без форматирования сообщения."""
+        counter = self._counters.get(getattr(record, "sample", None))
+        if counter is None:
+            return True
+        return next(counter) % self.rates[record.sample] == 0
+
+
+class LazyQueueHandler(QueueHandler):
+    """Очередь записей без форматирования в потоке вызова.
+
+    Сообщение собирается из шаблона и аргументов уже в потоке
+    слушателя; при переполненной очереди запись отбрасывается.
+    """
+
+    def prepare(self, record):
+        """Запись передаётся в очередь как есть."""
+        return record
+
+    def enqueue(self, record):
+        """Постановка в очередь без ожидания."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DROPPED.inc()
+
+
+class DrainingListener(QueueListener):
+    """Слушатель, который при остановке дописывает всю очередь."""
+
+    def enqueue_sentinel(self):
+        """Метка конца ждёт места даже в переполненной очереди."""
+        self.queue.put(self._sentinel)
+
+    def stop(self):
+        """Остановка; повторный вызов ничего не делает."""
+        if self._thread is not None:
+            super().stop()
+
+
+def output_handler(path=LOG_FILE, max_bytes=LOG_MAX_BYTES,
+                   backups=LOG_BACKUPS):
+    """Файл с ротацией по размеру или stderr, если путь не задан."""
+    if path:
+        handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+        )
+    else:
+        handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return handler
+
+
+def queue_handler(output=None, sampling=LOG_SAMPLING,
+                  maxsize=LOG_QUEUE_SIZE):
+    """Обработчик для корневого логгера с фоновой записью в `output`.
+
+    Слушатель очереди запускается сразу и останавливается при выходе
+    из процесса, дописав оставшиеся записи.
+    """
+    records = queue.Queue(maxsize)
+    handler = LazyQueueHandler(records)
+    handler.addFilter(SampleFilter(parse_sampling(sampling)))
+    handler.listener = DrainingListener(records, output or output_handler())
+    handler.listener.start()
+    atexit.register(handler.listener.stop)
+    return handler
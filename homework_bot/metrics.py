@@ -0,0 +1,188 @@
+import bisect
+import itertools
+import math
+import threading
+
+REGISTRY = {}
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+class Counter:
+    """Монотонно растущий счётчик событий."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labels=()):
+        """Создание счётчика с именем, описанием и метками."""
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """Увеличение счётчика."""
+        with self._lock:
+            self.value += amount
+
+
+class Gauge:
+    """Текущее значение величины, например глубины очереди."""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labels=()):
+        """Создание показателя с именем, описанием и метками."""
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.value = 0
+
+    def set(self, value):
+        """Установка текущего значения."""
+        self.value = value
+
+
+class Summary:
+    """Количество и сумма наблюдаемых величин."""
+
+    kind = "summary"
+
+    def __init__(self, name, documentation, labels=()):
+        """Создание сводки с именем, описанием и метками."""
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """Учёт одного наблюдения."""
+        with self._lock:
+            self.count += 1
+            self.total += value
+
+    @property
+    def average(self):
+        """Среднее значение наблюдений."""
+        return self.total / self.count if self.count else 0.0
+
+
+class Histogram(Summary):
+    """Сводка с распределением наблюдений по корзинам `buckets`."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(),
+                 buckets=DEFAULT_BUCKETS):
+        """Создание гистограммы с верхними границами корзин."""
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value):
+        """Учёт одного наблюдения в его корзине."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.count += 1
+            self.total += value
+            self.counts[index] += 1
+
+    def cumulative(self):
+        """Пары (граница, число наблюдений не больше неё), включая +Inf."""
+        with self._lock:
+            counts = list(self.counts)
+        bounds = self.buckets + (math.inf,)
+        return list(zip(bounds, itertools.accumulate(counts)))
+
+
+def _register(cls, name, documentation, labels, **options):
+    key = (name, tuple(sorted(labels.items())) if labels else ())
+    metric = REGISTRY.get(key)
+    if metric is None:
+        metric = REGISTRY.setdefault(
+            key, cls(name, documentation, key[1], **options)
+        )
+    return metric
+
+
+def counter(name, documentation="", labels=None):
+    """Счётчик из реестра; создаётся при первом обращении."""
+    return _register(Counter, name, documentation, labels)
+
+
+def gauge(name, documentation="", labels=None):
+    """Показатель из реестра; создаётся при первом обращении."""
+    return _register(Gauge, name, documentation, labels)
+
+
+def summary(name, documentation="", labels=None):
+    """Сводка из реестра; создаётся при первом обращении."""
+    return _register(Summary, name, documentation, labels)
+
+
+def histogram(name, documentation="", labels=None,
+              buckets=DEFAULT_BUCKETS):
+    """Гистограмма из реестра; создаётся при первом обращении."""
+    return _register(
+        Histogram, name, documentation, labels, buckets=buckets
+    )
+
+
+def _escape(value):
+    return (
+        str(value).replace("\\", "\\\\").replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def _format_labels(labels, extra=()):
+    pairs = tuple(labels) + tuple(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{key}="{_escape(value)}"' for key, value in pairs)
+    return "{" + body + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _samples(metric):
+    labels = metric.labels
+    if metric.kind in ("counter", "gauge"):
+        yield metric.name, _format_labels(labels), metric.value
+        return
+    if metric.kind == "histogram":
+        for bound, count in metric.cumulative():
+            yield (
+                f"{metric.name}_bucket",
+                _format_labels(labels, (("le", _format_value(bound)),)),
+                count,
+            )
+    yield f"{metric.name}_sum", _format_labels(labels), metric.total
+    yield f"{metric.name}_count", _format_labels(labels), metric.count
+
+
+def render(registry=None):
+    """Все метрики реестра в текстовом формате Prometheus."""
+    families = {}
+    for metric in list((registry or REGISTRY).values()):
+        families.setdefault(metric.name, []).append(metric)
+    lines = []
+    for name in sorted(families):
+        members = families[name]
+        first = members[0]
+        if first.documentation:
+            lines.append(f"# HELP {name} {first.documentation}")
+        lines.append(f"# TYPE {name} {first.kind}")
+        for metric in members:
+            for sample, labels, value in _samples(metric):
+                lines.append(f"{sample}{labels} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,301 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from homework_bot import metrics
+
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", os.getenv("STATE_DB_PATH", ""))
+OUTBOX_BATCH = int(os.getenv("OUTBOX_BATCH", 200))
+OUTBOX_RETENTION = float(os.getenv("OUTBOX_RETENTION", 7 * 86400))
+OUTBOX_RETRY_DELAY = float(os.getenv("OUTBOX_RETRY_DELAY", 30))
+OUTBOX_RETRY_CAP = float(os.getenv("OUTBOX_RETRY_CAP", 600))
+OUTBOX_PRUNE_INTERVAL = 3600
+OUTBOX_MAX_FAILURES = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    chat_id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created REAL NOT NULL,
+    delivered REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (id)
+    WHERE delivered IS NULL;
+CREATE INDEX IF NOT EXISTS outbox_chat ON outbox (chat_id, id)
+    WHERE delivered IS NULL;
+"""
+
+ENQUEUED = metrics.counter(
+    "outbox_enqueued_total", "Уведомления, записанные в журнал отправки"
+)
+DUPLICATES = metrics.counter(
+    "outbox_duplicates_total",
+    "Уведомления, отброшенные по уже записанному ключу идемпотентности",
+)
+DELIVERED = metrics.counter(
+    "outbox_delivered_total", "Уведомления из журнала, доставленные в Telegram"
+)
+PENDING = metrics.gauge(
+    "outbox_pending", "Недоставленные уведомления в журнале отправки"
+)
+
+
+class Outbox:
+    """Журнал исходящих уведомлений в SQLite.
+
+    Уведомление записывается до отправки с ключом идемпотентности,
+    поэтому повторная запись того же уведомления ничего не меняет,
+    а недоставленные уведомления переживают сбой Telegram и перезапуск.
+    Отметки о доставке копятся в памяти и сбрасываются одной
+    транзакцией в `flush()`.
+
+    После ошибки отправки чат откладывается с экспоненциальной паузой
+    от OUTBOX_RETRY_DELAY до OUTBOX_RETRY_CAP секунд, чтобы не нарушить
+    порядок его уведомлений, а после OUTBOX_MAX_FAILURES ошибок подряд
+    откладывается весь журнал: Telegram, скорее всего, недоступен.
+    """
+
+    def __init__(self, path, clock=time.time):
+        """Открытие базы и создание таблицы журнала."""
+        self.path = path
+        self.clock = clock
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._claimed = {}
+        self._delivered = {}
+        self._blocked = {}
+        self._failures = 0
+        self._paused_until = 0
+        self._pruned = 0
+
+    def put(self, entries):
+        """Запись уведомлений `(ключ, чат, текст)`; возвращает число новых."""
+        now = self.clock()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            before = self._conn.total_changes
+            rows = [(key, str(chat_id), text, now)
+                    for key, chat_id, text in entries]
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO outbox (key, chat_id, text, created)"
+                " VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            added = self._conn.total_changes - before
+        ENQUEUED.inc(added)
+        if added < len(rows):
+            DUPLICATES.inc(len(rows) - added)
+        return added
+
+    def ready(self, chat_id):
+        """Можно ли сейчас отправлять в чат: он и журнал не отложены."""
+        with self._lock:
+            return self._ready(chat_id, self.clock())
+
+    def _ready(self, chat_id, now):
+        if now < self._paused_until:
+            return False
+        blocked = self._blocked.get(chat_id)
+        return blocked is None or blocked[0] <= now
+
+    def _free(self, row_id):
+        return row_id not in self._claimed and row_id not in self._delivered
+
+    def claim(self, limit=OUTBOX_BATCH, after=0):
+        """Недоставленные уведомления `(id, чат, текст)`, ещё не взятые.
+
+        Выдаются уведомления с id больше `after` в порядке записи, кроме
+        уведомлений отложенных чатов. Взятые уведомления не выдаются
+        повторно, пока не подтверждены в `ack()` или не возвращены
+        в `release()`.
+        """
+        rows = []
+        with self._lock:
+            now = self.clock()
+            cursor = self._conn.execute(
+                "SELECT id, chat_id, text FROM outbox"
+                " WHERE delivered IS NULL AND id > ? ORDER BY id",
+                (after,),
+            )
+            for row in cursor:
+                if len(rows) >= limit or now < self._paused_until:
+                    break
+                if self._free(row[0]) and self._ready(row[1], now):
+                    rows.append(row)
+                    self._claimed[row[0]] = row[1]
+        return rows
+
+    def claim_first(self, limit=OUTBOX_BATCH):
+        """Первое недоставленное уведомление каждого готового чата.
+
+        Чаты, у которых уже взято уведомление, пропускаются: следующее
+        уведомление чата берётся в `claim_next()` после доставки
+        предыдущего, поэтому порядок уведомлений чата сохраняется.
+        """
+        rows = []
+        with self._lock:
+            now = self.clock()
+            busy = set(self._claimed.values())
+            cursor = self._conn.execute(
+                "SELECT id, chat_id, text FROM outbox WHERE id IN"
+                " (SELECT MIN(id) FROM outbox WHERE delivered IS NULL"
+                " GROUP BY chat_id) ORDER BY id"
+            )
+            for row in cursor:
+                if len(rows) >= limit or now < self._paused_until:
+                    break
+                if (row[1] not in busy and self._free(row[0])
+                        and self._ready(row[1], now)):
+                    rows.append(row)
+                    self._claimed[row[0]] = row[1]
+        return rows
+
+    def claim_next(self, chat_id, after):
+        """Следующее после `after` уведомление чата или None."""
+        with self._lock:
+            if not self._ready(chat_id, self.clock()):
+                return None
+            row = self._conn.execute(
+                "SELECT id, chat_id, text FROM outbox"
+                " WHERE delivered IS NULL AND chat_id = ? AND id > ?"
+                " ORDER BY id LIMIT 1",
+                (chat_id, after),
+            ).fetchone()
+            if row is None or not self._free(row[0]):
+                return None
+            self._claimed[row[0]] = row[1]
+            return row
+
+    def release(self, row_id):
+        """Возврат взятого уведомления без попытки отправки."""
+        with self._lock:
+            self._claimed.pop(row_id, None)
+
+    def ack(self, row_id, delivered=True):
+        """Итог отправки взятого уведомления.
+
+        Недоставленное уведомление откладывает свой чат и вернётся
+        в `claim()` после паузы.
+        """
+        with self._lock:
+            chat_id = self._claimed.pop(row_id, None)
+            now = self.clock()
+            if delivered:
+                self._delivered[row_id] = now
+                self._blocked.pop(chat_id, None)
+                self._failures = 0
+                return
+            attempts = self._blocked.get(chat_id, (0, 0))[1] + 1
+            self._blocked[chat_id] = (now + _backoff(attempts), attempts)
+            self._failures += 1
+            if self._failures < OUTBOX_MAX_FAILURES:
+                return
+            self._paused_until = now + _backoff(
+                self._failures - OUTBOX_MAX_FAILURES + 1
+            )
+        logging.warning(
+            "Журнал отправки: Telegram недоступен, доставка отложена"
+        )
+
+    def flush(self):
+        """Запись накопленных отметок о доставке одной транзакцией."""
+        with self._lock:
+            delivered, self._delivered = self._delivered, {}
+            if not delivered:
+                return
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "UPDATE outbox SET delivered = ? WHERE id = ?",
+                    ((when, row_id) for row_id, when in delivered.items()),
+                )
+        DELIVERED.inc(len(delivered))
+
+    def pending(self):
+        """Число недоставленных уведомлений."""
+        self.flush()
+        count = self._conn.execute(
+            "SELECT COUNT(*) FROM outbox WHERE delivered IS NULL"
+        ).fetchone()[0]
+        PENDING.set(count)
+        return count
+
+    def drain(self, send, batch=OUTBOX_BATCH):
+        """Отправка недоставленных уведомлений пачками через `send`.
+
+        `send(чат, текст)` возвращает True при успешной отправке. Чат,
+        отложенный после ошибки, пропускается до конца паузы, а проход
+        прекращается, когда отложен весь журнал. Возвращает число
+        доставленных уведомлений.
+        """
+        delivered = 0
+        after = 0
+        while True:
+            rows = self.claim(batch, after)
+            if not rows:
+                break
+            after = rows[-1][0]
+            for row_id, chat_id, text in rows:
+                if not self.ready(chat_id):
+                    self.release(row_id)
+                    continue
+                ok = send(chat_id, text)
+                self.ack(row_id, ok)
+                delivered += bool(ok)
+            self.flush()
+        self.maybe_prune()
+        return delivered
+
+    def prune(self, retention=OUTBOX_RETENTION):
+        """Удаление доставленных записей старше `retention` секунд.
+
+        Вместе с записью забывается и её ключ идемпотентности;
+        недоставленные записи остаются до доставки.
+        """
+        self.flush()
+        now = self.clock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM outbox"
+                " WHERE delivered IS NOT NULL AND created < ?",
+                (now - retention,),
+            )
+            self._pruned = now
+
+    def maybe_prune(self, interval=OUTBOX_PRUNE_INTERVAL):
+        """Очистка не чаще раза в `interval` секунд."""
+        if self.clock() - self._pruned >= interval:
+            self.prune()
+
+    def close(self):
+        """Сброс отметок и закрытие базы."""
+        self.flush()
+        self._conn.close()
+
+
+def _backoff(attempts):
+    """Пауза после `attempts` ошибок подряд."""
+    return min(OUTBOX_RETRY_CAP,
+               OUTBOX_RETRY_DELAY * 2 ** min(attempts - 1, 16))
+
+
+def open_outbox(path=OUTBOX_PATH):
+    """Журнал по пути из настроек или None, если путь не задан.
+
+    Доставленные записи старше OUTBOX_RETENTION удаляются при открытии
+    и затем не реже раза в OUTBOX_PRUNE_INTERVAL секунд при досылке.
+    """
+    if not path:
+        return None
+    outbox = Outbox(path)
+    outbox.prune()
+    return outbox
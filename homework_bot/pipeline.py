@@ -0,0 +1,98 @@
+import os
+import queue
+import threading
+
+from homework_bot import metrics
+
+PIPELINE_BUFFER = int(os.getenv("PIPELINE_BUFFER", 256))
+
+_DONE = object()
+
+STALLS = metrics.counter(
+    "pipeline_backpressure_total",
+    "Ожидания стадии конвейера из-за заполненного буфера",
+)
+
+
+class _Failure:
+    __slots__ = ("error",)
+
+    def __init__(self, error):
+        self.error = error
+
+
+class _Stage:
+    """Фоновый поток, который читает источник в ограниченную очередь."""
+
+    def __init__(self, source, maxsize):
+        self.source = source
+        self.items = queue.Queue(maxsize)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(
+            target=self.produce, name="pipeline", daemon=True
+        )
+
+    def put(self, item):
+        try:
+            self.items.put_nowait(item)
+            return True
+        except queue.Full:
+            STALLS.inc()
+        while not self.stopped.is_set():
+            try:
+                self.items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce(self):
+        try:
+            for item in self.source:
+                if not self.put(item):
+                    return
+        except BaseException as error:
+            self.put(_Failure(error))
+        else:
+            self.put(_DONE)
+        finally:
+            self.close_source()
+
+    def close_source(self):
+        close = getattr(self.source, "close", None)
+        if close is not None and self.stopped.is_set():
+            close()
+
+
+def buffered(source, maxsize=PIPELINE_BUFFER):
+    """Чтение `source` в фоновом потоке через буфер на `maxsize` элементов.
+
+    Стадия-источник работает параллельно с потребителем, но не уходит
+    вперёд больше чем на `maxsize` элементов: при заполненном буфере
+    она ждёт. Исключение источника поднимается у потребителя, а
+    закрытие генератора останавливает источник.
+    """
+    stage = _Stage(source, maxsize)
+    stage.thread.start()
+    try:
+        while True:
+            item = stage.items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stage.stopped.set()
+
+
+def chunk_messages(messages, limit):
+    """Склейка потока сообщений в части не длиннее лимита Telegram."""
+    current = ""
+    for message in messages:
+        if current and len(current) + len(message) + 2 > limit:
+            yield current
+            current = ""
+        current = f"{current}\n\n{message}" if current else message
+    if current:
+        yield current
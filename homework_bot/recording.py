@@ -0,0 +1,96 @@
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict, deque
+
+from homework_bot.tenant import tenant_key
+
+
+def _key_from_headers(headers):
+    return tenant_key(headers["Authorization"].split(" ", 1)[1])
+
+
+class Recorder:
+    """Обёртка над функцией запроса, которая пишет ответы API в журнал.
+
+    Журнал — сжатый gzip файл, по строке JSON на запрос: время `t`,
+    ключ пользователя `k`, отметка `f` и ответ `r` или текст ошибки `e`.
+    """
+
+    def __init__(self, fetch, path, clock=time.time):
+        """Открытие журнала на дозапись."""
+        self.fetch = fetch
+        self.clock = clock
+        self._file = gzip.open(path, "at", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def __call__(self, timestamp, headers):
+        """Запрос к API с записью результата."""
+        entry = {
+            "t": self.clock(), "k": _key_from_headers(headers),
+            "f": timestamp,
+        }
+        try:
+            entry["r"] = self.fetch(timestamp, headers)
+            return entry["r"]
+        except Exception as error:
+            entry["e"] = str(error)
+            raise
+        finally:
+            line = json.dumps(entry, ensure_ascii=False,
+                              separators=(",", ":"))
+            with self._lock:
+                self._file.write(line + "\n")
+
+    def close(self):
+        """Закрытие журнала."""
+        with self._lock:
+            self._file.close()
+
+
+class Replayer:
+    """Функция запроса, отвечающая записанными ответами в виртуальном времени.
+
+    Опрос в момент `t` получает все записанные до `t` изменения
+    пользователя, поэтому воспроизведение не зависит от того, как часто
+    опрашивался пользователь при записи. Ошибка, записанная после
+    успешных ответов, поднимается при следующем опросе, чтобы эти
+    ответы не потерялись.
+    """
+
+    def __init__(self, path, clock):
+        """Загрузка журнала."""
+        self.clock = clock
+        self._entries = defaultdict(deque)
+        with gzip.open(path, "rt", encoding="utf-8") as source:
+            entries = sorted(
+                (json.loads(line) for line in source), key=lambda e: e["t"]
+            )
+        for entry in entries:
+            self._entries[entry["k"]].append(entry)
+        self.start = entries[0]["t"] if entries else 0.0
+        self.end = entries[-1]["t"] if entries else 0.0
+
+    def __call__(self, timestamp, headers):
+        """Накопленный к текущему виртуальному моменту ответ API."""
+        queue = self._entries.get(_key_from_headers(headers), ())
+        now = self.clock.time()
+        due = []
+        while queue and queue[0]["t"] <= now:
+            due.append(queue.popleft())
+        responses = [entry["r"] for entry in due if "r" in entry]
+        if due and "e" in due[-1]:
+            if not responses:
+                raise ConnectionError(due[-1]["e"])
+            queue.appendleft(due[-1])
+        homeworks = []
+        for response in reversed(responses):
+            homeworks.extend(response.get("homeworks", []))
+        current_date = (
+            responses[-1].get("current_date") if responses else None
+        )
+        return {
+            "homeworks": homeworks,
+            "current_date": current_date or int(now),
+        }
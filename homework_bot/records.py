@@ -0,0 +1,66 @@
+import logging
+import sys
+from datetime import datetime, timezone
+
+
+def intern_status(status):
+    """Общий экземпляр строки статуса для всех записей."""
+    return sys.intern(status) if isinstance(status, str) else status
+
+
+def parse_date(value):
+    """Дата в формате API (`2020-02-13T14:40:57Z`) как Unix-время.
+
+    Дата без часового пояса считается датой в UTC. Значение, которое
+    не удалось разобрать, заменяется на None: одна испорченная дата
+    не должна отбрасывать весь ответ API.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    try:
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, TypeError, ValueError):
+        if value is not None:
+            logging.warning("Неизвестный формат даты в ответе API: %r", value)
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+class Homework:
+    """Компактная запись о работе для хранения в памяти.
+
+    В отличие от словаря ответа API хранит только поля, нужные для
+    уведомлений и отслеживания изменений: статус — общая строка,
+    дата — целое число секунд.
+    """
+
+    __slots__ = ("id", "homework_name", "status", "date_updated",
+                 "lesson_name")
+
+    def __init__(self, id, homework_name, status, date_updated=None,
+                 lesson_name=None):
+        """Создание записи из проверенных полей ответа API."""
+        self.id = id
+        self.homework_name = homework_name
+        self.status = status
+        self.date_updated = date_updated
+        self.lesson_name = lesson_name
+
+    def _key(self):
+        return (self.id, self.homework_name, self.status, self.date_updated,
+                self.lesson_name)
+
+    def __eq__(self, other):
+        """Равенство по всем полям."""
+        if not isinstance(other, Homework):
+            return NotImplemented
+        return self._key() == other._key()
+
+    __hash__ = None
+
+    def __repr__(self):
+        """Представление для логов."""
+        return (f"Homework(id={self.id!r}, name={self.homework_name!r},"
+                f" status={self.status!r})")
@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+import hashlib
+import logging
+import random
+import resource
+import time
+
+from homework_bot.clock import VirtualClock
+from homework_bot.engine import TENANTS_FILE, PollingEngine
+from homework_bot.recording import Replayer
+from homework_bot.tenant import load_tenants
+
+
+class RecordingBot:
+    """Бот, который запоминает сообщения вместо отправки."""
+
+    def __init__(self):
+        """Пустой список сообщений."""
+        self.messages = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        """Запоминание сообщения."""
+        self.messages.append((chat_id, text))
+
+
+def replay(path, tenants, tick=1.0, seed=0):
+    """Прогон записанного трафика в виртуальном времени.
+
+    Возвращает словарь с числом сообщений, их хешем для сравнения
+    прогонов, виртуальной и реальной длительностью и пиком памяти.
+    """
+    clock = VirtualClock()
+    fetch = Replayer(path, clock)
+    clock.now = fetch.start
+    for tenant in tenants:
+        tenant.timestamp = int(fetch.start)
+    bot = RecordingBot()
+    engine = PollingEngine(
+        tenants, bot, concurrency=1, fetch=fetch, clock=clock,
+        rng=random.Random(seed),
+    )
+    started = time.perf_counter()
+    asyncio.run(engine.run_forever(tick=tick, until=fetch.end + tick))
+    elapsed = time.perf_counter() - started
+    engine.close()
+    digest = hashlib.sha256()
+    for chat_id, text in bot.messages:
+        digest.update(f"{chat_id}\t{text}\n".encode())
+    return {
+        "messages": len(bot.messages),
+        "digest": digest.hexdigest(),
+        "virtual_seconds": fetch.end - fetch.start,
+        "real_seconds": elapsed,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def main():
+    """Воспроизведение журнала из командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Воспроизведение записанных ответов API"
+    )
+    parser.add_argument("log", help="журнал, записанный с --record")
+    parser.add_argument("--tenants", default=TENANTS_FILE)
+    parser.add_argument("--tick", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    options = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    report = replay(
+        options.log, load_tenants(options.tenants), options.tick,
+        options.seed,
+    )
+    for name, value in report.items():
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
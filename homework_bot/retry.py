@@ -0,0 +1,104 @@
+import email.utils
+import logging
+import os
+import random
+import time
+from http import HTTPStatus
+
+from homework_bot import metrics
+from homework_bot.deadline import current_deadline
+
+API_RETRIES = int(os.getenv("API_RETRIES", 3))
+RETRY_BASE = float(os.getenv("RETRY_BASE", 0.5))
+RETRY_CAP = float(os.getenv("RETRY_CAP", 30))
+TRANSIENT_CODES = frozenset({
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+})
+
+
+class APIResponseError(ConnectionError):
+    """Ответ API с кодом, отличным от 200."""
+
+    def __init__(self, message, status_code=None, retry_after=None):
+        """Ошибка с кодом ответа и паузой из заголовка Retry-After."""
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value, now=time.time):
+    """Пауза в секундах из Retry-After: число секунд или HTTP-дата."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, moment.timestamp() - now())
+
+
+class RetryPolicy:
+    """Повтор запроса после временных ошибок API.
+
+    Пауза перед попыткой `n` выбирается равномерно от нуля до
+    `min(cap, base * 2 ** n)` (full jitter), но не меньше Retry-After.
+    Повтора нет, если пауза не помещается в остаток бюджета цикла.
+    """
+
+    def __init__(self, attempts=API_RETRIES, base=RETRY_BASE, cap=RETRY_CAP,
+                 rng=None, sleep=time.sleep):
+        """Политика с числом повторов и границами паузы в секундах."""
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+        self.random = rng or random.Random()
+        self.sleep = sleep
+
+    def delay(self, attempt, retry_after=None):
+        """Пауза перед повтором номер `attempt`, начиная с нуля."""
+        pause = self.random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+        if retry_after is not None:
+            pause = max(pause, retry_after)
+        return pause
+
+    @staticmethod
+    def reason(error):
+        """Причина повтора или None, если ошибка не временная."""
+        if not isinstance(error, APIResponseError):
+            return "network"
+        if error.status_code in TRANSIENT_CODES:
+            return str(int(error.status_code))
+        return None
+
+    def call(self, func, *args, **kwargs):
+        """Вызов `func` с повторами после временных ConnectionError."""
+        attempt = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except ConnectionError as error:
+                reason = self.reason(error)
+                if attempt >= self.attempts or reason is None:
+                    raise
+                pause = self.delay(
+                    attempt, getattr(error, "retry_after", None)
+                )
+                if pause >= current_deadline().remaining():
+                    raise
+                metrics.counter(
+                    "api_retries_total",
+                    "Повторные запросы к API после временных ошибок",
+                    {"reason": reason},
+                ).inc()
+                logging.warning(
+                    "Повтор запроса к API через %.2f с: %s", pause, error
+                )
+                self.sleep(pause)
+                attempt += 1
@@ -0,0 +1,90 @@
+import math
+import os
+import random
+
+SCHEDULER_TICK = float(os.getenv("SCHEDULER_TICK", 1))
+POLL_JITTER = float(os.getenv("POLL_JITTER", 0.1))
+
+
+class TimerWheel:
+    """Иерархическое колесо таймеров для сроков опроса пользователей.
+
+    Колесо уровня `n` покрывает `slots ** (n + 1)` тиков. Задание попадает
+    на уровень по удалённости срока и спускается на нижний уровень, когда
+    до него доходит очередь, поэтому постановка и срабатывание стоят O(1)
+    в амортизированном смысле. Сроки дальше верхнего уровня ждут
+    в списке переполнения.
+    """
+
+    def __init__(self, tick=SCHEDULER_TICK, start=0.0, slots=64, levels=4,
+                 jitter=POLL_JITTER, rng=None):
+        """Создание пустого колеса, отсчёт тиков идёт от `start`."""
+        self.tick = tick
+        self.start = start
+        self.slots = slots
+        self.levels = levels
+        self.jitter = jitter
+        self.random = rng or random.Random()
+        self._wheels = [
+            [[] for _ in range(slots)] for _ in range(levels)
+        ]
+        self._spans = [slots ** level for level in range(levels + 1)]
+        self._overflow = []
+        self._current = 0
+        self._size = 0
+
+    def __len__(self):
+        """Число запланированных заданий."""
+        return self._size
+
+    def _to_tick(self, when):
+        expires = math.ceil((when - self.start) / self.tick)
+        return max(self._current + 1, expires)
+
+    def schedule(self, item, when):
+        """Срабатывание `item` не раньше момента `when`."""
+        self._insert(self._to_tick(when), item)
+        self._size += 1
+
+    def schedule_after(self, item, delay, now):
+        """Срабатывание через `delay` секунд со случайным разбросом."""
+        spread = delay * self.jitter
+        self.schedule(item, now + delay + self.random.uniform(-spread, spread))
+
+    def _insert(self, expires, item):
+        delta = expires - self._current
+        for level in range(self.levels):
+            if delta < self._spans[level + 1]:
+                slot = (expires // self._spans[level]) % self.slots
+                self._wheels[level][slot].append((expires, item))
+                return
+        self._overflow.append((expires, item))
+
+    def _cascade(self):
+        for level in range(1, self.levels):
+            if self._current % self._spans[level]:
+                return
+            slot = (self._current // self._spans[level]) % self.slots
+            entries = self._wheels[level][slot]
+            self._wheels[level][slot] = []
+            for expires, item in entries:
+                self._insert(expires, item)
+        if not self._current % self._spans[self.levels]:
+            entries, self._overflow = self._overflow, []
+            for expires, item in entries:
+                self._insert(expires, item)
+
+    def advance(self, now):
+        """Сдвиг колеса к моменту `now` и список сработавших заданий."""
+        target = math.floor((now - self.start) / self.tick)
+        due = []
+        while self._current < target:
+            self._current += 1
+            self._cascade()
+            slot = self._current % self.slots
+            entries = self._wheels[0][slot]
+            if entries:
+                self._wheels[0][slot] = []
+                due.extend(item for _, item in entries)
+        self._size -= len(due)
+        return due
@@ -0,0 +1,113 @@
+from collections import namedtuple
+
+_MISSING = object()
+
+
+class Field:
+    """Поле записи в схеме ответа API."""
+
+    __slots__ = ("name", "required", "choices", "convert", "unexpected")
+
+    def __init__(self, name, required=False, choices=None, convert=None,
+                 unexpected=None):
+        """Описание поля: обязательность, допустимые значения, приведение."""
+        self.name = name
+        self.required = required
+        self.choices = choices
+        self.convert = convert
+        self.unexpected = unexpected or (
+            f"Неожиданное значение поля {name}: "
+        )
+
+
+def _field_source(index, field):
+    value = f"f{index}"
+    lines = [f"        {value} = get({field.name!r}, MISSING)"]
+    if field.required:
+        lines += [
+            f"        if {value} is MISSING:",
+            f"            raise KeyError(missing_{index})",
+        ]
+    else:
+        lines += [
+            f"        if {value} is MISSING:",
+            f"            {value} = None",
+        ]
+    if field.choices is not None:
+        lines += [
+            f"        if {value} not in choices_{index}:",
+            f"            raise ValueError(unexpected_{index} + str({value}))",
+        ]
+    if field.convert is not None:
+        lines += [
+            f"        if {value} is not None:",
+            f"            {value} = convert_{index}({value})",
+        ]
+    return lines
+
+
+def compile_validator(list_key, fields, record_type=None,
+                      record_name="Record"):
+    """Сборка функции проверки ответа API по схеме.
+
+    Схема разворачивается в код один раз, поэтому при проверке нет
+    обхода схемы: ответ проверяется и превращается в список записей
+    `record_type` за один проход. Проверка одного элемента списка
+    доступна как `validate.item`.
+    """
+    if record_type is None:
+        record_type = namedtuple(record_name, [f.name for f in fields])
+    namespace = {
+        "MISSING": _MISSING,
+        "Record": record_type,
+        "missing_list": f'Отсутствие ключа "{list_key}" в ответе API',
+    }
+    body = []
+    for index, field in enumerate(fields):
+        namespace[f"missing_{index}"] = (
+            f'Отсутствие ключа "{field.name}" в ответе API'
+        )
+        namespace[f"choices_{index}"] = field.choices
+        namespace[f"unexpected_{index}"] = field.unexpected
+        namespace[f"convert_{index}"] = field.convert
+        body += _field_source(index, field)
+    arguments = ", ".join(f"f{index}" for index in range(len(fields)))
+    source = "\n".join([
+        "def validate(payload):",
+        "    if not isinstance(payload, dict):",
+        "        raise TypeError('Ответ от API должен быть словарем,'",
+        "                        f' получен тип: {type(payload)}')",
+        "    items = payload.get(" + repr(list_key) + ", MISSING)",
+        "    if items is MISSING:",
+        "        raise KeyError(missing_list)",
+        "    if not isinstance(items, list):",
+        f"        raise TypeError('Данные под ключом \"{list_key}\" должны"
+        " быть списком,'",
+        "                        f' получен тип: {type(items)}')",
+        "    records = []",
+        "    append = records.append",
+        "    for item in items:",
+        "        if not isinstance(item, dict):",
+        "            raise TypeError('Запись должна быть словарем,'",
+        "                            f' получен тип: {type(item)}')",
+        "        get = item.get",
+        *body,
+        f"        append(Record({arguments}))",
+        "    return records",
+    ])
+    item_source = "\n".join([
+        "def validate_item(item):",
+        "    if not isinstance(item, dict):",
+        "        raise TypeError('Запись должна быть словарем,'",
+        "                        f' получен тип: {type(item)}')",
+        "    get = item.get",
+        *(line[4:] for line in body),
+        f"    return Record({arguments})",
+    ])
+    exec(compile(source, f"<validator {list_key}>", "exec"), namespace)
+    exec(compile(item_source, f"<validator {list_key} item>", "exec"),
+         namespace)
+    validate = namespace["validate"]
+    validate.record_type = record_type
+    validate.item = namespace["validate_item"]
+    return validate
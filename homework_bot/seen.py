@@ -0,0 +1,127 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from homework_bot import metrics
+
+SEEN_INDEX_SIZE = int(os.getenv("SEEN_INDEX_SIZE", 100_000))
+
+SUPPRESSED = metrics.counter(
+    "duplicate_notifications_suppressed_total",
+    "Переходы статуса, о которых уже сообщалось",
+)
+EVICTED = metrics.counter(
+    "seen_index_evictions_total",
+    "Переходы статуса, вытесненные из индекса отправленных",
+)
+
+
+def seen_key(tenant, record):
+    """Компактный ключ перехода: хэш пользователя, работы, статуса и даты.
+
+    Работа без идентификатора опознаётся по имени. Ключ — одно целое
+    число, поэтому индекс не хранит строки из ответа API. Хэш не зависит
+    от процесса, и ключи можно сохранять между запусками.
+    """
+    work = record.homework_name if record.id is None else record.id
+    digest = hashlib.blake2b(
+        f"{tenant}\0{work!r}\0{record.status}\0{record.date_updated}"
+        .encode(), digest_size=8,
+    ).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def transitions_key(keys):
+    """Ключ идемпотентности уведомления о переходах с ключами `keys`.
+
+    Ключ зависит только от самих переходов, поэтому те же переходы
+    в другом окне from_date дают тот же ключ.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for key in keys:
+        digest.update(key.to_bytes(8, "big", signed=True))
+    return digest.hexdigest()
+
+
+class SeenIndex:
+    """Индекс уже отправленных переходов статуса.
+
+    Проверка и отметка — одна операция со словарём. Индекс ограничен
+    `capacity` ключами и вытесняет те, что дольше всех не встречались.
+    С хранилищем `store` отмеченные ключи переживают перезапуск.
+    """
+
+    def __init__(self, capacity=SEEN_INDEX_SIZE, store=None):
+        """Индекс на `capacity` ключей, загруженных из `store`."""
+        self.capacity = capacity
+        self.store = store
+        self._entries = OrderedDict.fromkeys(
+            () if store is None else store.load_seen(capacity)
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Число отслеживаемых переходов."""
+        return len(self._entries)
+
+    def __contains__(self, key):
+        """Встречался ли переход, без отметки."""
+        return key in self._entries
+
+    def add(self, key):
+        """Отметка перехода; True, если он встретился впервые."""
+        entries = self._entries
+        with self._lock:
+            if key in entries:
+                entries.move_to_end(key)
+                SUPPRESSED.inc()
+                return False
+            entries[key] = None
+            if len(entries) > self.capacity:
+                entries.popitem(last=False)
+                EVICTED.inc()
+            return True
+
+    def fresh(self, tenant, records):
+        """Записи, о переходах которых ещё не сообщалось, и их ключи.
+
+        Переходы не отмечаются: это делает `mark` после доставки, иначе
+        сбой отправки превратил бы повтор в потерю уведомления.
+        Повторы внутри одного ответа отбрасываются.
+        """
+        entries = self._entries
+        result = []
+        keys = []
+        batch = set()
+        with self._lock:
+            for record in records:
+                key = seen_key(tenant, record)
+                if key in entries:
+                    entries.move_to_end(key)
+                    continue
+                if key in batch:
+                    continue
+                batch.add(key)
+                keys.append(key)
+                result.append(record)
+        if len(result) < len(records):
+            SUPPRESSED.inc(len(records) - len(result))
+        return result, keys
+
+    def mark(self, keys):
+        """Отметка доставленных переходов с вытеснением давних."""
+        if not keys:
+            return
+        entries = self._entries
+        with self._lock:
+            for key in keys:
+                entries[key] = None
+                entries.move_to_end(key)
+            evicted = max(len(entries) - self.capacity, 0)
+            for _ in range(evicted):
+                entries.popitem(last=False)
+        if evicted:
+            EVICTED.inc(evicted)
+        if self.store is not None:
+            self.store.save_seen(keys)
@@ -0,0 +1,85 @@
+import os
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from homework_bot import metrics
+
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 64))
+
+REQUESTS = metrics.counter(
+    "http_requests_total", "Запросы через общую HTTP-сессию"
+)
+CONNECTIONS = metrics.counter(
+    "http_connections_total", "Новые TCP/TLS-соединения"
+)
+HANDSHAKES = metrics.summary(
+    "http_handshake_seconds", "Время установки соединения"
+)
+
+
+def _timed_connect(connect):
+    def wrapper(self):
+        started = time.perf_counter()
+        connect(self)
+        HANDSHAKES.observe(time.perf_counter() - started)
+        CONNECTIONS.inc()
+    return wrapper
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    connect = _timed_connect(HTTPConnection.connect)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    connect = _timed_connect(HTTPSConnection.connect)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    """Адаптер, который считает запросы и новые соединения."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        """Пул соединений с замером времени установки соединения."""
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        """Отправка запроса с учётом в метриках."""
+        REQUESTS.inc()
+        return super().send(request, **kwargs)
+
+
+def build_session(pool_size=POOL_SIZE):
+    """Долгоживущая сессия с keep-alive и пулом соединений."""
+    session = requests.Session()
+    adapter = InstrumentedAdapter(
+        pool_connections=1, pool_maxsize=pool_size, pool_block=True
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    })
+    return session
+
+
+def reuse_ratio():
+    """Доля запросов, выполненных по уже открытому соединению."""
+    if not REQUESTS.value:
+        return 0.0
+    return max(0, REQUESTS.value - CONNECTIONS.value) / REQUESTS.value
@@ -0,0 +1,188 @@
+import os
+import sqlite3
+import threading
+import time
+
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", "")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tenants (
+    tenant TEXT PRIMARY KEY,
+    from_date INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS statuses (
+    tenant TEXT NOT NULL,
+    homework_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (tenant, homework_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS backfills (
+    tenant TEXT PRIMARY KEY,
+    from_date INTEGER NOT NULL,
+    processed INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS seen (
+    key INTEGER PRIMARY KEY,
+    seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS seen_order ON seen (seen_at);
+"""
+
+
+class StateStore:
+    """Хранилище отметок from_date и последних статусов в SQLite.
+
+    Записи копятся в памяти и сбрасываются одной транзакцией в `flush()`,
+    журнал в режиме WAL не блокирует чтение во время записи.
+    """
+
+    def __init__(self, path):
+        """Открытие базы и создание таблиц."""
+        self.path = path
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._dates = {}
+        self._statuses = {}
+        self._seen = {}
+
+    def load_dates(self):
+        """Все сохранённые отметки from_date по пользователям."""
+        self.flush()
+        return dict(self._conn.execute(
+            "SELECT tenant, from_date FROM tenants"
+        ))
+
+    def get_date(self, tenant, default=None):
+        """Сохранённая отметка from_date пользователя."""
+        with self._lock:
+            if tenant in self._dates:
+                return self._dates[tenant]
+        row = self._conn.execute(
+            "SELECT from_date FROM tenants WHERE tenant = ?", (tenant,)
+        ).fetchone()
+        return row[0] if row else default
+
+    def last_statuses(self, tenant):
+        """Последние известные статусы работ пользователя."""
+        self.flush()
+        return dict(self._conn.execute(
+            "SELECT homework_id, status FROM statuses WHERE tenant = ?",
+            (tenant,),
+        ))
+
+    def load_homeworks(self, status):
+        """Работы с последним статусом `status` по пользователям."""
+        self.flush()
+        homeworks = {}
+        for tenant, homework_id in self._conn.execute(
+            "SELECT tenant, homework_id FROM statuses WHERE status = ?",
+            (status,),
+        ):
+            homeworks.setdefault(tenant, set()).add(homework_id)
+        return homeworks
+
+    def save(self, tenant, from_date, records=()):
+        """Запоминание отметки и статусов до следующего `flush()`.
+
+        Записи — проверенные записи о работах с полями `id` и `status`.
+        """
+        with self._lock:
+            self._dates[tenant] = from_date
+        self.save_statuses(tenant, records)
+
+    def save_statuses(self, tenant, records):
+        """Запоминание статусов без изменения отметки from_date."""
+        with self._lock:
+            for record in records:
+                if record.id is not None:
+                    self._statuses[tenant, record.id] = record.status
+
+    def load_seen(self, limit):
+        """Ключи последних `limit` отправленных переходов, от давних к свежим.
+
+        Более давние ключи удаляются: индекс в памяти их всё равно
+        не удержал бы.
+        """
+        self._commit((
+            "DELETE FROM seen WHERE key NOT IN"
+            " (SELECT key FROM seen ORDER BY seen_at DESC LIMIT ?)",
+            (limit,),
+        ))
+        return [key for key, in self._conn.execute(
+            "SELECT key FROM seen ORDER BY seen_at"
+        )]
+
+    def save_seen(self, keys):
+        """Запоминание отправленных переходов до следующего `flush()`."""
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                self._seen[key] = now
+
+    def flush(self):
+        """Запись накопленных изменений одной транзакцией."""
+        self._commit()
+
+    def _commit(self, *statements):
+        with self._lock:
+            dates, self._dates = self._dates, {}
+            statuses, self._statuses = self._statuses, {}
+            seen, self._seen = self._seen, {}
+            if not (dates or statuses or seen or statements):
+                return
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO tenants VALUES (?, ?)",
+                    dates.items(),
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO statuses VALUES (?, ?, ?)",
+                    ((tenant, homework_id, status) for (tenant, homework_id),
+                     status in statuses.items()),
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO seen VALUES (?, ?)",
+                    seen.items(),
+                )
+                for sql, parameters in statements:
+                    self._conn.execute(sql, parameters)
+
+    def backfill_checkpoint(self, tenant):
+        """Начало и число обработанных записей незавершённой загрузки."""
+        self.flush()
+        return self._conn.execute(
+            "SELECT from_date, processed FROM backfills WHERE tenant = ?",
+            (tenant,),
+        ).fetchone()
+
+    def checkpoint_backfill(self, tenant, from_date, processed):
+        """Контрольная точка загрузки истории вместе с накопленными статусами.
+
+        Статусы и отметка о прогрессе пишутся одной транзакцией, поэтому
+        после сбоя загрузка продолжается ровно с последней точки.
+        """
+        self._commit((
+            "INSERT OR REPLACE INTO backfills VALUES (?, ?, ?)",
+            (tenant, from_date, processed),
+        ))
+
+    def finish_backfill(self, tenant, from_date):
+        """Завершение загрузки истории: обычный опрос продолжит с from_date."""
+        self.save(tenant, from_date)
+        self._commit(("DELETE FROM backfills WHERE tenant = ?", (tenant,)))
+
+    def close(self):
+        """Сброс изменений и закрытие базы."""
+        self.flush()
+        self._conn.close()
+
+
+def open_store(path=STATE_DB_PATH):
+    """Хранилище по пути из настроек или None, если путь не задан."""
+    return StateStore(path) if path else None
@@ -0,0 +1,105 @@
+import csv
+import os
+
+from homework_bot import metrics
+from homework_bot.tenant import tenant_key
+
+SUBSCRIPTIONS_FILE = os.getenv("SUBSCRIPTIONS_FILE", "subscriptions.csv")
+
+DELIVERIES = metrics.counter(
+    "subscription_deliveries_total",
+    "Сообщения о статусах, разосланные подписчикам помимо владельца",
+)
+
+
+class SubscriptionIndex:
+    """Подписки чатов на уведомления пользователя.
+
+    Чат подписывается на все работы пользователя или на одну работу по
+    её имени. Чат самого пользователя подписан на всё всегда.
+    """
+
+    def __init__(self):
+        """Пустой индекс подписок."""
+        self._all = {}
+        self._homeworks = {}
+
+    def __len__(self):
+        """Число подписок."""
+        return sum(map(len, self._all.values())) + sum(
+            len(chats) for homeworks in self._homeworks.values()
+            for chats in homeworks.values()
+        )
+
+    def subscribe(self, key, chat_id, homework_name=None):
+        """Подписка чата на работы пользователя с ключом `key`."""
+        if homework_name is None:
+            self._all.setdefault(key, set()).add(str(chat_id))
+        else:
+            self._homeworks.setdefault(key, {}).setdefault(
+                homework_name, set()
+            ).add(str(chat_id))
+
+    def chats(self, tenant):
+        """Чаты, подписанные на все работы пользователя."""
+        return {str(tenant.chat_id)} | self._all.get(tenant.key, set())
+
+    def route(self, tenant, records):
+        """Получатели записей: пары (чаты, номера записей).
+
+        Чаты, которым нужен один и тот же набор записей, собраны в одну
+        группу, поэтому сообщения группы склеиваются один раз.
+        """
+        chats = self.chats(tenant)
+        by_homework = self._homeworks.get(tenant.key)
+        if not by_homework:
+            return [(sorted(chats), list(range(len(records))))]
+        wanted = {}
+        for number, record in enumerate(records):
+            for chat_id in chats | by_homework.get(
+                record.homework_name, set()
+            ):
+                wanted.setdefault(chat_id, []).append(number)
+        groups = {}
+        for chat_id, numbers in wanted.items():
+            groups.setdefault(tuple(numbers), []).append(chat_id)
+        return [
+            (sorted(group), list(numbers))
+            for numbers, group in groups.items()
+        ]
+
+
+def merge_tenants(tenants, index):
+    """Один пользователь на токен: чаты повторных строк — в подписки.
+
+    Строки файла пользователей с одним токеном опрашивались бы
+    отдельными запросами; вместо этого их чаты подписываются на
+    уведомления первой строки.
+    """
+    unique = {}
+    for tenant in tenants:
+        first = unique.setdefault(tenant.key, tenant)
+        if first is not tenant and first.chat_id != tenant.chat_id:
+            index.subscribe(tenant.key, tenant.chat_id)
+    return list(unique.values())
+
+
+def load_subscriptions(path=SUBSCRIPTIONS_FILE):
+    """Загрузка подписок из CSV-файла; без файла — пустой индекс.
+
+    Формат строки: `token,chat_id[,homework_name]`, где token — токен
+    Практикума пользователя, на чьи работы подписывается чат.
+    """
+    index = SubscriptionIndex()
+    if not os.path.exists(path):
+        return index
+    with open(path, newline="", encoding="utf-8") as source:
+        for row in csv.reader(source):
+            if not row or row[0].startswith("#"):
+                continue
+            homework_name = row[2].strip() if len(row) > 2 else ""
+            index.subscribe(
+                tenant_key(row[0].strip()), row[1].strip(),
+                homework_name or None,
+            )
+    return index
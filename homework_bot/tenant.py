@@ -0,0 +1,79 @@
+import csv
+import hashlib
+
+
+class Tenant:
+    """Пользователь бота: токен Практикума и чат для уведомлений."""
+
+    __slots__ = (
+        "token", "key", "chat_id", "timestamp", "error_digest",
+        "last_status", "reviewing", "errors", "interval", "min_interval",
+        "max_interval",
+    )
+
+    def __init__(self, token, chat_id, timestamp=0, min_interval=None,
+                 max_interval=None):
+        """Создание пользователя с начальной отметкой from_date."""
+        self.token = token
+        self.key = tenant_key(token)
+        self.chat_id = chat_id
+        self.timestamp = timestamp
+        self.error_digest = None
+        self.last_status = None
+        self.reviewing = set()
+        self.errors = 0
+        self.interval = None
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+    @property
+    def headers(self):
+        """Заголовки запроса к API с токеном пользователя."""
+        return {"Authorization": f"OAuth {self.token}"}
+
+    def track(self, records):
+        """Учёт статусов из ответа API, записи от новых к старым.
+
+        Работа попадает в `reviewing`, пока её последний статус —
+        на проверке, а `last_status` — статус самой новой записи.
+        """
+        for record in reversed(records):
+            work = record.homework_name if record.id is None else record.id
+            if record.status == "reviewing":
+                self.reviewing.add(work)
+            else:
+                self.reviewing.discard(work)
+        if records:
+            self.last_status = records[0].status
+
+    def __repr__(self):
+        """Представление без токена, чтобы он не попал в логи."""
+        return f"Tenant(chat_id={self.chat_id!r})"
+
+
+def tenant_key(token):
+    """Ключ пользователя для хранилища, по которому не восстановить токен."""
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def _optional_float(row, index):
+    if len(row) > index and row[index].strip():
+        return float(row[index])
+    return None
+
+
+def load_tenants(path, timestamp=0):
+    """Загрузка пользователей из CSV-файла.
+
+    Формат строки: `token,chat_id[,min_interval,max_interval]`.
+    """
+    with open(path, newline="", encoding="utf-8") as source:
+        return [
+            Tenant(
+                row[0].strip(), row[1].strip(), timestamp,
+                min_interval=_optional_float(row, 2),
+                max_interval=_optional_float(row, 3),
+            )
+            for row in csv.reader(source)
+            if row and not row[0].startswith("#")
+        ]
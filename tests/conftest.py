@@ -1,7 +1,9 @@
 import os
 import sys
 
+import pytest
 import pytest_timeout
+import requests
 
 root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(root_dir)
@@ -53,3 +55,50 @@ pytest_timeout.write = write_timeout_reasons
 os.environ['PRACTICUM_TOKEN'] = 'sometoken'
 os.environ['TELEGRAM_TOKEN'] = '1234:abcdefg'
 os.environ['TELEGRAM_CHAT_ID'] = '12345'
+
+
+class FakeClock:
+    """Часы, которые идут только при изменении `now`."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingBot:
+    """Бот, запоминающий сообщения; при `down` Telegram недоступен."""
+
+    def __init__(self, down=False):
+        self.down = down
+        self.sent = []
+        self.attempts = 0
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.attempts += 1
+        if self.down:
+            raise requests.ConnectionError('Telegram недоступен')
+        self.sent.append((chat_id, text))
+
+
+class NullBot:
+    """Бот, отбрасывающий сообщения."""
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        pass
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def bot():
+    return RecordingBot()
+
+
+@pytest.fixture
+def null_bot():
+    return NullBot()
@@ -0,0 +1,192 @@
+import pytest
+
+import homework
+from benchmarks.stubs import PracticumStub, make_homeworks
+from homework_bot import engine as polling
+from homework_bot.backfill import Backfill
+from homework_bot.records import Homework
+from homework_bot.outbox import Outbox
+from homework_bot.state import StateStore
+from homework_bot.subscriptions import SubscriptionIndex
+from homework_bot.tenant import Tenant
+
+
+def deliver_to(sent):
+    def deliver(tenant, records):
+        sent.append((tenant.chat_id, '\n\n'.join(
+            f'{record.id}:{record.status}' for record in records
+        )))
+        return True
+
+    return deliver
+
+
+def make_stream(count, fail_after=None, current_date=5000):
+    requested = []
+
+    def stream(from_date, headers, on_fields=None):
+        requested.append(from_date)
+        for number in range(count):
+            if number == fail_after:
+                raise ConnectionError('Соединение разорвано')
+            yield Homework(number, f'hw{number}', 'approved')
+        on_fields({'current_date': current_date})
+
+    return stream, requested
+
+
+def notified_ids(sent):
+    return [
+        int(line.split(':')[0])
+        for _, text in sent for line in text.split('\n\n')
+    ]
+
+
+def test_backfill_checkpoints_and_finishes(tmp_path):
+    store = StateStore(str(tmp_path / 'state.db'))
+    tenant = Tenant('tok', '1')
+    sent = []
+    stream, requested = make_stream(1200)
+    drained = []
+    filler = Backfill(store, stream, deliver_to(sent), batch=500,
+                      drain=lambda: drained.append(len(sent)))
+
+    assert filler.run(tenant, 100) == 1200
+
+    assert requested == [100]
+    assert sorted(notified_ids(sent)) == list(range(1200))
+    assert drained == [1, 2, 3]
+    assert len(store.last_statuses(tenant.key)) == 1200
+    assert store.get_date(tenant.key) == 5000
+    assert store.backfill_checkpoint(tenant.key) is None
+    store.close()
+
+
+def test_interrupted_backfill_resumes_from_checkpoint(tmp_path):
+    path = str(tmp_path / 'state.db')
+    tenant = Tenant('tok', '1')
+    sent = []
+    deliver = deliver_to(sent)
+
+    store = StateStore(path)
+    stream, _ = make_stream(1200, fail_after=700)
+    with pytest.raises(ConnectionError):
+        Backfill(store, stream, deliver, batch=500).run(
+            tenant, 100
+        )
+    assert store.backfill_checkpoint(tenant.key) == (100, 500)
+    store.close()
+
+    first = notified_ids(sent)
+    sent.clear()
+    store = StateStore(path)
+    stream, requested = make_stream(1200)
+    filler = Backfill(store, stream, deliver, batch=500)
+    assert filler.run(tenant, 999) == 1200
+
+    assert requested == [100]
+    assert first == list(range(500))
+    assert notified_ids(sent) == list(range(500, 1200))
+    assert store.backfill_checkpoint(tenant.key) is None
+    store.close()
+
+
+def test_engine_backfill_from_stub(tmp_path, monkeypatch, bot):
+    tenants_file = tmp_path / 'tenants.csv'
+    tenants_file.write_text('tok1,100\ntok2,200\n')
+    path = str(tmp_path / 'state.db')
+    monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:abcdefg')
+    monkeypatch.setattr(homework, 'STREAM_CHUNK', 1024)
+    monkeypatch.setattr(polling, 'TENANTS_FILE', str(tenants_file))
+    monkeypatch.setattr(polling.telebot, 'TeleBot', lambda token: bot)
+    monkeypatch.setattr(polling, 'open_store', lambda: StateStore(path))
+    monkeypatch.setattr(polling, 'open_outbox', lambda: Outbox(path))
+    with PracticumStub(make_homeworks(40), current_date=1234) as stub:
+        monkeypatch.setattr(homework, 'ENDPOINT', stub.url)
+        polling.main(['--backfill', '2021-01-01T00:00:00Z'])
+
+    for chat_id in ('100', '200'):
+        texts = [text for sent_to, text in bot.sent if sent_to == chat_id]
+        assert sum(text.count('Изменился статус') for text in texts) == 40
+    store = StateStore(path)
+    assert store.load_dates() == {
+        Tenant('tok1', '100').key: 1234, Tenant('tok2', '200').key: 1234,
+    }
+    assert len(store.last_statuses(Tenant('tok1', '100').key)) == 40
+    store.close()
+
+    outbox = Outbox(path)
+    assert outbox.pending() == 0
+    outbox.close()
+
+
+def test_failed_delivery_keeps_checkpoint(tmp_path):
+    store = StateStore(str(tmp_path / 'state.db'))
+    tenant = Tenant('tok', '1')
+    stream, _ = make_stream(600)
+    filler = Backfill(store, stream, lambda tenant, records: False,
+                      batch=500)
+    with pytest.raises(ConnectionError):
+        filler.run(tenant, 100)
+    assert store.backfill_checkpoint(tenant.key) == (100, 0)
+    assert store.last_statuses(tenant.key) == {}
+    store.close()
+
+
+def test_backfill_requires_outbox(tmp_path, monkeypatch):
+    monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:abcdefg')
+    monkeypatch.setattr(polling, 'open_store',
+                        lambda: StateStore(str(tmp_path / 'state.db')))
+    monkeypatch.setattr(polling, 'open_outbox', lambda: None)
+    with pytest.raises(SystemExit):
+        polling.main(['--backfill', '100'])
+
+
+def test_engine_backfill_reaches_subscribers_once(tmp_path, monkeypatch, bot):
+    path = str(tmp_path / 'state.db')
+    tenant = Tenant('tok', '1')
+    index = SubscriptionIndex()
+    index.subscribe(tenant.key, '2')
+    stream, _ = make_stream(3)
+    monkeypatch.setattr(homework, 'stream_records',
+                        lambda *args, session=None, **kwargs: stream(
+                            *args, **kwargs))
+    engine = polling.PollingEngine(
+        [tenant], bot, concurrency=1, fetch=lambda *args: {
+            'homeworks': [{'id': 0, 'homework_name': 'hw0',
+                           'status': 'approved'}],
+        },
+        store=StateStore(path), outbox=Outbox(path), subscriptions=index,
+    )
+    assert engine.backfill(100) == []
+    engine.poll_tenant(tenant)
+    engine.drain_outbox()
+    engine.close()
+
+    assert sorted(chat_id for chat_id, _ in bot.sent) == ['1', '2']
+    assert all(text.count('Изменился статус') == 3 for _, text in bot.sent)
+
+
+def test_backfill_resends_transition_whose_poll_failed(tmp_path, monkeypatch,
+                                                        bot):
+    store = StateStore(str(tmp_path / 'state.db'))
+    tenant = Tenant('tok', '1', 10)
+    stream, _ = make_stream(1)
+    monkeypatch.setattr(homework, 'stream_records',
+                        lambda *args, session=None, **kwargs: stream(
+                            *args, **kwargs))
+    engine = polling.PollingEngine(
+        [tenant], bot, concurrency=1, store=store,
+        fetch=lambda *args: {'homeworks': [
+            {'id': 0, 'homework_name': 'hw0', 'status': 'approved'},
+        ], 'current_date': 20},
+    )
+    bot.down = True
+    engine.poll_tenant(tenant)
+    assert store.last_statuses(tenant.key) == {}
+
+    bot.down = False
+    assert engine.backfill(0) == []
+    engine.close()
+    assert len(bot.sent) == 1
+    assert 'hw0' in bot.sent[0][1]
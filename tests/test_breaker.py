@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+import homework
+from benchmarks.stubs import PracticumStub
+from homework_bot import metrics
+from homework_bot.breaker import (CLOSED, HALF_OPEN, OPEN, CircuitBreaker,
+                                  CircuitOpenError, breaker_for)
+from homework_bot.engine import PollingEngine
+from homework_bot.retry import APIResponseError
+from homework_bot.tenant import Tenant
+
+
+def fail():
+    raise ConnectionError('API недоступен')
+
+
+def test_breaker_opens_after_threshold_and_probes_once(clock):
+    breaker = CircuitBreaker('test://open', threshold=2, cooldown=10,
+                             clock=clock)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: 'ok')
+
+    clock.now = 10
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.opened_at == 10
+
+    clock.now = 20
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.state == CLOSED
+    transitions = metrics.counter(
+        'circuit_transitions_total',
+        labels={'endpoint': 'test://open', 'state': OPEN},
+    )
+    assert transitions.value == 2
+
+
+def test_breaker_ignores_non_connection_errors():
+    breaker = CircuitBreaker('test://types', threshold=1)
+    with pytest.raises(KeyError):
+        breaker.call(lambda: {}['homeworks'])
+    assert breaker.state == CLOSED
+
+
+def test_breaker_ignores_rejected_tokens(bot):
+    tenants = [Tenant(f'bad{i}', str(i)) for i in range(5)] + [
+        Tenant(f'good{i}', str(10 + i)) for i in range(5)
+    ]
+    bad = {tenant.headers['Authorization'] for tenant in tenants[:5]}
+    breaker = CircuitBreaker('test://unauthorized', threshold=5)
+
+    def fetch(timestamp, headers):
+        if headers['Authorization'] in bad:
+            raise APIResponseError('Код ответа: 401', status_code=401)
+        return {'homeworks': [], 'current_date': 5}
+
+    engine = PollingEngine(tenants, bot, concurrency=1, fetch=fetch,
+                           breaker=breaker)
+    asyncio.run(engine.run_cycle())
+    engine.close()
+
+    assert breaker.state == CLOSED
+    assert sorted(int(chat_id) for chat_id, _ in bot.sent) == list(range(5))
+    assert all(tenant.timestamp == 5 for tenant in tenants[5:])
+
+
+def test_breaker_counts_server_errors_as_failures():
+    breaker = CircuitBreaker('test://server', threshold=2)
+
+    def bad_gateway():
+        raise APIResponseError('Код ответа: 502', status_code=502)
+
+    for _ in range(2):
+        with pytest.raises(APIResponseError):
+            breaker.call(bad_gateway)
+    assert breaker.state == OPEN
+
+
+def test_breaker_counts_deadline_timeouts_as_failures(bot):
+    breaker = CircuitBreaker('test://timeout', threshold=2)
+    tenant = Tenant('tok', '1')
+
+    def exhausted(timestamp, headers):
+        raise TimeoutError('Бюджет цикла опроса исчерпан')
+
+    engine = PollingEngine([tenant], bot, concurrency=1,
+                           fetch=exhausted, breaker=breaker)
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            engine._request(tenant.timestamp, tenant.headers)
+    engine.close()
+    assert breaker.state == OPEN
+
+
+def test_breaker_is_shared_per_endpoint():
+    assert breaker_for('test://shared') is breaker_for('test://shared')
+    assert breaker_for('test://shared') is not breaker_for('test://other')
+
+
+def test_engine_short_circuits_flaky_endpoint(monkeypatch, clock, bot):
+    tenants = [Tenant(f'tok{i}', str(i), 0) for i in range(10)]
+    with PracticumStub(error_rate=1.0) as stub:
+        monkeypatch.setattr(homework, 'ENDPOINT', stub.url)
+        breaker = CircuitBreaker(stub.url, threshold=3, cooldown=30,
+                                 clock=clock)
+        engine = PollingEngine(tenants, bot, concurrency=1,
+                               breaker=breaker)
+        asyncio.run(engine.run_cycle())
+        assert stub.requests == 3
+        assert breaker.state == OPEN
+        assert all(tenant.errors == 1 for tenant in tenants)
+
+        asyncio.run(engine.run_cycle())
+        assert stub.requests == 3
+
+        clock.now = 30
+        stub.error_rate = 0.0
+        asyncio.run(engine.run_cycle())
+        engine.close()
+
+    assert stub.requests == 13
+    assert breaker.state == CLOSED
+    assert all(tenant.errors == 0 for tenant in tenants)
@@ -0,0 +1,161 @@
+import threading
+import time
+
+import pytest
+from telebot import TeleBot, types
+
+import homework
+from homework_bot import engine as polling
+from homework_bot.breaker import OPEN, CircuitBreaker
+from homework_bot.commands import (CommandHandler, SingleFlight, TTLCache,
+                                   register_commands)
+from homework_bot.engine import PollingEngine
+from homework_bot.tenant import Tenant
+
+HOMEWORKS = {
+    'homeworks': [
+        {'id': 2, 'homework_name': 'hw2.zip', 'status': 'reviewing',
+         'date_updated': '2024-03-02T10:00:00Z'},
+        {'id': 1, 'homework_name': 'hw1.zip', 'status': 'approved',
+         'date_updated': '2024-03-01T09:30:00Z'},
+    ],
+    'current_date': 1709400000,
+}
+
+
+def make_handler(fetch, clock):
+    cache = TTLCache(ttl=60, capacity=10, clock=clock)
+    return CommandHandler(
+        [Tenant('tok', '100')], fetch, homework.check_response,
+        homework.HOMEWORK_VERDICTS, cache=cache,
+    )
+
+
+def test_ttl_cache_expires_and_evicts_least_recent(clock):
+    cache = TTLCache(ttl=10, capacity=2, clock=clock)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    clock.now = 10
+    assert cache.get('a') is None
+    assert len(cache) == 1
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+    barrier = threading.Barrier(8)
+    results = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'ответ'
+
+    def worker():
+        barrier.wait()
+        results.append(flight.do('tenant', load))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ['ответ'] * 8
+
+
+def test_single_flight_shares_errors():
+    def fail():
+        raise ConnectionError('API недоступен')
+
+    flight = SingleFlight()
+    with pytest.raises(ConnectionError):
+        flight.do('tenant', fail)
+    assert flight.do('tenant', lambda: 'снова') == 'снова'
+
+
+def test_commands_answer_from_cache(clock):
+    requested = []
+
+    def fetch(timestamp, headers):
+        requested.append(timestamp)
+        return HOMEWORKS
+
+    handler = make_handler(fetch, clock)
+    assert handler.answer('100', 'status') == (
+        'Последняя работа "hw2.zip": Работа взята на проверку ревьюером.'
+    )
+    assert handler.answer('100', 'history').splitlines() == [
+        '01.03.2024 09:30 "hw1.zip": Работа проверена: ревьюеру всё '
+        'понравилось. Ура!',
+        '02.03.2024 10:00 "hw2.zip": Работа взята на проверку ревьюером.',
+    ]
+    assert requested == [0]
+
+    handler.invalidate(Tenant('tok', '100'))
+    handler.answer('100', 'status')
+    assert requested == [0, 0]
+    assert 'не подписан' in handler.answer('999', 'status')
+
+
+def test_commands_report_api_errors(clock):
+    def fetch(timestamp, headers):
+        raise ConnectionError('API недоступен')
+
+    answer = make_handler(fetch, clock).answer('100', 'status')
+    assert answer == 'Не удалось получить статус: API недоступен'
+
+
+def test_tenants_sharing_a_chat_are_all_answered():
+    def fetch(timestamp, headers):
+        if headers['Authorization'] == 'OAuth first':
+            return HOMEWORKS
+        return {'homeworks': [], 'current_date': 0}
+
+    handler = CommandHandler(
+        [Tenant('first', '100'), Tenant('second', '100')], fetch,
+        homework.check_response, homework.HOMEWORK_VERDICTS,
+    )
+    assert handler.answer('100', 'status') == (
+        'Последняя работа "hw2.zip": Работа взята на проверку ревьюером.'
+        '\n\nРабот на проверке пока нет.'
+    )
+
+
+def test_commands_go_through_engine_breaker(monkeypatch):
+    def fail(timestamp, headers):
+        raise ConnectionError('API недоступен')
+
+    breaker = CircuitBreaker('test://commands', threshold=1)
+    engine = PollingEngine([Tenant('tok', '100')], None, concurrency=1,
+                           fetch=fail, breaker=breaker)
+    monkeypatch.setattr(threading.Thread, 'start', lambda self: None)
+    polling.start_commands(engine, TeleBot('1234:abcdefg', threaded=False))
+    engine.commands.answer('100', 'status')
+    engine.close()
+    assert breaker.state == OPEN
+
+
+def test_bot_routes_commands_to_handler(clock):
+    bot = TeleBot('1234:abcdefg', threaded=False)
+    sent = []
+    register_commands(bot, make_handler(lambda *args: HOMEWORKS, clock),
+                      lambda chat_id, text: sent.append((chat_id, text)))
+    update = types.Update.de_json({
+        'update_id': 1,
+        'message': {
+            'message_id': 1, 'date': 0, 'text': '/history@homework_bot',
+            'chat': {'id': 100, 'type': 'private'},
+            'entities': [{'type': 'bot_command', 'offset': 0, 'length': 21}],
+        },
+    })
+    bot.process_new_updates([update])
+
+    assert len(sent) == 1
+    assert sent[0][0] == '100'
+    assert sent[0][1].startswith('01.03.2024 09:30 "hw1.zip"')
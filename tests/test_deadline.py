@@ -0,0 +1,37 @@
+import time
+
+import pytest
+
+import homework
+from benchmarks.stubs import PracticumStub
+from homework_bot import deadline as cycle_deadline
+from homework_bot.deadline import Deadline, current_deadline
+
+
+def test_stage_timeouts_capped_by_remaining_budget(clock):
+    deadline = Deadline(budget=10, connect=3, read=8, send=5, clock=clock)
+    assert deadline.request_timeout() == (3, 8)
+    clock.now = 7
+    assert deadline.request_timeout() == (3, 3)
+    assert deadline.send_timeout() == 3
+    clock.now = 10
+    with pytest.raises(TimeoutError):
+        deadline.send_timeout()
+
+
+def test_current_deadline_is_scoped():
+    with Deadline(budget=5) as deadline:
+        assert current_deadline() is deadline
+    assert current_deadline() is not deadline
+
+
+def test_stalled_api_does_not_hang_cycle(monkeypatch):
+    overruns = cycle_deadline.OVERRUNS.value
+    with PracticumStub(latency=1.5) as stub:
+        monkeypatch.setattr(homework, 'ENDPOINT', stub.url)
+        started = time.monotonic()
+        with pytest.raises(ConnectionError):
+            with Deadline(budget=0.2, connect=0.5, read=0.5, send=0.5):
+                homework.get_api_answer(0)
+        assert time.monotonic() - started < 1
+    assert cycle_deadline.OVERRUNS.value == overruns + 1
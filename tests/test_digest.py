@@ -0,0 +1,69 @@
+import asyncio
+
+from homework_bot.digest import ErrorDigest, signature
+from homework_bot.engine import PollingEngine
+from homework_bot.tenant import Tenant
+
+
+def test_signature_ignores_variable_details():
+    first = ("Ошибка при запросе к API: Read timed out. Параметры: "
+             "{'from_date': 1700000000}")
+    second = ("Ошибка при запросе к API: Read timed out. Параметры: "
+              "{'from_date': 1700000600}")
+    assert signature(first) == signature(second)
+    assert signature('id 0xdeadbeef  at 10:31:09') == 'id # at #'
+    assert signature('Код ответа: 502') != signature('Неожиданный статус')
+
+
+def test_repeats_are_folded_into_windowed_digest(clock):
+    digest = ErrorDigest(window=600, clock=clock)
+    assert digest.record('Код ответа: 502, from_date 1')
+    assert digest.record('KeyError: homeworks')
+    for number in range(5):
+        clock.now += 60
+        assert not digest.record(f'Код ответа: 503, from_date {number}')
+    assert not digest.record('KeyError: homeworks')
+    assert digest.flush() is None
+
+    clock.now = 600
+    text = digest.flush()
+    assert text.splitlines() == [
+        'Сводка повторяющихся ошибок за 10 мин:',
+        '5 × Код ответа: 503, from_date 4',
+        '1 × KeyError: homeworks',
+    ]
+    assert digest.flush() is None
+
+
+def test_quiet_signatures_expire_and_table_is_bounded(clock):
+    digest = ErrorDigest(window=100, capacity=2, clock=clock)
+    digest.record('a')
+    digest.record('a')
+    digest.record('b')
+    digest.record('c')
+    assert len(digest) == 2
+    clock.now = 100
+    assert digest.flush().splitlines()[-1] == 'Других повторов: 1'
+    assert len(digest) == 0
+    assert digest.record('b')
+
+
+def test_engine_sends_digest_instead_of_every_error(bot, clock):
+    tenant = Tenant('tok', '1', 10)
+    cycles = iter(range(100))
+
+    def fetch(timestamp, headers):
+        raise ConnectionError(f'Сбой, попытка {next(cycles)}')
+
+    engine = PollingEngine([tenant], bot, concurrency=1, fetch=fetch)
+    tenant.error_digest = ErrorDigest(window=3600, clock=clock)
+    for _ in range(18):
+        clock.now += 600
+        asyncio.run(engine.run_cycle())
+    engine.close()
+
+    texts = [text for _, text in bot.sent]
+    assert texts[0] == 'Возникла ошибка: Сбой, попытка 0'
+    assert len(texts) == 3
+    assert texts[1].startswith('Сводка повторяющихся ошибок за 60 мин')
+    assert texts[2].startswith('Сводка повторяющихся ошибок за 120 мин')
@@ -0,0 +1,109 @@
+import threading
+import time
+
+from telebot import apihelper
+
+from homework_bot import dispatcher as telegram_dispatcher
+from homework_bot.dispatcher import Dispatcher, TokenBucket
+
+
+class ThrottlingBot:
+    def __init__(self, throttle_first=0):
+        self.sent = []
+        self.throttle_first = throttle_first
+        self.lock = threading.Lock()
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        with self.lock:
+            if self.throttle_first:
+                self.throttle_first -= 1
+                raise apihelper.ApiTelegramException(
+                    'sendMessage', None, {
+                        'error_code': 429,
+                        'description': 'Too Many Requests',
+                        'parameters': {'retry_after': 0.05},
+                    }
+                )
+            self.sent.append((chat_id, text, time.monotonic()))
+
+
+def test_token_bucket_rate_and_pause(clock):
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+    assert bucket.delay() == 0
+    bucket.consume()
+    bucket.consume()
+    assert bucket.delay() == 0.5
+    clock.now = 0.5
+    assert bucket.delay() == 0
+    bucket.pause(3)
+    assert bucket.delay() == 3
+    clock.now = 3.5
+    assert bucket.delay() == 0
+
+
+def test_dispatcher_delivers_in_order_per_chat():
+    bot = ThrottlingBot()
+    dispatcher = Dispatcher(bot, global_rate=1000, chat_rate=1000).start()
+    for i in range(5):
+        for chat_id in ('a', 'b'):
+            assert dispatcher.submit(chat_id, f'{chat_id}{i}')
+    dispatcher.stop(timeout=1)
+
+    assert len(bot.sent) == 10
+    for chat_id in ('a', 'b'):
+        texts = [text for chat, text, _ in bot.sent if chat == chat_id]
+        assert texts == [f'{chat_id}{i}' for i in range(5)]
+
+
+def test_dispatcher_throttles_per_chat():
+    bot = ThrottlingBot()
+    dispatcher = Dispatcher(bot, global_rate=1000, chat_rate=20).start()
+    for i in range(3):
+        dispatcher.submit('a', str(i))
+    dispatcher.submit('b', 'fast')
+    dispatcher.stop(timeout=1)
+
+    times = {text: sent_at for _, text, sent_at in bot.sent}
+    assert times['2'] - times['0'] >= 0.09
+    assert times['fast'] < times['1']
+
+
+def test_dispatcher_honors_retry_after():
+    throttled = telegram_dispatcher.THROTTLED.value
+    bot = ThrottlingBot(throttle_first=1)
+    dispatcher = Dispatcher(bot, global_rate=1000, chat_rate=1000).start()
+    started = time.monotonic()
+    dispatcher.submit('a', 'hello')
+    dispatcher.stop(timeout=1)
+
+    assert [text for _, text, _ in bot.sent] == ['hello']
+    assert bot.sent[0][2] - started >= 0.05
+    assert telegram_dispatcher.THROTTLED.value == throttled + 1
+
+
+def test_submit_applies_backpressure():
+    dispatcher = Dispatcher(ThrottlingBot(), maxsize=1)
+    assert dispatcher.submit('a', 'first')
+    assert not dispatcher.submit('a', 'second', timeout=0.01)
+    assert telegram_dispatcher.QUEUE_DEPTH.value == 1
+
+
+def test_dispatcher_reports_delivery_result():
+    class FailingBot(ThrottlingBot):
+        def send_message(self, chat_id=None, text=None, **kwargs):
+            if text == 'плохое':
+                raise apihelper.ApiTelegramException(
+                    'sendMessage', None, {
+                        'error_code': 403, 'description': 'Forbidden',
+                    }
+                )
+            super().send_message(chat_id, text)
+
+    results = []
+    dispatcher = Dispatcher(FailingBot(), global_rate=1000,
+                            chat_rate=1000).start()
+    dispatcher.submit('a', 'хорошее', on_done=lambda ok: results.append(ok))
+    dispatcher.submit('a', 'плохое', on_done=lambda ok: results.append(ok))
+    dispatcher.stop(timeout=1)
+
+    assert results == [True, False]
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+import homework
+from benchmarks.stubs import PracticumStub
+from homework_bot import engine as polling
+from homework_bot.engine import PollingEngine
+from homework_bot.state import StateStore
+from homework_bot.tenant import Tenant, load_tenants
+
+
+def make_fetch(responses):
+    def fetch(timestamp, headers):
+        response = responses[headers['Authorization']]
+        if isinstance(response, Exception):
+            raise response
+        return response
+    return fetch
+
+
+def test_load_tenants(tmp_path):
+    path = tmp_path / 'tenants.csv'
+    path.write_text('# token,chat_id\ntok1,100\ntok2, 200\n')
+    tenants = load_tenants(path, timestamp=42)
+    assert [(t.token, t.chat_id) for t in tenants] == [
+        ('tok1', '100'), ('tok2', '200')
+    ]
+    assert all(t.timestamp == 42 for t in tenants)
+    assert 'tok1' not in repr(tenants[0])
+
+
+def test_run_cycle_polls_every_tenant(data_with_new_hw_status, bot):
+    tenants = [Tenant('tok1', '1', 10), Tenant('tok2', '2', 20)]
+    fetch = make_fetch({
+        'OAuth tok1': data_with_new_hw_status,
+        'OAuth tok2': {'homeworks': [], 'current_date': 30},
+    })
+    engine = PollingEngine(tenants, bot, concurrency=2, fetch=fetch)
+    asyncio.run(engine.run_cycle())
+    engine.close()
+
+    assert [chat_id for chat_id, _ in bot.sent] == ['1']
+    assert 'Ура!' in bot.sent[0][1]
+    assert tenants[0].timestamp == data_with_new_hw_status['current_date']
+    assert tenants[1].timestamp == 30
+
+
+def test_repeated_error_sent_once(bot):
+    tenant = Tenant('tok', '1', 10)
+    fetch = make_fetch({'OAuth tok': ConnectionError('API недоступен')})
+    engine = PollingEngine([tenant], bot, concurrency=1, fetch=fetch)
+    for _ in range(3):
+        asyncio.run(engine.run_cycle())
+    engine.close()
+
+    assert len(bot.sent) == 1
+    assert tenant.timestamp == 10
+
+
+def test_once_runs_single_cycle_and_persists_state(tmp_path, monkeypatch, bot):
+    tenants_file = tmp_path / 'tenants.csv'
+    tenants_file.write_text('tok1,100\ntok2,200\n')
+    path = str(tmp_path / 'state.db')
+    homeworks = [{'id': 1, 'homework_name': 'hw.zip', 'status': 'approved'}]
+    monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:abcdefg')
+    monkeypatch.setattr(polling, 'TENANTS_FILE', str(tenants_file))
+    monkeypatch.setattr(polling.telebot, 'TeleBot', lambda token: bot)
+    monkeypatch.setattr(polling, 'open_store', lambda: StateStore(path))
+    with PracticumStub(homeworks=homeworks, current_date=1234) as stub:
+        monkeypatch.setattr(homework, 'ENDPOINT', stub.url)
+        polling.main(['--once'])
+
+    assert sorted(chat_id for chat_id, _ in bot.sent) == ['100', '200']
+    store = StateStore(path)
+    assert store.load_dates() == {
+        Tenant('tok1', '100').key: 1234, Tenant('tok2', '200').key: 1234,
+    }
+    store.close()
+
+
+def test_once_requires_state_store(monkeypatch):
+    monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:abcdefg')
+    monkeypatch.setattr(polling, 'open_store', lambda: None)
+    with pytest.raises(SystemExit):
+        polling.main(['--once'])
+
+
+def test_configured_tenants_fall_back_to_environment(tmp_path, monkeypatch):
+    monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'tok')
+    monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', '42')
+    tenants = polling.configured_tenants(str(tmp_path / 'missing.csv'), 7)
+    assert [(t.token, t.chat_id, t.timestamp) for t in tenants] == [
+        ('tok', '42', 7)
+    ]
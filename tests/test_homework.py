@@ -0,0 +1,51 @@
+import pytest
+
+import homework
+
+
+def make_homeworks(count, status='approved'):
+    return [
+        {'id': i, 'homework_name': f'hw{i}.zip', 'status': status}
+        for i in range(count)
+    ]
+
+
+def render(homeworks):
+    return homework.render_records(
+        homework.check_response({'homeworks': homeworks})
+    )
+
+
+def test_render_records_renders_every_homework():
+    messages = render(make_homeworks(3))
+    assert len(messages) == 3
+    assert all(message.endswith('Ура!') for message in messages)
+
+
+def test_check_response_rejects_unknown_status():
+    homeworks = make_homeworks(2)
+    homeworks[1]['status'] = 'unknown'
+    with pytest.raises(ValueError):
+        render(homeworks)
+
+
+def test_combine_messages_respects_limit():
+    messages = render(make_homeworks(200))
+    parts = homework.combine_messages(messages)
+    assert all(len(part) <= homework.MESSAGE_LIMIT for part in parts)
+    assert '\n\n'.join(parts) == '\n\n'.join(messages)
+    assert homework.combine_messages(messages[:2]) == [
+        '\n\n'.join(messages[:2])
+    ]
+    assert homework.combine_messages([]) == []
+
+
+def test_save_state_stores_checked_records(tmp_path, monkeypatch):
+    monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'sometoken')
+    key = homework.tenant_key('sometoken')
+    store = homework.open_store(str(tmp_path / 'state.db'))
+    records = homework.check_response({'homeworks': make_homeworks(2)})
+    homework.save_state(store, 42, records)
+    assert store.get_date(key) == 42
+    assert store.last_statuses(key) == {0: 'approved', 1: 'approved'}
+    store.close()
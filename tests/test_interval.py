@@ -0,0 +1,72 @@
+import random
+
+from homework_bot.interval import AdaptiveInterval
+from homework_bot.records import Homework
+from homework_bot.tenant import Tenant
+
+
+def make_policy():
+    return AdaptiveInterval(600, minimum=60, maximum=3600,
+                            rng=random.Random(0))
+
+
+def test_reviewing_polls_at_minimum():
+    tenant = Tenant('tok', '1')
+    tenant.track([Homework(1, 'hw1', 'reviewing')])
+    assert make_policy().next_interval(tenant) == 60
+
+
+def test_any_reviewing_homework_keeps_minimum():
+    policy = make_policy()
+    tenant = Tenant('tok', '1')
+    tenant.track([Homework(1, 'hw1', 'approved'),
+                  Homework(2, 'hw2', 'reviewing')])
+    assert tenant.last_status == 'approved'
+    assert policy.next_interval(tenant) == 60
+    tenant.track([Homework(1, 'hw1', 'approved')])
+    assert policy.next_interval(tenant) == 60
+    tenant.track([Homework(2, 'hw2', 'approved')])
+    assert policy.next_interval(tenant) == 120
+
+
+def test_approved_grows_to_maximum():
+    policy = make_policy()
+    tenant = Tenant('tok', '1')
+    tenant.last_status = 'approved'
+    intervals = [policy.next_interval(tenant) for _ in range(5)]
+    assert intervals == [1200, 2400, 3600, 3600, 3600]
+
+
+def test_unknown_or_rejected_uses_base():
+    policy = make_policy()
+    tenant = Tenant('tok', '1')
+    assert policy.next_interval(tenant) == 600
+    tenant.last_status = 'rejected'
+    assert policy.next_interval(tenant) == 600
+
+
+def test_errors_back_off_with_jitter_within_bounds():
+    policy = make_policy()
+    tenant = Tenant('tok', '1', min_interval=30, max_interval=2000)
+    for errors in range(1, 8):
+        tenant.errors = errors
+        interval = policy.next_interval(tenant)
+        assert 30 <= interval <= min(2000, 600 * 2 ** errors)
+    tenant.errors = 0
+    tenant.track([Homework(1, 'hw1', 'reviewing')])
+    assert policy.next_interval(tenant) == 30
+
+
+def test_first_error_never_polls_sooner_than_base():
+    policy = make_policy()
+    tenant = Tenant('tok', '1')
+    tenant.errors = 1
+    for _ in range(50):
+        assert 600 <= policy.next_interval(tenant) <= 1200
+
+
+def test_error_exponent_is_bounded():
+    policy = make_policy()
+    tenant = Tenant('tok', '1')
+    tenant.errors = 5000
+    assert 600 <= policy.next_interval(tenant) <= 3600
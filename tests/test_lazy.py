@@ -0,0 +1,53 @@
+import json
+import subprocess
+import sys
+import types
+
+from homework_bot.lazy import lazy_import
+
+IMPORT_BUDGET = 0.1
+HEAVY_MODULES = ('requests', 'telebot', 'urllib3', 'http.server',
+                 'logging.handlers')
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+loaded = [
+    name for name in {heavy!r}
+    if type(sys.modules.get(name)).__name__ == 'module'
+]
+print(json.dumps({{'elapsed': elapsed, 'loaded': loaded}}))
+'''
+
+
+def probe_import(module='homework'):
+    output = subprocess.run(
+        [sys.executable, '-c',
+         PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True, check=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def test_lazy_import_returns_loaded_module():
+    assert lazy_import('json') is sys.modules['json']
+
+
+def test_lazy_import_defers_execution(monkeypatch):
+    monkeypatch.delitem(sys.modules, 'colorsys', raising=False)
+    module = lazy_import('colorsys')
+    assert sys.modules['colorsys'] is module
+    assert type(module).__name__ != 'module'
+    assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert isinstance(module, types.ModuleType)
+
+
+def test_import_homework_within_budget():
+    results = [probe_import() for _ in range(3)]
+    assert results[0]['loaded'] == []
+    assert min(result['elapsed'] for result in results) < IMPORT_BUDGET
+
+
+def test_import_engine_defers_heavy_modules():
+    assert probe_import('homework_bot.engine')['loaded'] == []
@@ -0,0 +1,75 @@
+import logging
+import queue
+import threading
+
+from homework_bot import logs
+
+
+class Payload:
+    def __init__(self):
+        self.threads = set()
+
+    def __str__(self):
+        self.threads.add(threading.current_thread())
+        return 'payload'
+
+
+def make_record(message='Ответ от API: %s', args=(), sample=None):
+    record = logging.LogRecord(
+        'root', logging.DEBUG, __file__, 1, message, args, None
+    )
+    if sample is not None:
+        record.sample = sample
+    return record
+
+
+def test_parse_sampling():
+    assert logs.parse_sampling('') == {}
+    assert logs.parse_sampling('api_response=100, parse_status=0') == {
+        'api_response': 100, 'parse_status': 1,
+    }
+
+
+def test_sample_filter_keeps_every_nth_of_type():
+    sample_filter = logs.SampleFilter({'api_response': 3})
+    kept = [
+        sample_filter.filter(make_record(sample='api_response'))
+        for _ in range(7)
+    ]
+    assert kept == [True, False, False, True, False, False, True]
+    assert sample_filter.filter(make_record(sample='other'))
+    assert sample_filter.filter(make_record())
+
+
+def test_queue_handler_formats_in_listener(tmp_path):
+    path = tmp_path / 'bot.log'
+    handler = logs.queue_handler(logs.output_handler(str(path)), sampling='')
+    payload = Payload()
+    handler.handle(make_record(args=(payload,)))
+    handler.listener.stop()
+    handler.listener.stop()
+
+    assert payload.threads
+    assert threading.current_thread() not in payload.threads
+    assert 'Ответ от API: payload' in path.read_text(encoding='utf-8')
+
+
+def test_full_queue_drops_record():
+    handler = logs.LazyQueueHandler(queue.Queue(1))
+    dropped = logs.DROPPED.value
+    handler.handle(make_record())
+    handler.handle(make_record())
+    assert handler.queue.qsize() == 1
+    assert logs.DROPPED.value == dropped + 1
+
+
+def test_output_handler_rotates_by_size(tmp_path):
+    path = tmp_path / 'bot.log'
+    handler = logs.output_handler(str(path), max_bytes=200, backups=2)
+    for number in range(50):
+        handler.handle(make_record(message=f'Запись номер {number}'))
+    handler.close()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        'bot.log', 'bot.log.1', 'bot.log.2'
+    ]
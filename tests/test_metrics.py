@@ -0,0 +1,77 @@
+import asyncio
+import urllib.request
+
+import requests
+
+from homework_bot import metrics
+from homework_bot.engine import PollingEngine
+from homework_bot.exporter import Exporter
+from homework_bot.tenant import Tenant
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = {}
+    histogram = metrics.Histogram(
+        'latency_seconds', 'Задержка', buckets=(0.1, 1.0)
+    )
+    registry['latency'] = histogram
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value)
+
+    text = metrics.render(registry)
+    assert '# TYPE latency_seconds histogram' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+    assert 'latency_seconds_count 4' in text
+    assert histogram.average == 4.25 / 4
+
+
+def test_labelled_metrics_share_family():
+    first = metrics.counter('test_family_total', 'Семья', {'type': 'A'})
+    second = metrics.counter('test_family_total', 'Семья', {'type': 'B"'})
+    assert first is metrics.counter('test_family_total', labels={'type': 'A'})
+    first.inc()
+    second.inc(2)
+
+    text = metrics.render()
+    assert text.count('# TYPE test_family_total counter') == 1
+    assert 'test_family_total{type="A"} 1' in text
+    assert 'test_family_total{type="B\\""} 2' in text
+
+
+def test_engine_counts_errors_and_current_date(data_with_new_hw_status, bot):
+    good = Tenant('good', '1', 10)
+    bad = Tenant('bad', '2', 10)
+
+    def fetch(timestamp, headers):
+        if headers['Authorization'] == 'OAuth bad':
+            raise KeyError('homeworks')
+        return data_with_new_hw_status
+
+    errors = metrics.counter('poll_errors_total', labels={'type': 'KeyError'})
+    before = errors.value
+    engine = PollingEngine([good, bad], bot, fetch=fetch)
+    asyncio.run(engine.run_cycle())
+    engine.close()
+
+    assert errors.value == before + 1
+    current_date = metrics.gauge(
+        'tenant_current_date', labels={'tenant': good.key}
+    )
+    assert current_date.value == data_with_new_hw_status['current_date']
+
+
+def test_exporter_serves_http_and_writes_file(tmp_path):
+    metrics.counter('test_exported_total', 'Экспорт').inc()
+    path = tmp_path / 'bot.prom'
+    exporter = Exporter(port=0, path=str(path), interval=60).start()
+    port = exporter.server.server_port
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics') as reply:
+        body = reply.read().decode()
+    missing = requests.get(f'http://127.0.0.1:{port}/other')
+    exporter.stop()
+
+    assert 'test_exported_total 1' in body
+    assert missing.status_code == 404
+    assert 'test_exported_total 1' in path.read_text()
@@ -0,0 +1,158 @@
+import asyncio
+
+import requests
+
+import homework
+from homework_bot.dispatcher import Dispatcher
+from homework_bot.engine import PollingEngine
+from homework_bot.outbox import (OUTBOX_MAX_FAILURES, OUTBOX_RETENTION,
+                                 OUTBOX_RETRY_DELAY, Outbox)
+from homework_bot.tenant import Tenant
+
+
+def test_put_is_idempotent(tmp_path):
+    outbox = Outbox(str(tmp_path / 'outbox.db'))
+    assert outbox.put([('k:1', 1, 'привет'), ('k:2', 1, 'пока')]) == 2
+    assert outbox.put([('k:1', 1, 'привет'), ('k:3', 2, 'ещё')]) == 1
+    assert outbox.pending() == 3
+    outbox.close()
+
+
+def test_notifications_survive_outage_and_restart(tmp_path, bot):
+    path = str(tmp_path / 'outbox.db')
+    outbox = Outbox(path)
+    outbox.put((f'k:{i}', str(i % 3), f'сообщение {i}') for i in range(30))
+    bot.down = True
+    assert homework.drain_outbox(bot, outbox) is None
+    assert bot.attempts == OUTBOX_MAX_FAILURES
+    outbox.close()
+
+    outbox = Outbox(path)
+    assert outbox.pending() == 30
+    bot.down = False
+    assert outbox.drain(
+        lambda chat_id, text: homework.send_chat_message(bot, chat_id, text),
+        batch=7,
+    ) == 30
+    assert [text for _, text in bot.sent] == [
+        f'сообщение {i}' for i in range(30)
+    ]
+    assert outbox.pending() == 0
+    outbox.close()
+
+
+def test_failing_chat_does_not_block_others(tmp_path, clock):
+    outbox = Outbox(str(tmp_path / 'outbox.db'), clock=clock)
+    outbox.put([('1', 'плохой', 'a'), ('2', 'хороший', 'b'),
+                ('3', 'плохой', 'c'), ('4', 'хороший', 'd')])
+    sent = []
+
+    def send(chat_id, text):
+        if chat_id == 'плохой':
+            return False
+        sent.append(text)
+        return True
+
+    assert outbox.drain(send) == 2
+    assert sent == ['b', 'd']
+    assert outbox.claim() == []
+    clock.now += OUTBOX_RETRY_DELAY
+    assert [row[2] for row in outbox.claim()] == ['a', 'c']
+    outbox.close()
+
+
+def test_prune_keeps_undelivered(tmp_path, clock):
+    outbox = Outbox(str(tmp_path / 'outbox.db'), clock=clock)
+    outbox.put([('1', 'чат', 'a'), ('2', 'чат', 'b')])
+    row_id = outbox.claim(1)[0][0]
+    outbox.ack(row_id)
+    clock.now += OUTBOX_RETENTION + 1
+    outbox.prune()
+    assert [row[2] for row in outbox.claim()] == ['b']
+    assert outbox.put([('1', 'чат', 'a')]) == 1
+    outbox.close()
+
+
+def test_dispatcher_path_keeps_chat_order(tmp_path, clock, bot):
+    outbox = Outbox(str(tmp_path / 'outbox.db'), clock=clock)
+    outbox.put([('1', 'x', 'x1'), ('2', 'y', 'y1'), ('3', 'x', 'x2'),
+                ('4', 'y', 'y2'), ('5', 'x', 'x3')])
+    failed = []
+
+    def send_message(chat_id=None, text=None, **kwargs):
+        if text == 'x1' and not failed:
+            failed.append(text)
+            raise requests.ConnectionError('Telegram недоступен')
+        bot.sent.append((chat_id, text))
+
+    bot.send_message = send_message
+    engine = PollingEngine([], bot, concurrency=1, fetch=lambda *args: {},
+                           outbox=outbox)
+    for _ in range(2):
+        engine.dispatcher = Dispatcher(
+            bot, global_rate=1000, chat_rate=1000
+        ).start()
+        engine.drain_outbox()
+        engine.dispatcher.stop()
+        clock.now += OUTBOX_RETRY_DELAY
+    engine.close()
+
+    assert [text for chat_id, text in bot.sent if chat_id == 'x'] == [
+        'x1', 'x2', 'x3',
+    ]
+    assert [text for chat_id, text in bot.sent if chat_id == 'y'] == [
+        'y1', 'y2',
+    ]
+
+
+def test_deliver_without_outbox_sends_directly(monkeypatch):
+    sent = []
+    monkeypatch.setattr(homework, 'send_message',
+                        lambda bot, message: sent.append(message))
+    homework.deliver(None, None, 'k', ['один', 'два'])
+    assert sent == ['один', 'два']
+
+
+def test_engine_replays_outbox_after_telegram_recovers(tmp_path, clock,
+                                                       bot):
+    tenant = Tenant('tok', '1', 10)
+    bot.down = True
+    outbox = Outbox(str(tmp_path / 'outbox.db'), clock=clock)
+    responses = [
+        {'homeworks': [{'id': 1, 'homework_name': 'hw1',
+                        'status': 'approved'}], 'current_date': 20},
+        {'homeworks': [], 'current_date': 30},
+    ]
+
+    def fetch(timestamp, headers):
+        return responses.pop(0)
+
+    engine = PollingEngine([tenant], bot, concurrency=1, fetch=fetch,
+                           outbox=outbox)
+    asyncio.run(engine.run_cycle())
+    assert bot.sent == []
+    assert outbox.pending() == 1
+
+    bot.down = False
+    clock.now += OUTBOX_RETRY_DELAY
+    asyncio.run(engine.run_cycle())
+    engine.close()
+
+    assert len(bot.sent) == 1
+    assert bot.sent[0][0] == '1'
+    assert 'hw1' in bot.sent[0][1]
+
+
+def test_outbox_key_does_not_depend_on_window(tmp_path, bot):
+    outbox = Outbox(str(tmp_path / 'outbox.db'))
+    response = {'homeworks': [{'id': 1, 'homework_name': 'hw1',
+                               'status': 'approved'}], 'current_date': 20}
+    bot.down = True
+    for timestamp in (10, 15):
+        engine = PollingEngine(
+            [Tenant('tok', '1', timestamp)], bot,
+            concurrency=1, fetch=lambda *args: response, outbox=outbox,
+        )
+        engine.poll_tenant(engine.tenants[0])
+    assert outbox.pending() == 1
+    outbox.close()
@@ -0,0 +1,113 @@
+import json
+import threading
+
+import pytest
+
+import homework
+from benchmarks.stubs import PracticumStub, make_homeworks
+from homework_bot.codec import ArrayStream
+from homework_bot.pipeline import buffered, chunk_messages
+
+PAYLOAD = {
+    'current_date': 1700000000,
+    'homeworks': [
+        {'id': i, 'homework_name': f'hw{i}.zip', 'status': 'approved',
+         'reviewer_comment': 'Всё хорошо, 12 замечаний ' * i}
+        for i in range(30)
+    ],
+    'meta': {'total': 30},
+}
+
+
+def split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize('size', [1, 3, 64, 100000])
+def test_array_stream_decodes_across_chunk_boundaries(size):
+    raw = json.dumps(PAYLOAD, ensure_ascii=False, indent=2).encode()
+    stream = ArrayStream(split(raw, size), 'homeworks')
+    assert list(stream) == PAYLOAD['homeworks']
+    assert stream.fields == {'current_date': 1700000000,
+                             'meta': {'total': 30}}
+
+
+@pytest.mark.parametrize('body, error', [
+    (b'[]', TypeError),
+    (b'{"current_date": 1}', KeyError),
+    (b'{"homeworks": {}}', TypeError),
+    (b'{"homeworks": [{"id": 1},', ValueError),
+])
+def test_array_stream_rejects_invalid_payload(body, error):
+    closed = []
+    stream = ArrayStream([body], 'homeworks', close=lambda: closed.append(1))
+    with pytest.raises(error):
+        list(stream)
+    assert closed == [1]
+
+
+def test_buffered_applies_backpressure():
+    produced = []
+
+    def source():
+        for number in range(100):
+            produced.append(number)
+            yield number
+
+    items = buffered(source(), maxsize=4)
+    assert next(items) == 0
+    threading.Event().wait(0.1)
+    assert len(produced) <= 6
+    assert list(items) == list(range(1, 100))
+
+
+def test_buffered_propagates_errors_and_stops_on_close():
+    def failing():
+        yield 1
+        raise ValueError('сбой стадии')
+
+    items = buffered(failing())
+    assert next(items) == 1
+    with pytest.raises(ValueError):
+        next(items)
+
+    closed = threading.Event()
+
+    def endless():
+        try:
+            while True:
+                yield 1
+        finally:
+            closed.set()
+
+    items = buffered(endless(), maxsize=2)
+    next(items)
+    items.close()
+    assert closed.wait(1)
+
+
+def test_chunk_messages_matches_combine_messages():
+    messages = [f'Сообщение {i}. ' * (i % 50 + 1) for i in range(300)]
+    assert list(chunk_messages(iter(messages), homework.MESSAGE_LIMIT)) == (
+        homework.combine_messages(messages)
+    )
+
+
+def test_stream_records_yields_checked_records(monkeypatch):
+    fields = []
+    with PracticumStub(make_homeworks(500), current_date=42) as stub:
+        monkeypatch.setattr(homework, 'ENDPOINT', stub.url)
+        monkeypatch.setattr(homework, 'STREAM_CHUNK', 512)
+        records = list(
+            homework.stream_records(0, {}, on_fields=fields.append)
+        )
+
+    assert [record.id for record in records] == list(range(500))
+    assert fields == [{'current_date': 42}]
+
+
+def test_stream_records_raises_api_errors_immediately(monkeypatch):
+    with PracticumStub(error_rate=1.0) as stub:
+        monkeypatch.setattr(homework, 'ENDPOINT', stub.url)
+        with pytest.raises(ConnectionError):
+            homework.stream_records(0, {})
@@ -0,0 +1,39 @@
+from homework import validate_response
+from homework_bot.records import Homework, parse_date
+
+
+def test_parse_date_to_epoch():
+    assert parse_date('2020-02-13T14:40:57Z') == 1581604857
+    assert parse_date(1581604857) == 1581604857
+
+
+def test_parse_date_assumes_utc_without_timezone():
+    assert parse_date('2020-02-13T14:40:57') == 1581604857
+    assert parse_date('2020-02-13T17:40:57+03:00') == 1581604857
+
+
+def test_parse_date_tolerates_malformed_values():
+    assert parse_date(1581604857.9) == 1581604857
+    assert parse_date('вчера') is None
+    assert parse_date(None) is None
+    assert parse_date(['2020-02-13']) is None
+
+
+def test_validator_produces_compact_records(data_with_new_hw_status):
+    statuses = [
+        ''.join(['appr', 'oved']) for _ in range(2)
+    ]
+    assert statuses[0] is not statuses[1]
+    records = validate_response({'homeworks': [
+        dict(data_with_new_hw_status['homeworks'][0], status=status)
+        for status in statuses
+    ]})
+
+    record = records[0]
+    assert isinstance(record, Homework)
+    assert not hasattr(record, '__dict__')
+    assert record.id == 777777777
+    assert record.date_updated == 1618137069
+    assert record.lesson_name == 'Проект спринта: Деплой бота'
+    assert records[0].status is records[1].status
+    assert records[0] == records[1]
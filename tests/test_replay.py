@@ -0,0 +1,118 @@
+import threading
+
+import pytest
+from telebot import TeleBot
+
+from homework_bot import engine as polling
+from homework_bot.clock import VirtualClock
+from homework_bot.recording import Recorder, Replayer
+from homework_bot.replay import replay
+from homework_bot.tenant import Tenant
+
+DAY = 24 * 3600
+
+
+def record_log(path, tenants, days):
+    now = [1_700_000_000.0]
+    statuses = ('reviewing', 'approved')
+
+    def fetch(timestamp, headers):
+        step = int(now[0]) // 3600
+        if step % 7:
+            return {'homeworks': [], 'current_date': int(now[0])}
+        if step % 5 == 0:
+            raise ConnectionError('API недоступен')
+        return {
+            'homeworks': [{
+                'id': step, 'homework_name': f'hw{step}.zip',
+                'status': statuses[step % 2],
+            }],
+            'current_date': int(now[0]),
+        }
+
+    recorder = Recorder(fetch, path, clock=lambda: now[0])
+    for _ in range(days * 24):
+        for tenant in tenants:
+            try:
+                recorder(tenant.timestamp, tenant.headers)
+            except ConnectionError:
+                pass
+        now[0] += 3600
+    recorder.close()
+
+
+def make_tenants():
+    return [Tenant(f'tok{i}', str(i)) for i in range(3)]
+
+
+def test_replay_is_fast_and_deterministic(tmp_path):
+    path = tmp_path / 'traffic.jsonl.gz'
+    record_log(path, make_tenants(), days=3)
+
+    first = replay(path, make_tenants(), tick=60)
+    second = replay(path, make_tenants(), tick=60)
+
+    assert first['virtual_seconds'] >= 2 * DAY
+    assert first['real_seconds'] < first['virtual_seconds'] / 1000
+    assert first['messages'] > 0
+    assert first['digest'] == second['digest']
+
+
+def test_replayer_keeps_responses_recorded_before_error(tmp_path):
+    path = str(tmp_path / 'traffic.jsonl.gz')
+    now = [100.0]
+    answers = [
+        {'homeworks': [{'id': 1, 'homework_name': 'hw1.zip',
+                        'status': 'approved'}], 'current_date': 100},
+        ConnectionError('API недоступен'),
+    ]
+
+    def fetch(timestamp, headers):
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    tenant = Tenant('tok', '1')
+    recorder = Recorder(fetch, path, clock=lambda: now[0])
+    recorder(0, tenant.headers)
+    now[0] = 200.0
+    with pytest.raises(ConnectionError):
+        recorder(0, tenant.headers)
+    recorder.close()
+
+    clock = VirtualClock(300.0)
+    replayer = Replayer(path, clock)
+    response = replayer(0, tenant.headers)
+    assert [hw['id'] for hw in response['homeworks']] == [1]
+    with pytest.raises(ConnectionError):
+        replayer(0, tenant.headers)
+
+
+def test_command_requests_are_not_recorded(tmp_path, monkeypatch):
+    path = str(tmp_path / 'traffic.jsonl.gz')
+    now = [900.0]
+    history = [
+        {'id': i, 'homework_name': f'hw{i}.zip', 'status': 'approved'}
+        for i in range(3)
+    ]
+
+    def fetch(timestamp, headers):
+        homeworks = history if timestamp == 0 else history[:1]
+        return {'homeworks': homeworks, 'current_date': int(now[0])}
+
+    tenant = Tenant('tok', '100', 900)
+    engine = polling.PollingEngine([tenant], None, concurrency=1,
+                                   fetch=fetch)
+    monkeypatch.setattr(threading.Thread, 'start', lambda self: None)
+    polling.start_commands(engine, TeleBot('1234:abcdefg', threaded=False))
+    engine.fetch = Recorder(engine.fetch, path, clock=lambda: now[0])
+    engine._request(900, tenant.headers)
+    now[0] = 1000.0
+    assert 'hw2.zip' in engine.commands.answer('100', 'history')
+    engine._request(1000, tenant.headers)
+    engine.fetch.close()
+    engine.close()
+
+    response = Replayer(path, VirtualClock(1300.0))(1000, tenant.headers)
+    assert [hw['id'] for hw in response['homeworks']] == [0, 0]
@@ -0,0 +1,148 @@
+import random
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+import pytest
+
+import homework
+from benchmarks.stubs import PracticumStub
+from homework_bot import metrics
+from homework_bot.deadline import Deadline
+from homework_bot.retry import (APIResponseError, RetryPolicy,
+                                parse_retry_after)
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None, data=None):
+        self.status_code = status_code
+        self.reason = ''
+        self.headers = headers or {}
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class FakeSession:
+    def __init__(self, replies):
+        self.replies = list(replies)
+
+    def get(self, *args, **kwargs):
+        return self.replies.pop(0)
+
+
+def make_policy(attempts=3):
+    sleeps = []
+    policy = RetryPolicy(attempts=attempts, base=0.5, cap=4,
+                         rng=random.Random(1), sleep=sleeps.append)
+    return policy, sleeps
+
+
+def test_parse_retry_after():
+    moment = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    assert parse_retry_after('120') == 120
+    assert parse_retry_after(
+        format_datetime(moment, usegmt=True), now=lambda: moment.timestamp() - 7
+    ) == 7
+    assert parse_retry_after('скоро') is None
+    assert parse_retry_after(None) is None
+
+
+def test_delay_uses_full_jitter_and_retry_after():
+    policy, _ = make_policy()
+    for attempt in range(6):
+        assert 0 <= policy.delay(attempt) <= min(4, 0.5 * 2 ** attempt)
+    assert policy.delay(0, retry_after=3) == 3
+
+
+def test_transient_errors_are_retried():
+    policy, sleeps = make_policy()
+    session = FakeSession([
+        FakeResponse(502),
+        FakeResponse(429, {'Retry-After': '2'}),
+        FakeResponse(200, data={'homeworks': [], 'current_date': 5}),
+    ])
+    retries = metrics.counter('api_retries_total', labels={'reason': '429'})
+    before = retries.value
+
+    response = homework.fetch_api_answer(0, {}, session, retry=policy)
+
+    assert response == {'homeworks': [], 'current_date': 5}
+    assert len(sleeps) == 2
+    assert sleeps[1] >= 2
+    assert retries.value == before + 1
+
+
+def test_permanent_errors_are_not_retried():
+    policy, sleeps = make_policy()
+    calls = []
+
+    def not_found():
+        calls.append(1)
+        raise APIResponseError('Не найдено', status_code=404)
+
+    with pytest.raises(APIResponseError):
+        policy.call(not_found)
+    assert calls == [1]
+    assert sleeps == []
+
+
+def test_retry_respects_cycle_deadline():
+    policy, sleeps = make_policy()
+
+    def throttled():
+        raise APIResponseError('Слишком часто', 429, retry_after=30)
+
+    with Deadline(budget=5), pytest.raises(APIResponseError):
+        policy.call(throttled)
+    assert sleeps == []
+
+
+def test_retries_are_bounded_against_stub(monkeypatch):
+    policy, sleeps = make_policy(attempts=2)
+    with PracticumStub(error_rate=1.0) as stub:
+        monkeypatch.setattr(homework, 'ENDPOINT', stub.url)
+        with pytest.raises(APIResponseError) as error:
+            homework.fetch_api_answer(0, {}, retry=policy)
+
+    assert error.value.status_code == 500
+    assert stub.requests == 3
+    assert len(sleeps) == 2
+
+
+def test_main_retries_bad_gateway_within_cycle(monkeypatch):
+    class Stop(Exception):
+        pass
+
+    class Bot:
+        sent = []
+
+        def send_message(self, chat_id=None, text=None, **kwargs):
+            self.sent.append(text)
+
+    def stop(seconds):
+        raise Stop
+
+    replies = [
+        FakeResponse(502),
+        FakeResponse(200, data={
+            'homeworks': [{'id': 1, 'homework_name': 'hw1.zip',
+                           'status': 'approved'}],
+            'current_date': 100,
+        }),
+    ]
+    monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'sometoken')
+    monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:abcdefg')
+    monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', '12345')
+    monkeypatch.setattr(homework.requests, 'get',
+                        lambda *args, **kwargs: replies.pop(0))
+    monkeypatch.setattr(homework.telebot, 'TeleBot', lambda token: Bot())
+    monkeypatch.setattr(homework, 'RetryPolicy',
+                        lambda: make_policy()[0])
+    monkeypatch.setattr(homework.time, 'sleep', stop)
+    with pytest.raises(Stop):
+        homework.main()
+
+    assert replies == []
+    assert len(Bot.sent) == 1
+    assert 'hw1.zip' in Bot.sent[0]
@@ -0,0 +1,64 @@
+import asyncio
+import math
+import random
+
+import pytest
+
+from homework_bot.engine import PollingEngine
+from homework_bot.interval import AdaptiveInterval
+from homework_bot.scheduler import TimerWheel
+from homework_bot.tenant import Tenant
+
+
+def test_wheel_fires_on_time_across_levels():
+    wheel = TimerWheel(tick=1, slots=4, levels=2, jitter=0)
+    rng = random.Random(7)
+    deadlines = {i: rng.uniform(0, 100) for i in range(500)}
+    for item, when in deadlines.items():
+        wheel.schedule(item, when)
+    assert len(wheel) == 500
+
+    fired = {}
+    for now in range(110):
+        for item in wheel.advance(now):
+            fired[item] = now
+    assert len(wheel) == 0
+    assert fired == {
+        item: max(1, math.ceil(when)) for item, when in deadlines.items()
+    }
+
+
+def test_schedule_after_applies_bounded_jitter():
+    wheel = TimerWheel(tick=1, jitter=0.1, rng=random.Random(1))
+    for item in range(200):
+        wheel.schedule_after(item, 100, now=0)
+    assert wheel.advance(89) == []
+    assert len(wheel.advance(110)) == 200
+
+
+def test_past_deadline_fires_on_next_tick():
+    wheel = TimerWheel(tick=1, start=0)
+    wheel.advance(10)
+    wheel.schedule('late', 3)
+    assert wheel.advance(11) == ['late']
+
+
+def test_engine_polls_each_tenant_on_its_schedule(null_bot):
+    polls = {}
+
+    def fetch(timestamp, headers):
+        token = headers['Authorization']
+        polls[token] = polls.get(token, 0) + 1
+        return {'homeworks': [], 'current_date': timestamp}
+
+    tenants = [Tenant(f'tok{i}', str(i)) for i in range(5)]
+    engine = PollingEngine(
+        tenants, null_bot, retry_period=0.1, fetch=fetch,
+        policy=AdaptiveInterval(0.1, minimum=0.05, maximum=0.1),
+    )
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(engine.run_forever(tick=0.01), 0.5))
+    engine.close()
+
+    assert len(polls) == 5
+    assert all(count >= 3 for count in polls.values())
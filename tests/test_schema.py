@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from homework import validate_response
+from homework_bot import codec
+from homework_bot.schema import Field, compile_validator
+
+
+def test_validator_builds_records_in_one_pass():
+    records = validate_response({
+        'homeworks': [
+            {'id': 1, 'homework_name': 'hw1', 'status': 'approved',
+             'reviewer_comment': 'ok'},
+            {'homework_name': 'hw2', 'status': 'reviewing'},
+        ],
+        'current_date': 10,
+    })
+    assert [(r.id, r.homework_name, r.status) for r in records] == [
+        (1, 'hw1', 'approved'), (None, 'hw2', 'reviewing')
+    ]
+
+
+@pytest.mark.parametrize('payload, error', [
+    ([], TypeError),
+    ({'current_date': 1}, KeyError),
+    ({'homeworks': {}}, TypeError),
+    ({'homeworks': ['hw']}, TypeError),
+    ({'homeworks': [{'status': 'approved'}]}, KeyError),
+    ({'homeworks': [{'homework_name': 'hw'}]}, KeyError),
+    ({'homeworks': [{'homework_name': 'hw', 'status': 'lost'}]}, ValueError),
+])
+def test_validator_rejects_invalid_payload(payload, error):
+    with pytest.raises(error):
+        validate_response(payload)
+
+
+def test_validator_converts_fields():
+    validate = compile_validator('items', (
+        Field('value', required=True, convert=int),
+    ))
+    assert validate({'items': [{'value': '42'}]})[0].value == 42
+
+
+class FakeResponse:
+    content = b'{"homeworks": [], "current_date": 5}'
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def test_decode_response_with_fast_backend(monkeypatch):
+    monkeypatch.setattr(codec, '_fast_loads', json.loads)
+    assert codec.decode_response(FakeResponse())['current_date'] == 5
+    monkeypatch.setattr(codec, '_fast_loads', None)
+    assert codec.decode_response(FakeResponse())['current_date'] == 5
+
+
+def test_item_validator_checks_single_record():
+    record = validate_response.item(
+        {'homework_name': 'hw', 'status': 'approved'}
+    )
+    assert (record.homework_name, record.status) == ('hw', 'approved')
+    with pytest.raises(TypeError):
+        validate_response.item('hw')
+    with pytest.raises(ValueError):
+        validate_response.item({'homework_name': 'hw', 'status': 'lost'})
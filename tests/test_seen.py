@@ -0,0 +1,102 @@
+import asyncio
+
+from homework_bot.engine import PollingEngine
+from homework_bot.records import Homework
+from homework_bot.seen import SeenIndex, seen_key
+from homework_bot.state import StateStore
+from homework_bot.tenant import Tenant
+
+
+def test_seen_key_tracks_transitions():
+    reviewing = Homework(1, 'hw.zip', 'reviewing', 100)
+    assert seen_key('a', reviewing) == seen_key(
+        'a', Homework(1, 'другое имя', 'reviewing', 100)
+    )
+    assert seen_key('a', reviewing) != seen_key('b', reviewing)
+    assert seen_key('a', reviewing) != seen_key(
+        'a', Homework(1, 'hw.zip', 'approved', 200)
+    )
+    assert seen_key('a', Homework(None, 'hw.zip', 'approved')) != seen_key(
+        'a', Homework(None, 'hw2.zip', 'approved')
+    )
+
+
+def test_seen_index_evicts_least_recently_seen():
+    index = SeenIndex(capacity=2)
+    assert index.add(1)
+    assert index.add(2)
+    assert not index.add(1)
+    assert index.add(3)
+    assert 2 not in index
+    assert 1 in index
+    assert len(index) == 2
+    assert index.add(2)
+
+
+def test_engine_suppresses_overlapping_windows(bot):
+    tenant = Tenant('tok', '1', 10)
+    responses = [
+        [{'id': 1, 'homework_name': 'hw1', 'status': 'reviewing',
+          'date_updated': '2024-03-01T10:00:00Z'}],
+        [{'id': 1, 'homework_name': 'hw1', 'status': 'reviewing',
+          'date_updated': '2024-03-01T10:00:00Z'}],
+        [{'id': 1, 'homework_name': 'hw1', 'status': 'approved',
+          'date_updated': '2024-03-02T10:00:00Z'}],
+    ]
+
+    def fetch(timestamp, headers):
+        return {'homeworks': responses.pop(0), 'current_date': 5}
+
+    engine = PollingEngine([tenant], bot, concurrency=1, fetch=fetch)
+    for _ in range(3):
+        asyncio.run(engine.run_cycle())
+    engine.close()
+
+    texts = [text for _, text in bot.sent]
+    assert len(texts) == 2
+    assert 'взята на проверку' in texts[0]
+    assert 'проверена' in texts[1]
+    assert tenant.last_status == 'approved'
+
+
+def test_fresh_does_not_mark_until_delivered():
+    index = SeenIndex()
+    records = [Homework(1, 'hw.zip', 'approved', 100)] * 2
+    fresh, keys = index.fresh('a', records)
+    assert fresh == records[:1]
+    assert index.fresh('a', records)[0] == fresh
+    index.mark(keys)
+    assert index.fresh('a', records) == ([], [])
+
+
+def test_seen_keys_survive_restart(tmp_path):
+    path = str(tmp_path / 'state.db')
+    record = Homework(1, 'hw.zip', 'approved', 100)
+    store = StateStore(path)
+    index = SeenIndex(store=store)
+    index.mark(index.fresh('a', [record])[1])
+    store.close()
+
+    store = StateStore(path)
+    assert SeenIndex(store=store).fresh('a', [record]) == ([], [])
+    assert len(SeenIndex(capacity=0, store=store)) == 0
+    store.close()
+
+
+def test_engine_retries_transition_after_failed_send(bot):
+    tenant = Tenant('tok', '1', 10)
+    response = {'homeworks': [{'id': 1, 'homework_name': 'hw1',
+                               'status': 'approved'}],
+                'current_date': 20}
+    bot.down = True
+    engine = PollingEngine([tenant], bot, concurrency=1,
+                           fetch=lambda timestamp, headers: response)
+    asyncio.run(engine.run_cycle())
+    assert tenant.timestamp == 10
+
+    bot.down = False
+    asyncio.run(engine.run_cycle())
+    engine.close()
+    assert bot.attempts == 2
+    assert len(bot.sent) == 1
+    assert tenant.timestamp == 20
@@ -0,0 +1,27 @@
+import homework
+from benchmarks.stubs import PracticumStub
+from homework_bot import session as http_session
+
+
+def test_session_reuses_connection(monkeypatch):
+    homeworks = [{'homework_name': 'hw.zip', 'status': 'approved'}]
+    with PracticumStub(homeworks=homeworks) as stub:
+        monkeypatch.setattr(homework, 'ENDPOINT', stub.url)
+        session = http_session.build_session(pool_size=2)
+        requests_before = http_session.REQUESTS.value
+        connections_before = http_session.CONNECTIONS.value
+        for _ in range(5):
+            response = homework.fetch_api_answer(0, {}, session)
+        session.close()
+
+    assert response['homeworks'] == homeworks
+    assert http_session.REQUESTS.value - requests_before == 5
+    assert http_session.CONNECTIONS.value - connections_before == 1
+    assert http_session.HANDSHAKES.count >= 1
+
+
+def test_session_negotiates_compression():
+    session = http_session.build_session()
+    assert 'gzip' in session.headers['Accept-Encoding']
+    assert 'deflate' in session.headers['Accept-Encoding']
+    session.close()
@@ -0,0 +1,58 @@
+import asyncio
+
+from homework import validate_response
+from homework_bot.engine import PollingEngine
+from homework_bot.records import Homework
+from homework_bot.state import StateStore
+from homework_bot.tenant import Tenant
+
+
+def test_state_survives_restart(tmp_path):
+    path = str(tmp_path / 'state.db')
+    store = StateStore(path)
+    store.save('tenant', 100, validate_response({'homeworks': [
+        {'id': 1, 'homework_name': 'hw1', 'status': 'reviewing'},
+        {'id': 2, 'homework_name': 'hw2', 'status': 'approved'},
+    ]}))
+    store.save('tenant', 200, validate_response({'homeworks': [
+        {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+    ]}))
+    assert store.get_date('tenant') == 200
+    store.close()
+
+    store = StateStore(path)
+    assert store.load_dates() == {'tenant': 200}
+    assert store.last_statuses('tenant') == {1: 'approved', 2: 'approved'}
+    assert store.get_date('missing', 7) == 7
+    store.close()
+
+
+def test_engine_resumes_from_store(tmp_path, null_bot):
+    store = StateStore(str(tmp_path / 'state.db'))
+    tenant = Tenant('tok', '1', timestamp=999)
+    store.save(tenant.key, 500)
+    seen = []
+
+    def fetch(timestamp, headers):
+        seen.append(timestamp)
+        return {'homeworks': [], 'current_date': timestamp + 10}
+
+    engine = PollingEngine([tenant], null_bot, fetch=fetch, store=store)
+    asyncio.run(engine.run_cycle())
+    engine.close()
+
+    assert seen == [500]
+    store = StateStore(str(tmp_path / 'state.db'))
+    assert store.get_date(tenant.key) == 510
+    store.close()
+
+
+def test_engine_restores_reviewing_homeworks(tmp_path, null_bot):
+    store = StateStore(str(tmp_path / 'state.db'))
+    tenant = Tenant('tok', '1')
+    store.save(tenant.key, 500, [Homework(1, 'hw1', 'reviewing'),
+                                 Homework(2, 'hw2', 'approved')])
+    engine = PollingEngine([tenant], null_bot, fetch=lambda *args: {},
+                           store=store)
+    engine.close()
+    assert tenant.reviewing == {1}
@@ -0,0 +1,35 @@
+import pytest
+from telebot import apihelper
+
+import homework
+from benchmarks import bench_pipeline
+from benchmarks.stubs import StubServer
+
+
+def test_pipeline_benchmark_runs_against_stubs(monkeypatch):
+    monkeypatch.setattr(homework, 'ENDPOINT', homework.ENDPOINT)
+    monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', '12345')
+    timings, rate, errors = bench_pipeline.run(cycles=3, homeworks=2)
+
+    assert errors == 0
+    assert rate > 0
+    assert all(len(timings[stage]) == 3 for stage in bench_pipeline.STAGES)
+
+
+def test_pipeline_benchmark_counts_api_errors(monkeypatch):
+    monkeypatch.setattr(homework, 'ENDPOINT', homework.ENDPOINT)
+    monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', '12345')
+    _, _, errors = bench_pipeline.run(cycles=5, api_errors=1.0)
+    assert errors == 5
+
+
+def test_pipeline_benchmark_restores_telegram_url():
+    url = apihelper.API_URL
+    bench_pipeline.run(cycles=1)
+    assert apihelper.API_URL == url
+    assert homework.TELEGRAM_CHAT_ID != '1'
+
+
+def test_stub_server_requires_success():
+    with pytest.raises(TypeError):
+        StubServer()
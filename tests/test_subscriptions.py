@@ -0,0 +1,96 @@
+import asyncio
+
+import homework
+from homework_bot.engine import PollingEngine
+from homework_bot.outbox import Outbox
+from homework_bot.records import Homework
+from homework_bot.subscriptions import (SubscriptionIndex, load_subscriptions,
+                                        merge_tenants)
+from homework_bot.tenant import Tenant
+
+
+def test_route_groups_chats_with_same_records():
+    tenant = Tenant('tok', '1')
+    index = SubscriptionIndex()
+    index.subscribe(tenant.key, 'ментор')
+    index.subscribe(tenant.key, 'группа', 'hw2.zip')
+    records = [Homework(1, 'hw1.zip', 'approved'),
+               Homework(2, 'hw2.zip', 'approved')]
+
+    assert sorted(index.route(tenant, records)) == [
+        (['1', 'ментор'], [0, 1]), (['группа'], [1]),
+    ]
+    assert index.route(Tenant('other', '9'), records) == [(['9'], [0, 1])]
+    assert len(index) == 2
+
+
+def test_load_subscriptions(tmp_path):
+    path = tmp_path / 'subscriptions.csv'
+    path.write_text('# token,chat_id,homework\ntok,10\ntok,20,hw.zip\n')
+    index = load_subscriptions(str(path))
+    tenant = Tenant('tok', '1')
+    assert index.chats(tenant) == {'1', '10'}
+    assert len(load_subscriptions(str(tmp_path / 'missing.csv'))) == 0
+
+
+def make_engine(bot, subscriptions, requests, **options):
+    def fetch(timestamp, headers):
+        requests.append(timestamp)
+        return {'homeworks': [
+            {'id': 1, 'homework_name': 'hw1.zip', 'status': 'approved'},
+            {'id': 2, 'homework_name': 'hw2.zip', 'status': 'reviewing'},
+        ], 'current_date': 20}
+
+    return PollingEngine(
+        [Tenant('tok', '1', 10)], bot, concurrency=1, fetch=fetch,
+        subscriptions=subscriptions, **options
+    )
+
+
+def test_engine_renders_once_and_fans_out(monkeypatch, bot):
+    renders = []
+    format_status = homework.format_status
+
+    def counting_format(name, status):
+        renders.append(name)
+        return format_status(name, status)
+
+    monkeypatch.setattr(homework, 'format_status', counting_format)
+    index = SubscriptionIndex()
+    key = Tenant('tok', '1').key
+    for chat_id in range(100, 150):
+        index.subscribe(key, str(chat_id))
+    index.subscribe(key, 'группа', 'hw2.zip')
+    requests = []
+    engine = make_engine(bot, index, requests)
+    asyncio.run(engine.run_cycle())
+    engine.close()
+
+    assert requests == [10]
+    assert sorted(renders) == ['hw1.zip', 'hw2.zip']
+    recipients = {chat_id for chat_id, _ in bot.sent}
+    assert len(bot.sent) == len(recipients) == 52
+    group_text = dict(bot.sent)['группа']
+    assert 'hw2.zip' in group_text and 'hw1.zip' not in group_text
+
+
+def test_fan_out_through_outbox_uses_per_chat_keys(tmp_path, bot):
+    index = SubscriptionIndex()
+    index.subscribe(Tenant('tok', '1').key, '2')
+    outbox = Outbox(str(tmp_path / 'outbox.db'))
+    engine = make_engine(bot, index, [], outbox=outbox)
+    asyncio.run(engine.run_cycle())
+    assert outbox.pending() == 0
+    engine.close()
+
+    assert sorted(chat_id for chat_id, _ in bot.sent) == ['1', '2']
+
+
+def test_duplicate_tokens_are_polled_once():
+    index = SubscriptionIndex()
+    tenants = [
+        Tenant('tok', '1'), Tenant('other', '5'), Tenant('tok', '2'),
+    ]
+    merged = merge_tenants(tenants, index)
+    assert [tenant.chat_id for tenant in merged] == ['1', '5']
+    assert index.chats(tenants[0]) == {'1', '2'}